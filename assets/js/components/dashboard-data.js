@@ -0,0 +1,57 @@
+// Dashboard Data Loader for SATY Analytics
+// Fetches the per-page, per-ticker JSON slices written by
+// data_science/scripts/export_dashboard_data.py into assets/data/
+
+class DashboardData {
+    constructor() {
+        // Same base-path rule as the navigation component
+        const currentPath = window.location.pathname;
+        if (currentPath.includes('/pages/analysis/')) {
+            this.basePath = '../../assets/data/';
+        } else if (currentPath.includes('/pages/')) {
+            this.basePath = '../assets/data/';
+        } else {
+            this.basePath = 'assets/data/';
+        }
+        this.cache = {};
+    }
+
+    // Fetch one JSON file under assets/data once per page
+    fetchJson(relativePath) {
+        if (!this.cache[relativePath]) {
+            this.cache[relativePath] = fetch(this.basePath + relativePath).then(response => {
+                if (!response.ok) {
+                    throw new Error(`Dashboard data ${relativePath} not found (${response.status})`);
+                }
+                return response.json();
+            });
+        }
+        return this.cache[relativePath];
+    }
+
+    // Load one slice, e.g. load('intraday', 'SPX')
+    load(page, ticker) {
+        return this.fetchJson(`${page}/${ticker}.json`);
+    }
+
+    // Pages and tickers that have exported slices
+    manifest() {
+        return this.fetchJson('manifest.json');
+    }
+
+    // Turn a column-wise table ({rows, columns: {name: [...]}}) into row objects
+    static rows(table) {
+        if (!table) return [];
+        const names = Object.keys(table.columns);
+        const rows = [];
+        for (let i = 0; i < table.rows; i++) {
+            const row = {};
+            names.forEach(name => { row[name] = table.columns[name][i]; });
+            rows.push(row);
+        }
+        return rows;
+    }
+}
+
+window.DashboardData = DashboardData;
+window.dashboardData = new DashboardData();
@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+"""
+Resident Analysis Server - Hot Bar Stores Behind a Local HTTP API
+Loads every 10-minute bar store once (bars, daily bars with ATR state and
+session arrays with a sorted day index) and answers queries from memory:
+
+- GET /tickers                                   loaded tickers, sessions and last bar
+- GET /golden_gate?ticker=SPX&start=2020-01-01&end=2024-12-31&target=0.618
+                                                 gap-open / intraday trigger and completion counts
+- GET /gap_fill?ticker=SPY&start=...&end=...&threshold_pct=0.15&group=atr_bucket
+                                                 gap-fill rates, fill timing and MAE per group
+- GET /insights?symbol=SPX&scenario=gap&direction=negative&checkpoint=11:00&year=2020,2021
+                                                 insights cube counts, rates and conditional completion
+- GET|POST /refresh?ticker=SPX                   ingest bars appended to the CSV stores
+
+Refreshes are incremental: only bytes appended to a store since the last read
+are parsed, daily bars and ATR are recomputed from the first new session on
+(the RMA continues from the stored ATR), and only the affected sessions of the
+session arrays are rebuilt. Derived event tables are cached per parameter set
+and dropped when their ticker refreshes.
+
+Run from the scripts directory (the insights cube paths are relative to it).
+"""
+
+import sys
+import os
+import io
+import json
+import time
+import threading
+import traceback
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import numpy as np
+import pandas as pd
+
+# Add the src directory and the repository root (shared market_data package) to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from session_arrays import build_session_arrays
+from market_data.instrumentation import span, increment
+from state_managed_golden_gate_analysis import calculate_atr_pine_script, create_daily_bars_from_10min
+from gap_fill_analysis import find_10min_files, measure_gap_fills, summarize_fills, GAP_THRESHOLD_PCT
+from cross_asset_cotrigger_analysis import symbol_events, TARGET_ATR_MULTIPLE
+from extract_trading_insights import load_insights_cube
+from insights_cube import FILTERS
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+ATR_PERIOD = 14
+BAR_COLUMNS = ['date', 'open', 'high', 'low', 'close', 'volume']
+ARRAY_KEYS = ['dates', 'ticker', 'open', 'high', 'low', 'close', 'previous_close', 'previous_atr', 'has_open_bar']
+
+
+def extend_atr(previous_close, previous_atr, daily_bars, period=ATR_PERIOD):
+    """
+    Continue the Pine Script RMA over appended daily bars
+
+    Matches calculate_atr_pine_script() for rows past the warm-up period,
+    given the close and ATR of the last already-processed day.
+    """
+    high = daily_bars['high'].to_numpy(dtype=float)
+    low = daily_bars['low'].to_numpy(dtype=float)
+    close = daily_bars['close'].to_numpy(dtype=float)
+    prev_close = np.concatenate([[previous_close], close[:-1]])
+    true_range = np.max([high - low, np.abs(high - prev_close), np.abs(low - prev_close)], axis=0)
+
+    atr = np.empty(len(true_range))
+    rma = previous_atr
+    for i, tr in enumerate(true_range):
+        rma = (rma * (period - 1) + tr) / period
+        atr[i] = rma
+    return atr
+
+
+class TickerStore:
+    """One ticker's 10-minute bars, daily ATR state and session arrays, kept in memory"""
+
+    def __init__(self, ticker, data_file):
+        self.ticker = ticker
+        self.data_file = data_file
+        self.lock = threading.RLock()
+        self.cache = {}
+        self.load()
+
+    def _read_complete_lines(self, offset):
+        """Bytes from offset up to the last complete line, and the new offset"""
+        with open(self.data_file, 'rb') as f:
+            f.seek(offset)
+            chunk = f.read()
+        end = chunk.rfind(b'\n') + 1
+        return chunk[:end], offset + end
+
+    def load(self):
+        """Full (re)load of the store"""
+        with self.lock, span('load', ticker=self.ticker):
+            content, self.offset = self._read_complete_lines(0)
+            bars = pd.read_csv(io.BytesIO(content))
+            self.columns = list(bars.columns)
+            bars = bars[[c for c in BAR_COLUMNS if c in bars.columns]]
+            bars['date'] = pd.to_datetime(bars['date'])
+            self.bars = bars.sort_values('date').reset_index(drop=True)
+
+            with span('atr', ticker=self.ticker):
+                daily_bars = create_daily_bars_from_10min(self.bars.copy())
+                daily_bars['atr'] = calculate_atr_pine_script(daily_bars['high'], daily_bars['low'],
+                                                              daily_bars['close'], ATR_PERIOD)
+            self.daily_bars = daily_bars
+            self.arrays = self._session_arrays(self.bars, daily_bars.iloc[ATR_PERIOD:].reset_index(drop=True))
+            self.cache = {}
+            self.loaded_at = datetime.now()
+
+    def _session_arrays(self, bars, daily_bars):
+        arrays = build_session_arrays(bars, daily_bars)
+        arrays['ticker'] = np.full(len(arrays['dates']), self.ticker, dtype=object)
+        return arrays
+
+    def refresh(self):
+        """
+        Ingest bars appended to the store since the last read
+
+        Returns:
+            int: Number of new bars (a shrunk or rewritten file triggers a full reload)
+        """
+        with self.lock:
+            if os.path.getsize(self.data_file) < self.offset:
+                self.load()
+                return len(self.bars)
+            content, offset = self._read_complete_lines(self.offset)
+            if not content:
+                return 0
+
+            new_bars = pd.read_csv(io.BytesIO(content), header=None, names=self.columns)
+            new_bars = new_bars[[c for c in BAR_COLUMNS if c in new_bars.columns]]
+            new_bars['date'] = pd.to_datetime(new_bars['date'])
+            new_bars = new_bars[new_bars['date'] > self.bars['date'].iloc[-1]].sort_values('date')
+            self.offset = offset
+            if new_bars.empty:
+                return 0
+
+            with span('refresh', ticker=self.ticker):
+                self.bars = pd.concat([self.bars, new_bars], ignore_index=True)
+                self._rebuild_from(new_bars['date'].iloc[0].normalize())
+            increment('bars_ingested', len(new_bars), ticker=self.ticker)
+            return len(new_bars)
+
+    def _rebuild_from(self, first_day):
+        """Recompute daily bars, ATR and session arrays for sessions on/after first_day"""
+        kept_daily = self.daily_bars[pd.to_datetime(self.daily_bars['trade_date']) < first_day]
+        first_position = len(kept_daily)
+        if first_position <= ATR_PERIOD + 1:
+            # Still inside the ATR warm-up: nothing worth preserving
+            self.load()
+            return
+
+        tail_bars = self.bars[self.bars['date'] >= first_day].copy()
+        new_daily = create_daily_bars_from_10min(tail_bars)
+        new_daily['atr'] = extend_atr(kept_daily['close'].iloc[-1], kept_daily['atr'].iloc[-1], new_daily)
+        self.daily_bars = pd.concat([kept_daily, new_daily], ignore_index=True)
+
+        # Sessions take their levels from the previous day, so start one daily bar earlier
+        daily_slice = self.daily_bars.iloc[first_position - 1:].reset_index(drop=True)
+        new_arrays = self._session_arrays(tail_bars, daily_slice)
+        keep = self.arrays['dates'] < np.datetime64(first_day)
+        arrays = {'slot_minutes': self.arrays['slot_minutes']}
+        for key in ARRAY_KEYS:
+            arrays[key] = np.concatenate([self.arrays[key][keep], new_arrays[key]])
+        self.arrays = arrays
+        self.cache = {}
+
+    def session_range(self, start=None, end=None):
+        """Slice of sessions between two dates (inclusive) via the sorted day index"""
+        dates = self.arrays['dates']
+        lo = np.searchsorted(dates, np.datetime64(start), 'left') if start else 0
+        hi = np.searchsorted(dates, np.datetime64(end), 'right') if end else len(dates)
+        return slice(lo, hi)
+
+    def cached(self, key, compute):
+        """Memoize a derived table until the next refresh"""
+        with self.lock:
+            if key not in self.cache:
+                self.cache[key] = compute(self.arrays)
+            return self.cache[key]
+
+    def summary(self):
+        return {
+            'ticker': self.ticker,
+            'bars': len(self.bars),
+            'sessions': len(self.arrays['dates']),
+            'first_session': str(self.arrays['dates'][0])[:10] if len(self.arrays['dates']) else None,
+            'last_bar': str(self.bars['date'].iloc[-1]),
+            'loaded_at': self.loaded_at.strftime('%Y-%m-%d %H:%M:%S'),
+            'cached_tables': len(self.cache)
+        }
+
+
+class AnalysisState:
+    """All resident stores plus the insights cube"""
+
+    def __init__(self, data_files, with_insights=True):
+        self.stores = {}
+        for ticker, data_file in data_files.items():
+            print(f"Loading {ticker}: {data_file}")
+            self.stores[ticker] = TickerStore(ticker, data_file)
+        self.with_insights = with_insights
+        self.cube = load_insights_cube() if with_insights else None
+        self.cube_lock = threading.Lock()
+
+    def store(self, ticker):
+        ticker = (ticker or '').upper()
+        if ticker not in self.stores:
+            raise KeyError(f"Unknown ticker '{ticker}'. Loaded: {', '.join(self.stores)}")
+        return self.stores[ticker]
+
+    def refresh(self, ticker=None):
+        tickers = [self.store(ticker).ticker] if ticker else list(self.stores)
+        added = {t: self.stores[t].refresh() for t in tickers}
+        if self.with_insights:
+            with self.cube_lock:
+                self.cube = load_insights_cube()
+        return added
+
+    def golden_gate(self, ticker, start=None, end=None, target=TARGET_ATR_MULTIPLE):
+        """Gap-open and intraday trigger/completion counts for a date range"""
+        store = self.store(ticker)
+        with store.lock:
+            return self._golden_gate(store, start, end, target)
+
+    @staticmethod
+    def _golden_gate(store, start, end, target):
+        sessions = store.session_range(start, end)
+        result = {'ticker': store.ticker, 'target_atr_multiple': target}
+        for direction in ['positive', 'negative']:
+            events = store.cached(('events', direction, target),
+                                  lambda arrays: symbol_events(arrays, direction, target))
+            gap_open = events['gap_open'][sessions]
+            intraday = events['trigger'][sessions] & ~gap_open
+            completed = events['completed'][sessions]
+            counts = {
+                'gap_open': int(gap_open.sum()),
+                'gap_open_complete': int((gap_open & completed).sum()),
+                'intraday': int(intraday.sum()),
+                'intraday_complete': int((intraday & completed).sum())
+            }
+            for scenario in ['gap_open', 'intraday']:
+                events_count = counts[scenario]
+                counts[f'{scenario}_rate'] = counts[f'{scenario}_complete'] / events_count * 100 if events_count else 0
+            triggers = counts['gap_open'] + counts['intraday']
+            completions = counts['gap_open_complete'] + counts['intraday_complete']
+            counts['combined_rate'] = completions / triggers * 100 if triggers else 0
+            result[direction] = counts
+        result['sessions'] = int(store.arrays['has_open_bar'][sessions].sum())
+        return result
+
+    def gap_fill(self, ticker, start=None, end=None, threshold_pct=GAP_THRESHOLD_PCT, group='atr_bucket'):
+        """Gap-fill summary for a date range, grouped by one or more result columns"""
+        store = self.store(ticker)
+        fills = store.cached(('gap_fill', threshold_pct), lambda arrays: measure_gap_fills(arrays, threshold_pct))
+        # The cached table is never mutated, so filtering needs no lock
+        if start or end:
+            dates = pd.to_datetime(fills['date'])
+            keep = np.ones(len(fills), dtype=bool)
+            if start:
+                keep &= (dates >= pd.Timestamp(start)).to_numpy()
+            if end:
+                keep &= (dates <= pd.Timestamp(end)).to_numpy()
+            fills = fills[keep]
+        group_cols = [c for c in group.split(',') if c]
+        unknown = [c for c in group_cols if c not in fills.columns]
+        if unknown:
+            raise KeyError(f"Unknown group column(s): {', '.join(unknown)}")
+        if fills.empty:
+            return {'ticker': store.ticker, 'gaps': 0, 'groups': []}
+        return {'ticker': store.ticker, 'gaps': len(fills),
+                'groups': summarize_fills(fills, group_cols).to_dict('records')}
+
+    def insights(self, checkpoint=None, **filters):
+        """Insights cube counts and rates; conditional completion when a checkpoint is given"""
+        if self.cube is None:
+            raise KeyError("Insights cube is not loaded")
+        with self.cube_lock:
+            cube = self.cube
+        result = {'filters': filters, **cube.query(checkpoint=checkpoint, **filters)}
+        result['completion_rate'] = cube.completion_rate(**filters)
+        if checkpoint is not None:
+            result['completion_rate_by_checkpoint'] = cube.completion_rate(checkpoint=checkpoint, **filters)
+            result['conditional_completion'] = cube.conditional_completion(checkpoint, **dict(filters))
+        return result
+
+
+def _jsonable(value):
+    """Convert NumPy/pandas values (and NaN) into JSON-safe Python values"""
+    if isinstance(value, dict):
+        return {str(k): _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not np.isfinite(value):
+        return None
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+
+def _list_or_value(values, cast=str):
+    items = [cast(v) for value in values for v in value.split(',') if v]
+    return items[0] if len(items) == 1 else items
+
+
+class AnalysisRequestHandler(BaseHTTPRequestHandler):
+    """Routes GET/POST requests to AnalysisState"""
+
+    def _params(self):
+        return {key: values for key, values in parse_qs(urlparse(self.path).query).items()}
+
+    def _send(self, status, payload):
+        body = json.dumps(_jsonable(payload)).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _route(self):
+        state = self.server.state
+        route = urlparse(self.path).path.rstrip('/')
+        params = self._params()
+        first = lambda key, default=None: params[key][0] if key in params else default
+
+        if route == '/tickers':
+            return [store.summary() for store in state.stores.values()]
+        if route == '/golden_gate':
+            return state.golden_gate(first('ticker'), first('start'), first('end'),
+                                     float(first('target', TARGET_ATR_MULTIPLE)))
+        if route == '/gap_fill':
+            return state.gap_fill(first('ticker'), first('start'), first('end'),
+                                  float(first('threshold_pct', GAP_THRESHOLD_PCT)), first('group', 'atr_bucket'))
+        if route == '/insights':
+            unknown = [key for key in params if key != 'checkpoint' and key not in FILTERS]
+            if unknown:
+                raise ValueError(f"Unknown insights filter(s): {', '.join(unknown)}. Filters: {', '.join(FILTERS)}")
+            filters = {key: _list_or_value(values, int if key == 'year' else str)
+                       for key, values in params.items() if key != 'checkpoint'}
+            return state.insights(first('checkpoint'), **filters)
+        if route == '/refresh':
+            return {'added_bars': state.refresh(first('ticker'))}
+        raise LookupError(f"Unknown endpoint {route}")
+
+    def _handle(self):
+        start = time.perf_counter()
+        try:
+            with span('query', endpoint=urlparse(self.path).path):
+                payload = self._route()
+            status = 200
+        except KeyError as e:
+            status, payload = 400, {'error': e.args[0]}
+        except LookupError as e:
+            status, payload = 404, {'error': str(e)}
+        except ValueError as e:
+            status, payload = 400, {'error': str(e)}
+        except Exception as e:
+            # Always answer; the traceback goes to the server log
+            traceback.print_exc()
+            status, payload = 500, {'error': f"{type(e).__name__}: {e}"}
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if isinstance(payload, dict):
+            payload['elapsed_ms'] = round(elapsed_ms, 3)
+        self._send(status, payload)
+
+    do_GET = _handle
+    do_POST = _handle
+
+    def log_message(self, format, *args):
+        print(f"{self.log_date_time_string()} {self.address_string()} {format % args}")
+
+
+def poll_for_new_bars(state, interval_seconds):
+    """Background refresh loop (daemon thread)"""
+    while True:
+        time.sleep(interval_seconds)
+        added = state.refresh()
+        if any(added.values()):
+            print(f"Refreshed: {', '.join(f'{t} +{n}' for t, n in added.items() if n)}")
+
+
+def create_server(state, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    server = ThreadingHTTPServer((host, port), AnalysisRequestHandler)
+    server.state = state
+    return server
+
+
+def main(host=DEFAULT_HOST, port=DEFAULT_PORT, poll_seconds=60, tickers=None):
+    """Load every 10-minute store once and serve queries until interrupted"""
+    print("=" * 100)
+    print("RESIDENT GOLDEN GATE ANALYSIS SERVER")
+    print("=" * 100)
+
+    data_root = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'ticker_data')
+    data_files = find_10min_files(data_root)
+    if tickers:
+        data_files = {t: f for t, f in data_files.items() if t in tickers}
+    if not data_files:
+        print(f"Error: no 10-minute data found under {data_root}")
+        return
+
+    start = datetime.now()
+    state = AnalysisState(data_files)
+    print(f"Loaded {len(state.stores)} tickers in {(datetime.now() - start).total_seconds():.1f}s")
+
+    if poll_seconds:
+        threading.Thread(target=poll_for_new_bars, args=(state, poll_seconds), daemon=True).start()
+
+    server = create_server(state, host, port)
+    print(f"Serving on http://{host}:{port} (refresh every {poll_seconds}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+ATR Regime Analysis - Golden Gate Completion by Volatility Regime
+Splits every scenario table by the rolling percentile regime of the ATR its
+levels were built from (see src/atr_regimes.py):
+
+- Enhanced daily scenarios (SPY/QQQ): gap-open, intraday and combined rates
+- State-managed SPX scenarios: gap-open and intraday rates
+
+Each table is produced for every lookback so regime sensitivity to the
+lookback length can be compared side by side.
+"""
+
+import sys
+import os
+from datetime import datetime
+import pandas as pd
+
+# Add the src directory and the repository root (shared market_data package) to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from atr_regimes import DEFAULT_LOOKBACK, DEFAULT_LOOKBACKS, REGIMES, session_regimes, add_regime_columns
+from bootstrap_confidence_intervals import RATE_METRICS
+from enhanced_golden_gate_analysis import calculate_daily_scenario_flags
+from state_managed_golden_gate_analysis import calculate_atr_pine_script
+from result_store import load_results
+
+
+def load_daily_flags_with_regimes(data_file, lookbacks=DEFAULT_LOOKBACKS):
+    """Daily scenario flags with per-lookback ATR regime columns"""
+    data = pd.read_csv(data_file)
+    data['date'] = pd.to_datetime(data['date'])
+    data = data.sort_values('date').reset_index(drop=True)
+    data['atr'] = calculate_atr_pine_script(data['high'], data['low'], data['close'], 14)
+
+    # Percentiles are ranked over the full ATR history; warm-up rows are dropped afterwards
+    regimes = session_regimes(data, lookbacks)
+    data = data.iloc[14:].dropna(subset=['atr']).reset_index(drop=True)
+    flags = calculate_daily_scenario_flags(data)
+    lookback = DEFAULT_LOOKBACK if DEFAULT_LOOKBACK in lookbacks else lookbacks[-1]
+    return add_regime_columns(flags, regimes, lookback=lookback)
+
+
+def regime_rate_table(flags, lookbacks=DEFAULT_LOOKBACKS):
+    """
+    Enhanced completion rates per regime and lookback
+
+    Returns:
+        pd.DataFrame: One row per (lookback, regime, metric)
+    """
+    rows = []
+    for window in lookbacks:
+        for regime, subset in flags.groupby(f"atr_regime_{window}"):
+            for metric, (scenario_cols, completed_col) in RATE_METRICS.items():
+                if isinstance(scenario_cols, tuple):
+                    triggered = subset[list(scenario_cols)].any(axis=1)
+                else:
+                    triggered = subset[scenario_cols]
+                events = int(triggered.sum())
+                completions = int((triggered & subset[completed_col]).sum())
+                rows.append({
+                    'lookback': window,
+                    'atr_regime': regime,
+                    'metric': metric,
+                    'sessions': len(subset),
+                    'events': events,
+                    'completions': completions,
+                    'rate': completions / events * 100 if events > 0 else 0
+                })
+    return pd.DataFrame(rows)
+
+
+def state_managed_regime_table(results, direction_col, lookbacks=DEFAULT_LOOKBACKS):
+    """State-managed completion rates per regime, direction and lookback"""
+    frames = []
+    for window in lookbacks:
+        table = results.groupby([f"atr_regime_{window}", direction_col])['target_reached'].agg(['size', 'sum']).reset_index()
+        table.columns = ['atr_regime', 'direction', 'events', 'completions']
+        table['rate'] = table['completions'] / table['events'] * 100
+        table.insert(0, 'lookback', window)
+        frames.append(table)
+    return pd.concat(frames, ignore_index=True)
+
+
+def print_regime_rates(table, metric_col, lookback):
+    """Print one lookback's rates as a regime x metric grid"""
+    subset = table[table['lookback'] == lookback]
+    grid = subset.pivot_table(index=metric_col, columns='atr_regime', values='rate')
+    events = subset.pivot_table(index=metric_col, columns='atr_regime', values='events', aggfunc='sum')
+    regimes = [r for r in REGIMES if r in grid.columns]
+    print(f"  {'':<26}" + "".join(f"{r:>16}" for r in regimes))
+    for name in grid.index:
+        # A metric with no events in a regime (sparse tickers, short lookbacks) has no cell
+        cells = "".join(f"{'—':>16}" if pd.isna(events.loc[name, r]) or pd.isna(grid.loc[name, r])
+                        else f"{grid.loc[name, r]:>8.1f}% ({int(events.loc[name, r]):>4})" for r in regimes)
+        print(f"  {name:<26}{cells}")
+
+
+def main():
+    """Split Golden Gate completion rates by ATR percentile regime"""
+    print("=" * 100)
+    print("GOLDEN GATE COMPLETION BY ATR REGIME")
+    print(f"Rolling ATR% percentile lookbacks: {', '.join(str(w) for w in DEFAULT_LOOKBACKS)} sessions "
+          f"| low < 33rd <= mid < 67th <= high")
+    print("=" * 100)
+
+    tickers = {
+        'SPY': '../../data/ticker_data/SPY/daily/SPY_daily_2000_to_present.csv',
+        'QQQ': '../../data/ticker_data/QQQ/daily/QQQ_daily_2000_to_present.csv'
+    }
+    results_dir = os.path.join('data', 'analysis_results')
+    os.makedirs(results_dir, exist_ok=True)
+
+    for ticker, data_file in tickers.items():
+        if not os.path.exists(data_file):
+            print(f"Data file not found for {ticker}: {data_file}")
+            continue
+
+        start = datetime.now()
+        flags = load_daily_flags_with_regimes(data_file)
+        table = regime_rate_table(flags)
+        elapsed = (datetime.now() - start).total_seconds()
+
+        output_file = os.path.join(results_dir, f"{ticker}_enhanced_golden_gate_by_regime.csv")
+        table.to_csv(output_file, index=False)
+
+        print(f"\n{ticker} ({len(flags):,} sessions, {elapsed:.2f}s) - {DEFAULT_LOOKBACK}-session lookback:")
+        print_regime_rates(table, 'metric', DEFAULT_LOOKBACK)
+        print(f"  Saved: {output_file}")
+
+    # State-managed SPX tables already carry the regime columns
+    state_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'analysis_results')
+    for scenario, filename, direction_col in [('gap_open', 'state_managed_gap_open_results.csv', 'gap_open_type'),
+                                              ('intraday', 'state_managed_intraday_results.csv', 'trigger_type')]:
+        results_file = os.path.join(state_dir, filename)
+        results = load_results(f"state_managed_{scenario}", results_file, state_dir)
+        if results is None:
+            print(f"\nState-managed results not found: {results_file}")
+            continue
+        if f"atr_regime_{DEFAULT_LOOKBACKS[0]}" not in results.columns:
+            print(f"\n{filename} has no regime columns - rerun state_managed_golden_gate_analysis.py")
+            continue
+
+        table = state_managed_regime_table(results, direction_col)
+        output_file = os.path.join(state_dir, f"state_managed_{scenario}_by_regime.csv")
+        table.to_csv(output_file, index=False)
+
+        print(f"\nSPX STATE-MANAGED {scenario.upper()} - {DEFAULT_LOOKBACK}-session lookback:")
+        print_regime_rates(table, 'direction', DEFAULT_LOOKBACK)
+        print(f"  Saved: {output_file}")
+
+
+if __name__ == "__main__":
+    main()
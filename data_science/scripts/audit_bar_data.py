@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Bar Data Audit - Checks Every Ticker Store Before Analysis
+Reads each 10-minute and daily CSV under data/ticker_data and reports per file:
+
+- rows and date range
+- duplicate and out-of-order timestamps
+- missing prices, non-positive prices and bars whose high/low do not contain
+  the open and close
+
+Files with missing columns, duplicate or out-of-order timestamps fail the
+audit (the analyses assume one sorted bar per timestamp); the other findings
+are warnings. The table is written to data/analysis_results/data_audit.csv
+and the script exits non-zero on failure, so the pipeline runner stops
+before analysing bad data.
+"""
+
+import sys
+import os
+import glob
+import numpy as np
+import pandas as pd
+
+REQUIRED_COLUMNS = ['date', 'open', 'high', 'low', 'close']
+BAR_SIZES = ['10min', 'daily']
+
+
+def find_bar_files(data_root):
+    """(ticker, bar size, path) for every store CSV under data_root"""
+    files = []
+    for bar_size in BAR_SIZES:
+        for path in sorted(glob.glob(os.path.join(data_root, '*', bar_size, '*.csv'))):
+            ticker = os.path.basename(os.path.dirname(os.path.dirname(path)))
+            files.append((ticker, bar_size, path))
+    return files
+
+
+def audit_bars(data):
+    """
+    Audit one bar frame
+
+    Returns:
+        dict: Counts of each finding plus status ('ok', 'warn' or 'fail')
+    """
+    missing = [col for col in REQUIRED_COLUMNS if col not in data.columns]
+    if missing:
+        return {'rows': len(data), 'status': 'fail', 'problem': f"missing columns: {', '.join(missing)}"}
+
+    dates = pd.to_datetime(data['date'])
+    prices = data[['open', 'high', 'low', 'close']].to_numpy(dtype=np.float64)
+    open_, high, low, close = prices.T
+    with np.errstate(invalid='ignore'):
+        findings = {
+            'duplicate_timestamps': int(dates.duplicated().sum()),
+            'out_of_order': int((dates.diff().dt.total_seconds() < 0).sum()),
+            'missing_prices': int(np.isnan(prices).any(axis=1).sum()),
+            'non_positive_prices': int((prices <= 0).any(axis=1).sum()),
+            'inconsistent_bars': int(((high < np.maximum(open_, close)) | (low > np.minimum(open_, close))).sum())
+        }
+
+    if findings['duplicate_timestamps'] or findings['out_of_order']:
+        status = 'fail'
+    elif findings['missing_prices'] or findings['non_positive_prices'] or findings['inconsistent_bars']:
+        status = 'warn'
+    else:
+        status = 'ok'
+    problem = ', '.join(f"{name.replace('_', ' ')}: {count}" for name, count in findings.items() if count)
+
+    return {
+        'rows': len(data),
+        'first_date': dates.min(),
+        'last_date': dates.max(),
+        **findings,
+        'status': status,
+        'problem': problem
+    }
+
+
+def main():
+    """Audit every ticker store and save the audit table"""
+    print("=" * 100)
+    print("BAR DATA AUDIT")
+    print("=" * 100)
+
+    data_root = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'ticker_data')
+    files = find_bar_files(data_root)
+    if not files:
+        print(f"Error: no bar data found under {data_root}")
+        return None
+
+    rows = []
+    for ticker, bar_size, path in files:
+        try:
+            result = audit_bars(pd.read_csv(path))
+        except (OSError, ValueError) as e:
+            result = {'rows': 0, 'status': 'fail', 'problem': f"unreadable: {e}"}
+        rows.append({'ticker': ticker, 'bar_size': bar_size, 'file': os.path.basename(path), **result})
+        print(f"{ticker:<6} {bar_size:<6} {result['rows']:>9,} rows  {result['status'].upper():<5} {result['problem']}")
+
+    audit = pd.DataFrame(rows)
+    results_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'analysis_results')
+    os.makedirs(results_dir, exist_ok=True)
+    output_file = os.path.join(results_dir, 'data_audit.csv')
+    audit.to_csv(output_file, index=False)
+
+    failed = audit[audit['status'] == 'fail']
+    print(f"\n{len(audit)} files audited: {(audit['status'] == 'ok').sum()} ok, "
+          f"{(audit['status'] == 'warn').sum()} with warnings, {len(failed)} failed")
+    print(f"Audit saved to: {output_file}")
+    return audit
+
+
+if __name__ == "__main__":
+    audit = main()
+    sys.exit(1 if audit is None or (audit['status'] == 'fail').any() else 0)
@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+Hot-Path Benchmark Suite
+Times the analysis hot paths on fixed synthetic datasets of growing size and
+guards optimizations against behaviour changes:
+
+- calculate_atr_pine_script, analyze_year_subset (enhanced, daily bars)
+- create_daily_bars_from_10min, analyze_state_managed_scenarios (10-minute bars)
+- StockDataPipeline.process_data (both pipelines, raw IBKR-style bars)
+
+Datasets grow along two axes: 1/10/100 years of one symbol and 1/14/500
+symbols of one year, generated deterministically by
+generate_synthetic_market_data. Each run records wall time, throughput,
+peak traced memory and a fingerprint (hash) of the output, then compares
+against the stored baseline: slower runs are flagged as regressions and a
+changed fingerprint means the output is no longer identical. Benchmarks in
+SLOW_BENCHMARK_DATASETS run on the small datasets only, and every result is
+appended to the results file as soon as it is measured.
+
+Parity checks additionally run each optimized implementation next to its
+reference implementation on the same data and require exactly equal output.
+"""
+
+import sys
+import os
+import io
+import json
+import time
+import logging
+import tracemalloc
+import importlib.util
+from contextlib import redirect_stdout
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+# Add the src directory and the repository root (shared market_data package) to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from generate_synthetic_market_data import generate_frame, synthetic_symbols
+from enhanced_golden_gate_analysis import (calculate_atr_pine_script, analyze_year_subset,
+                                           calculate_daily_scenario_flags)
+from state_managed_golden_gate_analysis import create_daily_bars_from_10min, analyze_state_managed_scenarios
+
+BENCHMARK_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'benchmarks')
+BASELINE_FILE = os.path.join(BENCHMARK_DIR, 'hot_path_baseline.json')
+RESULTS_FILE = os.path.join(BENCHMARK_DIR, 'hot_path_benchmarks.csv')
+
+# (label, years, symbols)
+DATASETS = [
+    ('1y_1sym', 1, 1),
+    ('10y_1sym', 10, 1),
+    ('100y_1sym', 100, 1),
+    ('1y_14sym', 1, 14),
+    ('1y_500sym', 1, 500)
+]
+
+# Benchmarks too slow for the larger datasets (the per-session state-managed
+# loop takes minutes on 10 years of one symbol), timed on these only
+SLOW_BENCHMARK_DATASETS = {
+    'analyze_state_managed_scenarios': ('1y_1sym',)
+}
+
+# Slower than baseline by more than this fraction counts as a regression
+REGRESSION_TOLERANCE = 0.25
+# Differences below this many seconds are timer noise, not regressions
+REGRESSION_MIN_SECONDS = 0.05
+
+RAW_BAR_COLUMNS = ['date', 'open', 'high', 'low', 'close', 'volume', 'average', 'barCount']
+
+_dataset_cache = {}
+
+
+def dataset_symbols(n_symbols):
+    """Fixed symbol list: the real symbols first, then synthetic placeholders"""
+    real = ['SPX', 'SPY', 'QQQ', 'NDX', 'AAPL', 'MSFT', 'GOOGL', 'GOOG', 'AMZN', 'TSLA', 'META', 'NVDA', 'ES', 'NQ']
+    return (real + synthetic_symbols(max(0, n_symbols - len(real))))[:n_symbols]
+
+
+def load_dataset(years, n_symbols, bar_minutes):
+    """Deterministic synthetic dataset: {symbol: frame} (cached for the run)"""
+    key = (years, n_symbols, bar_minutes)
+    if key not in _dataset_cache:
+        end_year = 2024
+        start = f"{end_year - years + 1}-01-01"
+        _dataset_cache[key] = {
+            symbol: generate_frame(symbol, start, f"{end_year}-12-31", bar_minutes, seed=i)
+            for i, symbol in enumerate(dataset_symbols(n_symbols))
+        }
+    return _dataset_cache[key]
+
+
+def _load_module(name, path):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def offline_pipeline(pipeline_class):
+    """Pipeline instance for process_data() only: skips __init__ so no IBKR connection is made"""
+    pipeline = pipeline_class.__new__(pipeline_class)
+    pipeline.logger = logging.getLogger('benchmark_pipeline')
+    return pipeline
+
+
+def load_pipelines():
+    """Both StockDataPipeline classes that are importable here, keyed by benchmark name"""
+    root = os.path.join(os.path.dirname(__file__), '..', '..')
+    candidates = {
+        'process_data': os.path.join(root, 'src', 'stock_data_pipeline.py'),
+        'process_data_data_science': os.path.join(root, 'data_science', 'src', 'stock_data_pipeline.py')
+    }
+    pipelines = {}
+    for name, path in candidates.items():
+        try:
+            module = _load_module(f"benchmark_{name}", path)
+            pipelines[name] = offline_pipeline(module.StockDataPipeline)
+        except Exception as e:
+            print(f"  Skipping {name}: cannot import {path} ({e})")
+    return pipelines
+
+
+def fingerprint(output):
+    """Order-sensitive hash of a benchmark's output frame (exact float bits)"""
+    if output is None or len(output) == 0:
+        return 'empty'
+    hashed = pd.util.hash_pandas_object(output.reset_index(drop=True), index=True).to_numpy()
+    weights = np.arange(1, len(hashed) + 1, dtype=np.uint64)
+    return format(int((hashed * weights).sum()), '016x')
+
+
+# ---------------------------------------------------------------------------
+# Benchmarks: setup(dataset) is untimed, run(prepared) is timed and returns a
+# DataFrame that is fingerprinted. 'rows' is the number of input rows.
+# ---------------------------------------------------------------------------
+
+def _setup_atr(dataset):
+    return [frame[['high', 'low', 'close']] for frame in dataset.values()]
+
+
+def _run_atr(frames):
+    return pd.concat([calculate_atr_pine_script(f['high'], f['low'], f['close'], 14) for f in frames],
+                     ignore_index=True).to_frame('atr')
+
+
+def _setup_year_subset(dataset):
+    prepared = []
+    for symbol, frame in dataset.items():
+        data = frame[['date', 'open', 'high', 'low', 'close']].copy()
+        data['atr'] = calculate_atr_pine_script(data['high'], data['low'], data['close'], 14)
+        data = data.iloc[14:].dropna(subset=['atr']).reset_index(drop=True)
+        data['year'] = data['date'].dt.year
+        prepared.append((symbol, [(year, group.reset_index(drop=True)) for year, group in data.groupby('year')]))
+    return prepared
+
+
+def _run_year_subset(prepared):
+    rows = []
+    for symbol, years in prepared:
+        for year, year_data in years:
+            result = analyze_year_subset(year_data, year, symbol)
+            if result:
+                rows.append(result)
+    return pd.DataFrame(rows).drop(columns=['start_date', 'end_date'], errors='ignore')
+
+
+def _setup_daily_bars(dataset):
+    return [frame[['date', 'open', 'high', 'low', 'close', 'volume']].copy() for frame in dataset.values()]
+
+
+def _run_daily_bars(frames):
+    with redirect_stdout(io.StringIO()):
+        return pd.concat([create_daily_bars_from_10min(f) for f in frames], ignore_index=True)
+
+
+def _setup_state_managed(dataset):
+    prepared = []
+    with redirect_stdout(io.StringIO()):
+        for frame in dataset.values():
+            data_10min = frame[['date', 'open', 'high', 'low', 'close', 'volume']].copy()
+            prepared.append((data_10min, create_daily_bars_from_10min(data_10min.copy())))
+    return prepared
+
+
+def _run_state_managed(prepared):
+    outputs = []
+    with redirect_stdout(io.StringIO()):
+        for data_10min, daily_bars in prepared:
+            gap_open, intraday = analyze_state_managed_scenarios(data_10min, daily_bars.copy())
+            outputs += [gap_open.assign(scenario='gap'), intraday.assign(scenario='intraday')]
+    return pd.concat(outputs, ignore_index=True)
+
+
+def _process_data_benchmark(pipeline):
+    def setup(dataset):
+        return [(symbol, frame[RAW_BAR_COLUMNS].copy()) for symbol, frame in dataset.items()]
+
+    def run(raw_frames):
+        return pd.concat([pipeline.process_data(raw.copy(), symbol) for symbol, raw in raw_frames], ignore_index=True)
+
+    return setup, run
+
+
+def build_benchmarks():
+    """name -> (bar_minutes (None = daily), setup, run)"""
+    benchmarks = {
+        'calculate_atr_pine_script': (None, _setup_atr, _run_atr),
+        'analyze_year_subset': (None, _setup_year_subset, _run_year_subset),
+        'create_daily_bars_from_10min': (10, _setup_daily_bars, _run_daily_bars),
+        'analyze_state_managed_scenarios': (10, _setup_state_managed, _run_state_managed)
+    }
+    for name, pipeline in load_pipelines().items():
+        setup, run = _process_data_benchmark(pipeline)
+        benchmarks[name] = (None, setup, run)
+    return benchmarks
+
+
+# ---------------------------------------------------------------------------
+# Parity checks: (reference, candidate) on the same prepared input must match exactly
+# ---------------------------------------------------------------------------
+
+def _year_subset_counts_vectorized(prepared):
+    rows = []
+    for symbol, years in prepared:
+        for year, year_data in years:
+            if len(year_data) < 2:
+                continue
+            flags = calculate_daily_scenario_flags(year_data)
+            row = {'ticker': symbol, 'year': year, 'total_days': len(year_data) - 1}
+            for direction in ['positive', 'negative']:
+                for scenario in ['gap_open', 'intraday']:
+                    triggered = flags[f'{scenario}_{direction}']
+                    row[f'{scenario}_{direction}'] = int(triggered.sum())
+                    row[f'{scenario}_{direction}_complete'] = int((triggered & flags[f'completed_{direction}']).sum())
+            rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def _year_subset_counts_reference(prepared):
+    results = _run_year_subset(prepared)
+    return results[[c for c in results.columns if not c.endswith('_rate')]]
+
+
+PARITY_CHECKS = {
+    'analyze_year_subset vs calculate_daily_scenario_flags': (
+        None, _setup_year_subset, _year_subset_counts_reference, _year_subset_counts_vectorized
+    )
+}
+
+
+def run_parity_checks(datasets):
+    """Run every reference/candidate pair; returns rows with match status"""
+    rows = []
+    for name, (bar_minutes, setup, reference, candidate) in PARITY_CHECKS.items():
+        for label, years, n_symbols in datasets:
+            prepared = setup(load_dataset(years, n_symbols, bar_minutes))
+            expected = reference(prepared).reset_index(drop=True)
+            actual = candidate(prepared).reset_index(drop=True)
+            try:
+                pd.testing.assert_frame_equal(expected, actual[expected.columns], check_exact=True, check_dtype=False)
+                status, detail = 'match', ''
+            except (AssertionError, KeyError) as e:
+                status, detail = 'MISMATCH', str(e).splitlines()[0]
+            rows.append({'check': name, 'dataset': label, 'status': status, 'detail': detail})
+    return rows
+
+
+def time_benchmark(setup, run, dataset, repeats=1, measure_memory=True):
+    """Best-of-N wall time, peak traced memory and output of one benchmark"""
+    prepared = setup(dataset)
+    seconds = []
+    output = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        output = run(prepared)
+        seconds.append(time.perf_counter() - start)
+
+    peak_mb = np.nan
+    if measure_memory:
+        # Separate run: tracing slows allocation-heavy code and would skew the timing
+        tracemalloc.start()
+        run(prepared)
+        peak_mb = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+        tracemalloc.stop()
+    return min(seconds), peak_mb, output
+
+
+def load_baseline(path=BASELINE_FILE):
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return {}
+
+
+def append_result(row, run_at, path=RESULTS_FILE):
+    """Append one benchmark row to the results CSV"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    exists = os.path.exists(path)
+    pd.DataFrame([{'run_at': run_at, **row}]).to_csv(path, mode='a' if exists else 'w', header=not exists, index=False)
+
+
+def save_baseline(results, path=BASELINE_FILE):
+    """Store the run as the new baseline (timings and output fingerprints)"""
+    baseline = load_baseline(path)
+    for row in results:
+        baseline.setdefault(row['benchmark'], {})[row['dataset']] = {
+            'seconds': row['seconds'],
+            'rows_per_sec': row['rows_per_sec'],
+            'peak_mb': row['peak_mb'],
+            'fingerprint': row['fingerprint']
+        }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+
+
+def compare_with_baseline(row, baseline):
+    """Add speedup, regression and output-parity columns from the stored baseline"""
+    stored = baseline.get(row['benchmark'], {}).get(row['dataset'])
+    if stored is None:
+        return {**row, 'baseline_seconds': np.nan, 'speedup': np.nan, 'status': 'new', 'output': 'new'}
+    speedup = stored['seconds'] / row['seconds'] if row['seconds'] > 0 else np.nan
+    slower = row['seconds'] - stored['seconds'] > REGRESSION_MIN_SECONDS
+    status = 'REGRESSION' if slower and speedup < 1 / (1 + REGRESSION_TOLERANCE) else 'ok'
+    output = 'match' if stored['fingerprint'] == row['fingerprint'] else 'CHANGED'
+    return {**row, 'baseline_seconds': stored['seconds'], 'speedup': speedup, 'status': status, 'output': output}
+
+
+def run_benchmarks(max_years=10, max_symbols=14, repeats=3, measure_memory=True, update_baseline=False, only=None,
+                   run_at=None):
+    """
+    Run the suite on every dataset within the size limits
+
+    Args:
+        max_years (int): Largest history to include (100 for the full nightly grid)
+        max_symbols (int): Largest symbol count to include (500 for the full nightly grid)
+        repeats (int): Timed repetitions per benchmark (best is kept)
+        measure_memory (bool): Also record peak traced memory
+        update_baseline (bool): Store this run as the new baseline
+        only (list): Benchmark names to run (default: all)
+        run_at (str): Run timestamp; when set, each row is appended to RESULTS_FILE as it completes
+
+    Returns:
+        tuple: (benchmark rows, parity rows)
+    """
+    datasets = [d for d in DATASETS if d[1] <= max_years and d[2] <= max_symbols]
+    benchmarks = build_benchmarks()
+    baseline = load_baseline()
+
+    rows = []
+    for name, (bar_minutes, setup, run) in benchmarks.items():
+        if only and name not in only:
+            continue
+        for label, years, n_symbols in datasets:
+            if name in SLOW_BENCHMARK_DATASETS and label not in SLOW_BENCHMARK_DATASETS[name]:
+                continue
+            dataset = load_dataset(years, n_symbols, bar_minutes)
+            n_rows = sum(len(frame) for frame in dataset.values())
+            seconds, peak_mb, output = time_benchmark(setup, run, dataset, repeats, measure_memory)
+            row = {
+                'benchmark': name,
+                'dataset': label,
+                'rows': n_rows,
+                'seconds': round(seconds, 4),
+                'rows_per_sec': round(n_rows / seconds) if seconds > 0 else np.nan,
+                'peak_mb': round(peak_mb, 1) if not np.isnan(peak_mb) else np.nan,
+                'fingerprint': fingerprint(output)
+            }
+            rows.append(compare_with_baseline(row, baseline))
+            result = rows[-1]
+            print(f"  {name:<34} {label:<10} {n_rows:>10,} rows {seconds:>9.3f}s {result['rows_per_sec']:>12,.0f} rows/s "
+                  f"{result['peak_mb']:>8.1f} MB  {result['status']:<10} output {result['output']}", flush=True)
+            if run_at:
+                append_result(result, run_at)
+
+    parity = run_parity_checks(datasets)
+    if update_baseline:
+        save_baseline(rows)
+    return rows, parity
+
+
+def main(max_years=10, max_symbols=14, repeats=3, update_baseline=False):
+    """Run the hot-path benchmarks (pass max_years=100, max_symbols=500 for the full grid)"""
+    print("=" * 120)
+    print("HOT-PATH BENCHMARKS")
+    print(f"Datasets up to {max_years} years / {max_symbols} symbols | regression tolerance {REGRESSION_TOLERANCE:.0%}")
+    print("=" * 120)
+
+    start = datetime.now()
+    print(f"Results appended to: {RESULTS_FILE}")
+    rows, parity = run_benchmarks(max_years, max_symbols, repeats, update_baseline=update_baseline,
+                                  run_at=start.strftime('%Y-%m-%d %H:%M:%S'))
+
+    print("\nPARITY CHECKS:")
+    for check in parity:
+        print(f"  {check['check']:<56} {check['dataset']:<10} {check['status']} {check['detail']}")
+
+    results = pd.DataFrame(rows)
+    if update_baseline:
+        print(f"Baseline updated: {BASELINE_FILE}")
+
+    regressions = results[results['status'] == 'REGRESSION']
+    changed = results[results['output'] == 'CHANGED']
+    mismatches = [p for p in parity if p['status'] != 'match']
+    print(f"\nRegressions: {len(regressions)} | changed outputs: {len(changed)} | parity mismatches: {len(mismatches)}")
+    print(f"Total time: {(datetime.now() - start).total_seconds():.1f}s")
+    return results, parity
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Bootstrap Confidence Intervals for Golden Gate Completion Rates
+Attaches percentile confidence intervals to every reported rate:
+- Enhanced gap-open/intraday/combined rates and negative_advantage per ticker
+- The same rates per calendar year
+- State-managed completion rates per direction and trigger hour
+
+Sessions (trading days) are resampled with a moving-block bootstrap so serial
+dependence between neighbouring days is kept. Resamples are drawn in batched
+NumPy form (prefix sums + gathered block starts) and the batches are spread
+across a process pool; the prefix sums are published once in shared memory
+and workers attach to them instead of receiving pickled copies. The yearly
+intervals fan out one year per worker the same way, over the ticker's daily
+bars, day index and ATR published once (shared_dataset.bar_arrays()).
+"""
+
+import sys
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+# Add the src directory and the repository root (shared market_data package) to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from enhanced_golden_gate_analysis import calculate_atr_pine_script, calculate_daily_scenario_flags
+from shared_dataset import SharedDataset, attach, bar_arrays
+
+DEFAULT_RESAMPLES = 10000
+DEFAULT_BLOCK_LENGTH = 5
+DEFAULT_BATCH_SIZE = 250
+DEFAULT_CONFIDENCE = 0.95
+
+RATE_METRICS = {
+    'gap_open_positive_rate': ('gap_open_positive', 'completed_positive'),
+    'gap_open_negative_rate': ('gap_open_negative', 'completed_negative'),
+    'intraday_positive_rate': ('intraday_positive', 'completed_positive'),
+    'intraday_negative_rate': ('intraday_negative', 'completed_negative'),
+    'combined_positive_rate': (('gap_open_positive', 'intraday_positive'), 'completed_positive'),
+    'combined_negative_rate': (('gap_open_negative', 'intraday_negative'), 'completed_negative')
+}
+
+# Worker-side copies of the prefix sums, set once per process by _init_worker
+_worker_state = {}
+
+
+def _init_worker(event_prefix, success_prefix, block_length):
+    _worker_state['event_prefix'] = event_prefix
+    _worker_state['success_prefix'] = success_prefix
+    _worker_state['block_length'] = block_length
+
+
+def _init_shared_worker(dataset_handle, block_length):
+    arrays = attach(dataset_handle)
+    _init_worker(arrays['event_prefix'], arrays['success_prefix'], block_length)
+
+
+def _init_bar_worker(dataset_handle):
+    _worker_state['bars'] = attach(dataset_handle)
+
+
+def _year_intervals(year, bootstrap_args):
+    """CIs for one calendar year of the published daily bars (None if it has no analyzed days)"""
+    bars = _worker_state['bars']
+    session_years = bars['session_date'].view('datetime64[ns]').astype('datetime64[Y]').astype(int) + 1970
+    first, last = np.searchsorted(session_years, [year, year + 1])
+    rows = slice(bars['session_start'][first], bars['session_start'][last])
+    data = pd.DataFrame({'date': pd.to_datetime(bars['date'][rows].view('datetime64[ns]')),
+                         'open': bars['open'][rows], 'high': bars['high'][rows],
+                         'low': bars['low'][rows], 'close': bars['close'][rows],
+                         'atr': np.repeat(bars['atr'][first:last], np.diff(bars['session_start'][first:last + 1]))})
+    flags = calculate_daily_scenario_flags(data)
+    if flags.empty:
+        return None
+    return {'year': year, 'total_days': len(flags), **rate_confidence_intervals(flags, **bootstrap_args)}
+
+
+def _resample_batch(seed, batch_size):
+    """Draw one batch of block-bootstrap resamples; returns (events, successes) totals per metric"""
+    event_prefix = _worker_state['event_prefix']
+    success_prefix = _worker_state['success_prefix']
+    block_length = _worker_state['block_length']
+
+    n_sessions = event_prefix.shape[0] - 1
+    n_blocks = int(np.ceil(n_sessions / block_length))
+    rng = np.random.default_rng(seed)
+    starts = rng.integers(0, n_sessions - block_length + 1, size=(batch_size, n_blocks))
+    ends = starts + block_length
+
+    # Block sums from prefix sums: (batch, blocks, metrics) -> summed over blocks
+    events = (event_prefix[ends] - event_prefix[starts]).sum(axis=1)
+    successes = (success_prefix[ends] - success_prefix[starts]).sum(axis=1)
+    return events, successes
+
+
+def block_bootstrap_totals(events, successes, n_resamples=DEFAULT_RESAMPLES, block_length=DEFAULT_BLOCK_LENGTH,
+                           seed=None, workers=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Moving-block bootstrap of per-session event/success counts
+
+    Args:
+        events (np.ndarray): (n_sessions, n_metrics) event counts per session
+        successes (np.ndarray): (n_sessions, n_metrics) completion counts per session
+        n_resamples (int): Number of bootstrap resamples
+        block_length (int): Consecutive sessions per block (1 = plain session bootstrap)
+        seed (int): Seed for reproducible resamples
+        workers (int): Process pool size (None = os.cpu_count(), 1 = run in-process)
+        batch_size (int): Resamples drawn per vectorized batch
+
+    Returns:
+        tuple: (events, successes) resampled totals, each (n_resamples, n_metrics)
+    """
+    events = np.asarray(events, dtype=np.int64)
+    successes = np.asarray(successes, dtype=np.int64)
+    if events.ndim == 1:
+        events, successes = events[:, None], successes[:, None]
+
+    block_length = max(1, min(block_length, len(events)))
+    zeros = np.zeros((1, events.shape[1]), dtype=np.int64)
+    event_prefix = np.concatenate([zeros, np.cumsum(events, axis=0)])
+    success_prefix = np.concatenate([zeros, np.cumsum(successes, axis=0)])
+
+    batch_sizes = [batch_size] * (n_resamples // batch_size)
+    if n_resamples % batch_size:
+        batch_sizes.append(n_resamples % batch_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(batch_sizes))
+
+    if workers == 1 or len(batch_sizes) == 1:
+        _init_worker(event_prefix, success_prefix, block_length)
+        batches = [_resample_batch(s, b) for s, b in zip(seeds, batch_sizes)]
+    else:
+        with SharedDataset({'event_prefix': event_prefix, 'success_prefix': success_prefix}) as dataset, \
+                ProcessPoolExecutor(max_workers=workers, initializer=_init_shared_worker,
+                                    initargs=(dataset.handle, block_length)) as pool:
+            batches = list(pool.map(_resample_batch, seeds, batch_sizes))
+
+    return np.concatenate([b[0] for b in batches]), np.concatenate([b[1] for b in batches])
+
+
+def percentile_interval(samples, confidence=DEFAULT_CONFIDENCE):
+    """Percentile confidence interval over resamples (axis 0), ignoring NaNs"""
+    alpha = (1 - confidence) / 2 * 100
+    with np.errstate(invalid='ignore'):
+        low, high = np.nanpercentile(samples, [alpha, 100 - alpha], axis=0)
+    return low, high
+
+
+def rate_metric_arrays(flags):
+    """Per-session (events, successes) arrays for every RATE_METRICS entry"""
+    events = []
+    successes = []
+    for scenario_cols, completed_col in RATE_METRICS.values():
+        if isinstance(scenario_cols, tuple):
+            triggered = flags[list(scenario_cols)].any(axis=1)
+        else:
+            triggered = flags[scenario_cols]
+        events.append(triggered.to_numpy())
+        successes.append((triggered & flags[completed_col]).to_numpy())
+    return np.column_stack(events), np.column_stack(successes)
+
+
+def rate_confidence_intervals(flags, confidence=DEFAULT_CONFIDENCE, **bootstrap_args):
+    """
+    Point estimates and CIs for every enhanced rate plus negative_advantage
+
+    Returns:
+        dict: {metric: value, metric_ci_low: ..., metric_ci_high: ...}
+    """
+    events, successes = rate_metric_arrays(flags)
+    boot_events, boot_successes = block_bootstrap_totals(events, successes, **bootstrap_args)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        boot_rates = np.where(boot_events > 0, boot_successes / boot_events * 100, np.nan)
+
+    names = list(RATE_METRICS.keys())
+    combined_positive = names.index('combined_positive_rate')
+    combined_negative = names.index('combined_negative_rate')
+    boot_advantage = boot_rates[:, combined_negative] - boot_rates[:, combined_positive]
+
+    totals_events = events.sum(axis=0)
+    totals_successes = successes.sum(axis=0)
+    low, high = percentile_interval(boot_rates, confidence)
+
+    result = {}
+    for i, name in enumerate(names):
+        rate = totals_successes[i] / totals_events[i] * 100 if totals_events[i] > 0 else 0
+        result[name] = round(rate, 1)
+        result[f'{name}_ci_low'] = round(low[i], 1)
+        result[f'{name}_ci_high'] = round(high[i], 1)
+
+    advantage_low, advantage_high = percentile_interval(boot_advantage[:, None], confidence)
+    result['negative_advantage'] = round(result['combined_negative_rate'] - result['combined_positive_rate'], 1)
+    result['negative_advantage_ci_low'] = round(advantage_low[0], 1)
+    result['negative_advantage_ci_high'] = round(advantage_high[0], 1)
+    return result
+
+
+def grouped_rate_confidence_intervals(results, group_col, session_col='date', confidence=DEFAULT_CONFIDENCE,
+                                      **bootstrap_args):
+    """
+    CIs for completion rates of event-level results grouped by one column
+
+    Events are aggregated per session first so all groups are resampled
+    jointly by session.
+
+    Returns:
+        pd.DataFrame: group, events, completions, rate, ci_low, ci_high
+    """
+    reached = results['target_reached'].astype(bool)
+    per_session = pd.DataFrame({
+        'session': results[session_col],
+        'group': results[group_col],
+        'event': 1,
+        'success': reached.astype(int)
+    }).groupby(['session', 'group'])[['event', 'success']].sum().unstack('group', fill_value=0)
+
+    events = per_session['event'].to_numpy()
+    successes = per_session['success'].to_numpy()
+    groups = per_session['event'].columns
+
+    boot_events, boot_successes = block_bootstrap_totals(events, successes, **bootstrap_args)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        boot_rates = np.where(boot_events > 0, boot_successes / boot_events * 100, np.nan)
+    low, high = percentile_interval(boot_rates, confidence)
+
+    total_events = events.sum(axis=0)
+    total_successes = successes.sum(axis=0)
+    return pd.DataFrame({
+        group_col: groups,
+        'events': total_events,
+        'completions': total_successes,
+        'rate': np.round(total_successes / np.maximum(total_events, 1) * 100, 1),
+        'ci_low': np.round(low, 1),
+        'ci_high': np.round(high, 1)
+    })
+
+
+def yearly_rate_confidence_intervals(data, workers=None, **bootstrap_args):
+    """
+    rate_confidence_intervals() per calendar year, one year per pool task
+
+    The bars, day index and ATR are published once in shared memory; each
+    worker attaches and computes its year's flags and bootstrap in-process.
+
+    Args:
+        data (pd.DataFrame): Daily bars with date, open, high, low, close and atr (see load_daily_bars)
+        workers (int): Process pool size (None = os.cpu_count(), 1 = run in-process)
+        **bootstrap_args: n_resamples, block_length, seed, ... for each year's bootstrap
+
+    Returns:
+        list: One dict per year with year, total_days and the rate_confidence_intervals() fields
+    """
+    arrays = bar_arrays(data, atr=data['atr'])
+    years = sorted(set(data['date'].dt.year))
+    bootstrap_args = {**bootstrap_args, 'workers': 1}
+    if workers == 1 or len(years) == 1:
+        _worker_state['bars'] = arrays
+        rows = [_year_intervals(year, bootstrap_args) for year in years]
+    else:
+        with SharedDataset(arrays) as dataset, \
+                ProcessPoolExecutor(max_workers=workers, initializer=_init_bar_worker,
+                                    initargs=(dataset.handle,)) as pool:
+            rows = list(pool.map(_year_intervals, years, [bootstrap_args] * len(years)))
+    return [row for row in rows if row is not None]
+
+
+def load_daily_bars(data_file):
+    """Load daily bars and compute ATR, dropping the 14-day warm-up"""
+    data = pd.read_csv(data_file)
+    data['date'] = pd.to_datetime(data['date'])
+    data = data.sort_values('date').reset_index(drop=True)
+    data['atr'] = calculate_atr_pine_script(data['high'], data['low'], data['close'], 14)
+    data = data.iloc[14:].reset_index(drop=True)
+    return data.dropna(subset=['atr']).reset_index(drop=True)
+
+
+def load_daily_flags(data_file):
+    """Load daily bars, compute ATR with the 14-day warm-up and return scenario flags"""
+    return calculate_daily_scenario_flags(load_daily_bars(data_file))
+
+
+def main(n_resamples=DEFAULT_RESAMPLES, block_length=DEFAULT_BLOCK_LENGTH, workers=None):
+    """Attach bootstrap confidence intervals to the enhanced and state-managed summaries"""
+    print("=" * 100)
+    print("BOOTSTRAP CONFIDENCE INTERVALS FOR GOLDEN GATE COMPLETION RATES")
+    print(f"{n_resamples:,} resamples | block length {block_length} sessions | {DEFAULT_CONFIDENCE:.0%} intervals")
+    print("=" * 100)
+
+    tickers = {
+        'SPY': '../../data/ticker_data/SPY/daily/SPY_daily_2000_to_present.csv',
+        'QQQ': '../../data/ticker_data/QQQ/daily/QQQ_daily_2000_to_present.csv'
+    }
+    results_dir = os.path.join('data', 'analysis_results')
+    os.makedirs(results_dir, exist_ok=True)
+    bootstrap_args = {'n_resamples': n_resamples, 'block_length': block_length, 'workers': workers, 'seed': 42}
+
+    summary_rows = []
+    for ticker, data_file in tickers.items():
+        if not os.path.exists(data_file):
+            print(f"Data file not found for {ticker}: {data_file}")
+            continue
+
+        start = datetime.now()
+        data = load_daily_bars(data_file)
+        flags = calculate_daily_scenario_flags(data)
+        summary = rate_confidence_intervals(flags, **bootstrap_args)
+        summary_rows.append({'ticker': ticker, 'total_trading_days': len(flags), **summary})
+
+        # One year per worker: each runs its (small) bootstrap in-process
+        yearly_rows = [{'ticker': ticker, **row} for row in yearly_rate_confidence_intervals(data, **bootstrap_args)]
+        yearly_file = os.path.join(results_dir, f"{ticker}_enhanced_golden_gate_yearly_ci.csv")
+        pd.DataFrame(yearly_rows).to_csv(yearly_file, index=False)
+
+        elapsed = (datetime.now() - start).total_seconds()
+        print(f"\n{ticker} ({len(flags):,} days, {elapsed:.1f}s):")
+        for name in list(RATE_METRICS.keys()) + ['negative_advantage']:
+            print(f"  {name:<26} {summary[name]:>6.1f}%  [{summary[f'{name}_ci_low']:.1f}, {summary[f'{name}_ci_high']:.1f}]")
+        print(f"  Yearly intervals saved to: {yearly_file}")
+
+    if summary_rows:
+        summary_file = os.path.join(results_dir, 'enhanced_golden_gate_summary_ci.csv')
+        pd.DataFrame(summary_rows).to_csv(summary_file, index=False)
+        print(f"\nSummary with confidence intervals saved to: {summary_file}")
+
+    # State-managed intraday results by direction and trigger hour
+    intraday_file = os.path.join('..', '..', 'data', 'analysis_results', 'state_managed_intraday_results.csv')
+    if os.path.exists(intraday_file):
+        intraday = pd.read_csv(intraday_file)
+        intraday['trigger_hour'] = intraday['trigger_type'] + ' ' + intraday['trigger_time'].str[:2] + ':00'
+        hourly = grouped_rate_confidence_intervals(intraday, 'trigger_hour', **bootstrap_args)
+        hourly_file = os.path.join(results_dir, 'state_managed_intraday_hourly_ci.csv')
+        hourly.to_csv(hourly_file, index=False)
+        print(f"\nSTATE-MANAGED INTRADAY RATES BY TRIGGER HOUR:")
+        for _, row in hourly.iterrows():
+            print(f"  {row['trigger_hour']:<16} {row['rate']:>6.1f}%  [{row['ci_low']:.1f}, {row['ci_high']:.1f}]  ({int(row['events'])} events)")
+        print(f"Hourly intervals saved to: {hourly_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Continuous Futures Build - Back-Adjusted ES and NQ Bar Stores
+Brings the per-contract cache under data/ticker_data/{ROOT}/contracts up to
+date (continuous_futures.ContinuousFuturesBuilder) and writes the stitched,
+back-adjusted series to data/ticker_data/{ROOT}/{bar label}/{ROOT}_{bar label}_continuous.csv
+in the same columns as the other ticker stores.
+
+The first run fetches every contract IBKR still lists; later runs fetch only
+the front month since its last cached bar. IBKR serves expired futures for
+about two years, so history older than that exists only in the cache.
+
+    python build_continuous_futures.py
+    python -c "import build_continuous_futures as b; b.main(symbols=['ES'], method='ratio')"
+"""
+
+import sys
+import os
+from datetime import datetime
+
+# Add the src directory and the repository root (shared market_data package) to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from stock_data_pipeline import StockDataPipeline
+from continuous_futures import ContinuousFuturesBuilder, bar_label
+from market_data.logging_config import setup_logging
+
+TICKER_DATA = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'ticker_data')
+
+
+def main(symbols=('ES', 'NQ'), bar_size='10 mins', start=None, method='add'):
+    """
+    Update and write the continuous series of each futures root
+
+    Args:
+        symbols (list): Futures roots
+        bar_size (str): IBKR bar size
+        start (str): First date written (default: everything cached)
+        method (str): 'add' or 'ratio' back-adjustment
+
+    Returns:
+        dict: Symbol -> stitched series
+    """
+    setup_logging(log_file=os.path.join(os.path.dirname(__file__), '..', 'data', 'logs', 'continuous_futures.log'))
+    print("=" * 80)
+    print("CONTINUOUS FUTURES BUILD")
+    print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"Bar size: {bar_size} | Back-adjustment: {method}")
+    print("=" * 80)
+
+    pipeline = StockDataPipeline()
+    builder = ContinuousFuturesBuilder(pipeline.provider, TICKER_DATA, bar_size=bar_size)
+    label = bar_label(bar_size)
+    results = {}
+    try:
+        for symbol in symbols:
+            print(f"\n{symbol}")
+            series = builder.build(symbol, start=start, method=method)
+            if series.empty:
+                print("  No bars - check IBKR futures market data permissions")
+                continue
+
+            output_dir = os.path.join(TICKER_DATA, symbol, label)
+            os.makedirs(output_dir, exist_ok=True)
+            output_file = os.path.join(output_dir, f"{symbol}_{label}_continuous.csv")
+            series.to_csv(output_file, index=False)
+            results[symbol] = series
+
+            print(f"  {len(series):,} bars from {series['contract'].nunique()} contracts")
+            print(f"  Date range: {series['date'].min()} to {series['date'].max()}")
+            print(f"  Front month: {series['contract'].iloc[-1]}")
+            print(f"  Saved to: {output_file}")
+    finally:
+        pipeline.disconnect()
+
+    stats = builder.stats
+    print(f"\nRequests: {stats['chain_requests']} contract chain, {stats['bar_requests']} historical bars")
+    print(f"Contracts: {stats['fetched_contracts']} fetched, {stats['cached_contracts']} from cache")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Conditional Completion Survival Analysis - 10-Minute Resolution
+For every 10-minute checkpoint t from 9:30 to 16:00 estimates:
+
+    P(complete by close | not complete by t)
+
+split by direction, gap-open vs intraday, and trigger hour.
+
+Each event enters the risk set at its trigger bar and leaves it at its first
+target touch (or is censored at the close). Kaplan-Meier hazards with delayed
+entry and Greenwood log-log confidence bands are computed for all groups and
+checkpoints at once from first-touch timestamps - no per-bucket re-filtering.
+"""
+
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+# Add the src directory and the repository root (shared market_data package) to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from insights_cube import trigger_minutes, completion_minutes
+from result_store import load_results
+
+OPEN_MINUTES = 9 * 60 + 30
+CLOSE_MINUTES = 16 * 60
+STEP_MINUTES = 10
+CONFIDENCE_Z = 1.96
+
+
+def get_10min_checkpoints():
+    """10-minute checkpoints from 9:30 AM to 4:00 PM as minutes after midnight"""
+    return np.arange(OPEN_MINUTES, CLOSE_MINUTES + 1, STEP_MINUTES)
+
+
+def minutes_to_clock(minutes):
+    """Format minutes after midnight as 'HH:MM'"""
+    return f"{int(minutes) // 60:02d}:{int(minutes) % 60:02d}"
+
+
+def build_event_table(gap_open_results, intraday_results):
+    """
+    Flatten gap-open and intraday results into one event table
+
+    Returns:
+        pd.DataFrame: direction, scenario, trigger_group, entry/exit grid indexes and completion flag
+    """
+    frames = []
+    for scenario, results, direction_col in [('gap', gap_open_results, 'gap_open_type'),
+                                             ('intraday', intraday_results, 'trigger_type')]:
+        if results is None or len(results) == 0:
+            continue
+        entry = trigger_minutes(results, scenario)
+        exit_minutes = completion_minutes(results, scenario)
+        frames.append(pd.DataFrame({
+            'direction': results[direction_col].to_numpy(),
+            'scenario': scenario,
+            'trigger_group': ['open' if scenario == 'gap' else f"{int(m) // 60:02d}:00" for m in entry],
+            'entry_minutes': entry,
+            'exit_minutes': exit_minutes,
+            'completed': ~np.isnan(exit_minutes)
+        }))
+
+    events = pd.concat(frames, ignore_index=True)
+
+    # Only events triggered during the session can complete before the close
+    events = events[(events['entry_minutes'] >= OPEN_MINUTES) & (events['entry_minutes'] <= CLOSE_MINUTES)]
+    events = events.reset_index(drop=True)
+
+    # Grid indexes: touches inside a 10-minute bar belong to that bar's checkpoint
+    events['entry_index'] = ((events['entry_minutes'] - OPEN_MINUTES) // STEP_MINUTES).astype(int)
+    exit_index = (events['exit_minutes'] - OPEN_MINUTES) // STEP_MINUTES
+    events['exit_index'] = exit_index.fillna(-1).astype(int)
+    return events
+
+
+def conditional_completion_curves(events, z=CONFIDENCE_Z):
+    """
+    Vectorized Kaplan-Meier conditional completion curves for every group
+
+    Args:
+        events (pd.DataFrame): Output of build_event_table()
+        z (float): Normal quantile for the confidence band
+
+    Returns:
+        pd.DataFrame: One row per (group, checkpoint)
+    """
+    checkpoints = get_10min_checkpoints()
+    n_steps = len(checkpoints)
+
+    # Every event counts in its own trigger group and in the 'all' group
+    group_cols = ['direction', 'scenario', 'trigger_group']
+    all_events = pd.concat([events, events.assign(trigger_group='all')], ignore_index=True)
+    group_keys, group_ids = np.unique(
+        all_events[group_cols].astype(str).agg('|'.join, axis=1).to_numpy(), return_inverse=True
+    )
+    n_groups = len(group_keys)
+
+    def counts(index, mask=None):
+        flat = group_ids * n_steps + index
+        if mask is not None:
+            flat = flat[mask]
+        return np.bincount(flat, minlength=n_groups * n_steps).reshape(n_groups, n_steps)
+
+    entry_index = all_events['entry_index'].to_numpy()
+    exit_index = all_events['exit_index'].to_numpy()
+    completed = all_events['completed'].to_numpy() & (exit_index >= 0) & (exit_index < n_steps)
+
+    entered = counts(entry_index)
+    completions = counts(np.where(completed, exit_index, 0), completed)
+    completions_by_entry = counts(entry_index, completed)
+
+    entered_by = np.cumsum(entered, axis=1)
+    completed_by = np.cumsum(completions, axis=1)
+    completed_among_entered = np.cumsum(completions_by_entry, axis=1)
+
+    # Kaplan-Meier with delayed entry: at risk at step k = entered by k, not completed before k
+    completed_before = np.concatenate([np.zeros((n_groups, 1), dtype=completed_by.dtype), completed_by[:, :-1]], axis=1)
+    at_risk = entered_by - completed_before
+    with np.errstate(divide='ignore', invalid='ignore'):
+        hazard = np.where(at_risk > 0, completions / at_risk, 0.0)
+        log_survival_step = np.log1p(-np.minimum(hazard, 1.0))
+        greenwood_step = np.where(at_risk > completions, completions / (at_risk * (at_risk - completions)), 0.0)
+
+    cum_log_survival = np.cumsum(log_survival_step, axis=1)
+    cum_greenwood = np.cumsum(greenwood_step, axis=1)
+
+    # Survival from checkpoint k to the close = S(close) / S(k)
+    log_conditional = cum_log_survival[:, -1:] - cum_log_survival
+    greenwood = cum_greenwood[:, -1:] - cum_greenwood
+    conditional_survival = np.exp(log_conditional)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Log-log band keeps the survival estimate inside (0, 1)
+        se = np.sqrt(greenwood) / np.abs(log_conditional)
+        survival_low = conditional_survival ** np.exp(z * se)
+        survival_high = conditional_survival ** np.exp(-z * se)
+    degenerate = (log_conditional == 0) | ~np.isfinite(log_conditional)
+    survival_low = np.where(degenerate, np.nan, survival_low)
+    survival_high = np.where(degenerate, np.nan, survival_high)
+
+    # Direct (empirical) estimate for events already triggered by the checkpoint
+    # (completions never precede their trigger, so completed_by only counts entered events)
+    still_open = entered_by - completed_by
+    late_completions = completed_among_entered - completed_by
+    with np.errstate(divide='ignore', invalid='ignore'):
+        empirical = np.where(still_open > 0, late_completions / still_open, np.nan)
+
+    split_keys = [key.split('|') for key in group_keys]
+    result = pd.DataFrame({
+        'direction': np.repeat([k[0] for k in split_keys], n_steps),
+        'scenario': np.repeat([k[1] for k in split_keys], n_steps),
+        'trigger_group': np.repeat([k[2] for k in split_keys], n_steps),
+        'checkpoint': np.tile([minutes_to_clock(m) for m in checkpoints], n_groups),
+        'at_risk': at_risk.ravel(),
+        'completions': completions.ravel(),
+        'still_open': still_open.ravel(),
+        'late_completions': late_completions.ravel(),
+        'empirical_rate': (empirical * 100).ravel(),
+        'km_rate': ((1 - conditional_survival) * 100).ravel(),
+        'km_ci_low': ((1 - survival_high) * 100).ravel(),
+        'km_ci_high': ((1 - survival_low) * 100).ravel()
+    })
+    return result
+
+
+def main():
+    """Build the 10-minute conditional completion decision table"""
+    print("=" * 100)
+    print("CONDITIONAL COMPLETION SURVIVAL ANALYSIS - 10-MINUTE RESOLUTION")
+    print("P(complete by close | not complete by t)")
+    print("=" * 100)
+
+    results_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'analysis_results')
+    gap_file = os.path.join(results_dir, 'state_managed_gap_open_results.csv')
+    intraday_file = os.path.join(results_dir, 'state_managed_intraday_results.csv')
+
+    # Latest stored run first, CSV exports otherwise
+    gap_open_results = load_results('state_managed_gap_open', gap_file, results_dir)
+    intraday_results = load_results('state_managed_intraday', intraday_file, results_dir)
+    if gap_open_results is None or intraday_results is None:
+        print(f"Error: state-managed results not found in {results_dir}")
+        print("Run state_managed_golden_gate_analysis.py first")
+        return
+
+    if 'first_touch_time' not in gap_open_results.columns:
+        print("Warning: results have no first_touch_time column - falling back to 30-minute completion buckets")
+
+    events = build_event_table(gap_open_results, intraday_results)
+    print(f"Events in session: {len(events):,} ({events['completed'].sum():,} completed)")
+
+    curves = conditional_completion_curves(events)
+
+    output_file = os.path.join(results_dir, 'conditional_completion_survival_10min.csv')
+    curves.to_csv(output_file, index=False)
+    print(f"Survival table saved to: {output_file}")
+
+    # Desk decision table: all trigger times, hourly checkpoints
+    decision_points = ['10:30', '11:30', '12:30', '13:30', '14:00', '14:30', '15:00', '15:30']
+    table = curves[(curves['trigger_group'].isin(['all', 'open'])) & (curves['checkpoint'].isin(decision_points))]
+
+    for (scenario, direction), subset in table.groupby(['scenario', 'direction']):
+        subset = subset[subset['trigger_group'] == ('open' if scenario == 'gap' else 'all')]
+        print(f"\n{scenario.upper()} {direction.upper()} - if not complete by t:")
+        print(f"  {'t':<7} {'Open':>6} {'Late':>6} {'Empirical':>10} {'KM':>8} {'95% CI':>18}")
+        for _, row in subset.iterrows():
+            ci = f"{row['km_ci_low']:.1f}-{row['km_ci_high']:.1f}%" if pd.notna(row['km_ci_low']) else "n/a"
+            empirical = f"{row['empirical_rate']:.1f}%" if pd.notna(row['empirical_rate']) else "n/a"
+            print(f"  {row['checkpoint']:<7} {int(row['still_open']):>6} {int(row['late_completions']):>6} "
+                  f"{empirical:>10} {row['km_rate']:>7.1f}% {ci:>18}")
+
+    return curves
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Cross-Asset Co-Trigger Analysis - Aligned Multi-Symbol Golden Gate Events
+Aligns the Golden Gate events of several symbols (SPY/QQQ/SPX/NDX and the MAG7
+stocks) on one session x symbol grid and measures, per direction:
+
+- Co-occurrence: P(B gap-opens / triggers | A gap-opens / triggers)
+- Lead/lag: first-touch time of B minus A when both complete
+- Conditional completion: P(B completes | A already completed and B had not)
+
+Every statistic is computed for all symbol pairs at once from the aligned
+arrays (matrix products and session x symbol x symbol broadcasts) instead of
+pairwise merges of per-symbol result tables.
+"""
+
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+# Add the src directory and the repository root (shared market_data package) to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from session_arrays import first_true_index
+from gap_fill_analysis import find_10min_files, load_ticker_arrays
+from rule_backtest_engine import find_entries
+
+# Index/ETF symbols plus the MAG7 members of StockDataPipeline.ALLOWED_TICKERS
+CROSS_ASSET_SYMBOLS = ['SPY', 'QQQ', 'SPX', 'NDX', 'AAPL', 'MSFT', 'GOOGL', 'AMZN', 'TSLA', 'META', 'NVDA']
+
+TARGET_ATR_MULTIPLE = 0.618
+
+
+def symbol_events(arrays, direction, target_multiple=TARGET_ATR_MULTIPLE):
+    """
+    Golden Gate events of one symbol and direction with bar-level times
+
+    A session completes when price reaches target_multiple x ATR from the previous close.
+
+    Returns:
+        dict: per-session gap_open, trigger (gap-open or intraday), completed,
+              trigger_minutes and touch_minutes (NaN when absent)
+    """
+    sign = 1 if direction == 'positive' else -1
+    slot_minutes = arrays['slot_minutes'].astype(float)
+    n_slots = len(slot_minutes)
+
+    gap_open, _, _ = find_entries(arrays, direction, 'gap_open')
+    intraday, trigger_slot, _ = find_entries(arrays, direction, 'trigger')
+    trigger_slot = np.where(gap_open, 0, trigger_slot)
+    triggered = gap_open | intraday
+
+    # Gap-opens can complete on the open bar, intraday triggers only on later bars
+    target = arrays['previous_close'] + sign * arrays['previous_atr'] * target_multiple
+    touch_prices = arrays['high'] if direction == 'positive' else arrays['low']
+    with np.errstate(invalid='ignore'):
+        touched = sign * (touch_prices - target[:, None]) >= 0
+    start = np.where(gap_open, 0, trigger_slot + 1)[:, None]
+    touch_slot = first_true_index(touched, start=start)
+    completed = triggered & (touch_slot < n_slots)
+
+    return {
+        'gap_open': gap_open,
+        'trigger': triggered,
+        'completed': completed,
+        'trigger_minutes': np.where(triggered, slot_minutes[np.minimum(trigger_slot, n_slots - 1)], np.nan),
+        'touch_minutes': np.where(completed, slot_minutes[np.minimum(touch_slot, n_slots - 1)], np.nan)
+    }
+
+
+def align_symbol_events(arrays_by_symbol, direction):
+    """
+    Stack per-symbol events into session x symbol arrays on the union of dates
+
+    Returns:
+        dict: dates, symbols, available plus every symbol_events() field as
+              (sessions x symbols) arrays
+    """
+    symbols = list(arrays_by_symbol)
+    dates = np.unique(np.concatenate([arrays['dates'] for arrays in arrays_by_symbol.values()]))
+    shape = (len(dates), len(symbols))
+
+    aligned = {
+        'dates': dates,
+        'symbols': symbols,
+        'available': np.zeros(shape, dtype=bool),
+        'gap_open': np.zeros(shape, dtype=bool),
+        'trigger': np.zeros(shape, dtype=bool),
+        'completed': np.zeros(shape, dtype=bool),
+        'trigger_minutes': np.full(shape, np.nan),
+        'touch_minutes': np.full(shape, np.nan)
+    }
+    for column, (symbol, arrays) in enumerate(arrays_by_symbol.items()):
+        rows = np.searchsorted(dates, arrays['dates'])
+        aligned['available'][rows, column] = arrays['has_open_bar']
+        for key, values in symbol_events(arrays, direction).items():
+            aligned[key][rows, column] = values
+    return aligned
+
+
+def _pair_frame(symbols, **matrices):
+    """Flatten symbol x symbol matrices into one row per ordered pair (A != B)"""
+    n = len(symbols)
+    a_idx, b_idx = np.nonzero(~np.eye(n, dtype=bool))
+    frame = pd.DataFrame({'symbol_a': np.array(symbols)[a_idx], 'symbol_b': np.array(symbols)[b_idx]})
+    for name, matrix in matrices.items():
+        frame[name] = matrix[a_idx, b_idx]
+    return frame
+
+
+def co_occurrence(aligned, event):
+    """
+    P(B has the event | A has it) over sessions where both symbols traded
+
+    Joint counts come from one matrix product of the session x symbol event matrix.
+    """
+    x = (aligned[event] & aligned['available']).astype(np.int64)
+    available = aligned['available'].astype(np.int64)
+    joint = x.T @ x
+    a_events = x.T @ available
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rate = np.where(a_events > 0, joint / a_events * 100, np.nan)
+    return _pair_frame(aligned['symbols'], a_events=a_events, joint_events=joint, conditional_rate=rate)
+
+
+def lead_lag(aligned, time_key='touch_minutes'):
+    """
+    Distribution of B's minus A's event time (minutes) for sessions where both have it
+
+    Positive lags mean A was first, negative lags mean B was first.
+    """
+    times = aligned[time_key]
+    diff = times[:, None, :] - times[:, :, None]
+    both = ~np.isnan(diff)
+    with np.errstate(invalid='ignore'):
+        mean_lag = np.nanmean(np.where(both, diff, np.nan), axis=0)
+        median_lag = np.nanmedian(np.where(both, diff, np.nan), axis=0)
+    sessions = both.sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        a_first = np.where(sessions > 0, (diff > 0).sum(axis=0) / sessions * 100, np.nan)
+        same_bar = np.where(sessions > 0, (diff == 0).sum(axis=0) / sessions * 100, np.nan)
+    return _pair_frame(aligned['symbols'], sessions=sessions, mean_lag_minutes=mean_lag,
+                       median_lag_minutes=median_lag, a_first_pct=a_first, same_bar_pct=same_bar)
+
+
+def conditional_completion(aligned):
+    """
+    P(B completes | A already completed while B was triggered and still open)
+
+    A's completion bar must be strictly earlier than B's (or B never completes),
+    and B's trigger bar at or before A's completion. The baseline is B's
+    completion rate over all sessions where both symbols triggered.
+    """
+    triggered = aligned['trigger'] & aligned['available']
+    completed = aligned['completed'] & triggered
+    touch = aligned['touch_minutes']
+    trigger_time = aligned['trigger_minutes']
+
+    both_triggered = triggered[:, :, None] & triggered[:, None, :]
+    with np.errstate(invalid='ignore'):
+        b_open_at_a_touch = np.isnan(touch[:, None, :]) | (touch[:, None, :] > touch[:, :, None])
+        b_triggered_by_a_touch = trigger_time[:, None, :] <= touch[:, :, None]
+    condition = both_triggered & completed[:, :, None] & b_open_at_a_touch & b_triggered_by_a_touch
+    outcome = completed[:, None, :]
+
+    conditioned = condition.sum(axis=0)
+    late_completions = (condition & outcome).sum(axis=0)
+    baseline_events = both_triggered.sum(axis=0)
+    baseline_completions = (both_triggered & outcome).sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rate = np.where(conditioned > 0, late_completions / conditioned * 100, np.nan)
+        baseline = np.where(baseline_events > 0, baseline_completions / baseline_events * 100, np.nan)
+    return _pair_frame(aligned['symbols'], sessions=conditioned, b_completions=late_completions,
+                       conditional_rate=rate, both_triggered=baseline_events, baseline_rate=baseline,
+                       lift=rate - baseline)
+
+
+def main():
+    """Run the cross-asset co-trigger analysis over all available 10-minute stores"""
+    print("=" * 100)
+    print("CROSS-ASSET GOLDEN GATE CO-TRIGGER ANALYSIS")
+    print("Aligned session x symbol arrays | 10-minute first-touch times")
+    print("=" * 100)
+
+    data_root = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'ticker_data')
+    data_files = {s: f for s, f in find_10min_files(data_root).items() if s in CROSS_ASSET_SYMBOLS}
+    if len(data_files) < 2:
+        print(f"Error: need 10-minute data for at least two of {', '.join(CROSS_ASSET_SYMBOLS)} under {data_root}")
+        return
+
+    arrays_by_symbol = {}
+    for symbol in CROSS_ASSET_SYMBOLS:
+        if symbol in data_files:
+            print(f"Loading {symbol}: {data_files[symbol]}")
+            arrays_by_symbol[symbol] = load_ticker_arrays(symbol, data_files[symbol])
+
+    co_frames, lag_frames, completion_frames = [], [], []
+    for direction in ['positive', 'negative']:
+        aligned = align_symbol_events(arrays_by_symbol, direction)
+        for event in ['gap_open', 'trigger', 'completed']:
+            co_frames.append(co_occurrence(aligned, event).assign(direction=direction, event=event))
+        for time_key in ['trigger_minutes', 'touch_minutes']:
+            lag_frames.append(lead_lag(aligned, time_key).assign(direction=direction, event=time_key.replace('_minutes', '')))
+        completion_frames.append(conditional_completion(aligned).assign(direction=direction))
+    print(f"\nAligned {len(aligned['dates']):,} sessions x {len(aligned['symbols'])} symbols")
+
+    results_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'analysis_results')
+    os.makedirs(results_dir, exist_ok=True)
+    outputs = {
+        'cross_asset_cooccurrence.csv': pd.concat(co_frames, ignore_index=True),
+        'cross_asset_lead_lag.csv': pd.concat(lag_frames, ignore_index=True),
+        'cross_asset_conditional_completion.csv': pd.concat(completion_frames, ignore_index=True)
+    }
+    for filename, frame in outputs.items():
+        frame.to_csv(os.path.join(results_dir, filename), index=False)
+    print(f"Results saved to: {results_dir}")
+
+    completion = outputs['cross_asset_conditional_completion.csv']
+    print("\nB COMPLETES GIVEN A ALREADY COMPLETED (top lifts, >= 20 sessions):")
+    print(f"  {'Dir':<9} {'A':<6} {'B':<6} {'Sessions':>8} {'Cond %':>8} {'Base %':>8} {'Lift':>7}")
+    top = completion[completion['sessions'] >= 20].nlargest(15, 'lift')
+    for _, row in top.iterrows():
+        print(f"  {row['direction']:<9} {row['symbol_a']:<6} {row['symbol_b']:<6} {int(row['sessions']):>8} "
+              f"{row['conditional_rate']:>7.1f}% {row['baseline_rate']:>7.1f}% {row['lift']:>+6.1f}")
+
+    lags = outputs['cross_asset_lead_lag.csv']
+    print("\nFIRST-TOUCH LEAD/LAG (minutes, B minus A):")
+    for _, row in lags[(lags['event'] == 'touch') & (lags['sessions'] >= 20)].head(12).iterrows():
+        print(f"  {row['direction']:<9} {row['symbol_a']:<6} -> {row['symbol_b']:<6} mean {row['mean_lag_minutes']:>+6.1f} | "
+              f"median {row['median_lag_minutes']:>+6.1f} | A first {row['a_first_pct']:.0f}% | same bar {row['same_bar_pct']:.0f}%")
+
+    return outputs
+
+
+if __name__ == "__main__":
+    main()
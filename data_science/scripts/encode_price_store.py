@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Price Store Encoding - Integer-Cents Copies of the Intraday Bar Stores
+Writes an encoded .npz next to every 1-minute and 10-minute CSV under
+data/ticker_data (price_encoding.encode_bars: integer cents with per-session
+close deltas), checks that each one decodes to exactly the CSV's prices
+rounded to cents, and reports the size of each form:
+
+- csv: bytes on disk
+- frame: in-memory float64 OHLCV frame as the analyses load it
+- encoded: in-memory encoded arrays
+- npz: bytes on disk of the compressed encoding
+
+fine_bar_refinement.csv_store_loader reads the .npz instead of the day CSV
+when both exist. Files whose .npz is newer than the CSV are skipped.
+"""
+
+import sys
+import os
+import glob
+import pandas as pd
+
+# Add the src directory and the repository root (shared market_data package) to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from price_encoding import (PRICE_COLUMNS, encode_bars, decode_bars, encoded_nbytes,
+                            save_encoded, load_encoded)
+
+BAR_SIZES = ['1min', '10min']
+
+
+def find_intraday_files(data_root, bar_sizes=BAR_SIZES):
+    """(ticker, bar size, path) for every intraday store CSV under data_root"""
+    files = []
+    for bar_size in bar_sizes:
+        for path in sorted(glob.glob(os.path.join(data_root, '*', bar_size, '*.csv'))):
+            ticker = os.path.basename(os.path.dirname(os.path.dirname(path)))
+            files.append((ticker, bar_size, path))
+    return files
+
+
+def frame_nbytes(data):
+    """In-memory size of the OHLCV columns as a float64 frame (datetime64 date, 8 bytes a value)"""
+    columns = ['date'] + PRICE_COLUMNS + (['volume'] if 'volume' in data.columns else [])
+    return len(data) * 8 * len(columns)
+
+
+def verify_round_trip(data, encoded_file):
+    """
+    Decode the stored file and compare it with the CSV bars
+
+    Returns:
+        int: Rows whose date, price (at cent precision) or volume differ
+    """
+    decoded = decode_bars(load_encoded(encoded_file))
+    expected = data.sort_values('date', kind='stable').reset_index(drop=True)
+    if len(decoded) != len(expected):
+        return abs(len(decoded) - len(expected))
+
+    dates = pd.to_datetime(expected['date'], utc=decoded['date'].dt.tz is not None)
+    mismatch = dates.to_numpy() != decoded['date'].to_numpy()
+    for col in PRICE_COLUMNS:
+        mismatch |= expected[col].round(2).to_numpy() != decoded[col].to_numpy()
+    if 'volume' in expected.columns:
+        mismatch |= expected['volume'].fillna(0).round().to_numpy() != decoded['volume'].to_numpy()
+    return int(mismatch.sum())
+
+
+def encode_file(path, force=False):
+    """
+    Encode one store CSV to {name}.npz and verify it
+
+    Returns:
+        dict: Sizes (bytes) of each form and the round-trip mismatch count, or
+              None when the .npz is already up to date
+    """
+    encoded_file = os.path.splitext(path)[0] + '.npz'
+    if not force and os.path.exists(encoded_file) and os.path.getmtime(encoded_file) >= os.path.getmtime(path):
+        return None
+
+    data = pd.read_csv(path)
+    encoded = encode_bars(data)
+    save_encoded(encoded_file, encoded)
+    return {
+        'rows': len(data),
+        'csv_bytes': os.path.getsize(path),
+        'frame_bytes': frame_nbytes(data),
+        'encoded_bytes': encoded_nbytes(encoded),
+        'npz_bytes': os.path.getsize(encoded_file),
+        'mismatches': verify_round_trip(data, encoded_file)
+    }
+
+
+def main(force=False):
+    """
+    Encode every intraday store CSV and print the size comparison
+
+    Args:
+        force (bool): Re-encode files whose .npz is already newer than the CSV
+
+    Returns:
+        pd.DataFrame: One row per encoded file
+    """
+    print("=" * 100)
+    print("PRICE STORE ENCODING")
+    print("=" * 100)
+
+    data_root = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'ticker_data')
+    files = find_intraday_files(data_root)
+    if not files:
+        print(f"Error: no intraday bar data found under {data_root}")
+        return None
+
+    rows = []
+    skipped = 0
+    for ticker, bar_size, path in files:
+        try:
+            result = encode_file(path, force)
+        except (OSError, ValueError) as e:
+            print(f"{ticker:<6} {bar_size:<6} {os.path.basename(path)}: not encoded ({e})")
+            continue
+        if result is None:
+            skipped += 1
+            continue
+        rows.append({'ticker': ticker, 'bar_size': bar_size, 'file': os.path.basename(path), **result})
+
+    if skipped:
+        print(f"{skipped} files already encoded")
+    if not rows:
+        return None
+
+    report = pd.DataFrame(rows)
+    totals = report.groupby(['ticker', 'bar_size'])[['rows', 'csv_bytes', 'frame_bytes', 'encoded_bytes',
+                                                      'npz_bytes', 'mismatches']].sum()
+    mb = 1024 * 1024
+    print(f"\n{'Ticker':<6} {'Bars':<6} {'Files':>6} {'Rows':>11} {'CSV MB':>9} {'Frame MB':>9} "
+          f"{'Enc MB':>8} {'NPZ MB':>8} {'Memory':>7} {'Disk':>6}")
+    print("-" * 100)
+    for (ticker, bar_size), total in totals.iterrows():
+        files_count = int(((report['ticker'] == ticker) & (report['bar_size'] == bar_size)).sum())
+        print(f"{ticker:<6} {bar_size:<6} {files_count:>6} {int(total['rows']):>11,} "
+              f"{total['csv_bytes'] / mb:>9.1f} {total['frame_bytes'] / mb:>9.1f} "
+              f"{total['encoded_bytes'] / mb:>8.1f} {total['npz_bytes'] / mb:>8.1f} "
+              f"{total['frame_bytes'] / total['encoded_bytes']:>6.1f}x {total['csv_bytes'] / total['npz_bytes']:>5.1f}x")
+
+    bad = report[report['mismatches'] > 0]
+    if len(bad):
+        print(f"\nRound trip FAILED for {len(bad)} files:")
+        for _, row in bad.iterrows():
+            print(f"  {row['file']}: {row['mismatches']} rows differ")
+    else:
+        print(f"\nRound trip exact for all {len(report)} encoded files")
+    return report
+
+
+if __name__ == "__main__":
+    report = main()
+    sys.exit(1 if report is not None and (report['mismatches'] > 0).any() else 0)
@@ -15,8 +15,16 @@ Both gap-open and intraday scenarios can result in COMPLETE golden gates.
 import pandas as pd
 import numpy as np
 import os
+import sys
 from datetime import datetime
 
+# Add the src directory and the repository root (shared market_data package) to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from market_data.instrumentation import span, increment
+from result_store import record_run
+
 def calculate_atr_pine_script(high, low, close, period=14):
     """
     EXACT Pine Script ATR calculation using RMA methodology
@@ -115,15 +123,18 @@ def analyze_ticker_data(ticker, data_file):
     print(f"Loading: {data_file}")
     
     try:
-        data = pd.read_csv(data_file)
-        data['date'] = pd.to_datetime(data['date'])
-        data = data.sort_values('date').reset_index(drop=True)
+        with span('load', ticker=ticker):
+            data = pd.read_csv(data_file)
+            data['date'] = pd.to_datetime(data['date'])
+            data = data.sort_values('date').reset_index(drop=True)
+        increment('rows_loaded', len(data), ticker=ticker)
         
         print(f"  Loaded {len(data):,} records")
         print(f"  Date range: {data['date'].min().strftime('%Y-%m-%d')} to {data['date'].max().strftime('%Y-%m-%d')}")
         
         # Calculate ATR using corrected Pine Script methodology
-        data['atr'] = calculate_atr_pine_script(data['high'], data['low'], data['close'], 14)
+        with span('atr', ticker=ticker):
+            data['atr'] = calculate_atr_pine_script(data['high'], data['low'], data['close'], 14)
         # Remove first 14 rows to ensure proper ATR calculation (14-period warm-up)
         # The first 13 ATR values use insufficient data (1-13 days instead of 14)
         data = data.iloc[14:].reset_index(drop=True)
@@ -154,7 +165,8 @@ def analyze_ticker_data(ticker, data_file):
             if len(year_data) < 2:
                 continue
                 
-            year_result = analyze_year_subset(year_data, year, ticker)
+            with span('analyze', ticker=ticker):
+                year_result = analyze_year_subset(year_data, year, ticker)
             if year_result:
                 results.append(year_result)
                 total_gap_open_positive += year_result['gap_open_positive']
@@ -289,6 +301,51 @@ def analyze_year_subset(year_data, year, ticker):
         'end_date': year_data['date'].max()
     }
 
+def calculate_daily_scenario_flags(data):
+    """
+    Vectorized per-day scenario flags matching analyze_year_subset()
+    
+    Levels come from the previous row's close and ATR within the same year,
+    so the first trading day of each year is dropped just like the yearly loop.
+    
+    Args:
+        data (pd.DataFrame): Daily bars with 'date', 'open', 'high', 'low', 'close', 'atr'
+    
+    Returns:
+        pd.DataFrame: One row per analyzed day with boolean scenario/completion flags
+    """
+    year = data['date'].dt.year
+    previous_close = data['close'].shift(1)
+    previous_atr = data['atr'].shift(1)
+    
+    upper_382 = previous_close + previous_atr * 0.382
+    upper_618 = previous_close + previous_atr * 0.618
+    lower_382 = previous_close - previous_atr * 0.382
+    lower_618 = previous_close - previous_atr * 0.618
+    
+    high = data['high']
+    low = data['low']
+    open_price = data['open']
+    
+    touched_upper_382 = (low <= upper_382) & (upper_382 <= high)
+    touched_lower_382 = (low <= lower_382) & (lower_382 <= high)
+    gap_open_positive = open_price > upper_382
+    gap_open_negative = open_price < lower_382
+    
+    flags = pd.DataFrame({
+        'date': data['date'],
+        'year': year,
+        'gap_open_positive': gap_open_positive,
+        'gap_open_negative': gap_open_negative,
+        'intraday_positive': touched_upper_382 & ~gap_open_positive,
+        'intraday_negative': touched_lower_382 & ~gap_open_negative,
+        'completed_positive': (low <= upper_618) & (upper_618 <= high),
+        'completed_negative': (low <= lower_618) & (lower_618 <= high)
+    })
+    
+    first_day_of_year = year != year.shift(1)
+    return flags[~first_day_of_year].reset_index(drop=True)
+
 def main():
     """Run ENHANCED GAP-OPEN analysis on multiple tickers"""
     print("=" * 120)
@@ -408,7 +465,8 @@ def main():
     for ticker, result in all_results.items():
         yearly_df = pd.DataFrame(result['yearly_results'])
         yearly_file = f"data/analysis_results/{ticker}_enhanced_golden_gate_2000_2025.csv"
-        yearly_df.to_csv(yearly_file, index=False)
+        with span('export', ticker=ticker):
+            yearly_df.to_csv(yearly_file, index=False)
         print(f"\n{ticker} enhanced yearly results saved to: {yearly_file}")
     
     # Save comparison summary
@@ -446,9 +504,25 @@ def main():
     
     summary_df = pd.DataFrame(summary_data)
     summary_file = "data/analysis_results/enhanced_golden_gate_summary.csv"
-    summary_df.to_csv(summary_file, index=False)
+    with span('export'):
+        summary_df.to_csv(summary_file, index=False)
     print(f"\nEnhanced Golden Gate summary saved to: {summary_file}")
     
+    # Record the run in the result store (the CSVs above stay as exports)
+    with span('export', store='sqlite'):
+        run_id, db_file = record_run(
+            'enhanced_golden_gate',
+            {
+                'enhanced_yearly': pd.concat([pd.DataFrame(result['yearly_results']) for result in all_results.values()],
+                                             ignore_index=True),
+                'enhanced_summary': summary_df
+            },
+            parameters={'tickers': list(all_results), 'atr_period': 14, 'trigger_level': 0.382, 'target_level': 0.618},
+            sources={ticker: tickers[ticker] for ticker in all_results},
+            results_dir="data/analysis_results"
+        )
+    print(f"Run {run_id} recorded in result store: {db_file}")
+    
     print("\n" + "=" * 120)
     print("ENHANCED GAP-OPEN GOLDEN GATE ANALYSIS COMPLETED SUCCESSFULLY!")
     print("This analysis distinguishes between gap-open and intraday trigger scenarios")
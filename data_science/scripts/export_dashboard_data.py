@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Dashboard Data Export - Compact JSON Slices for the Static Pages
+Writes the numbers the analysis pages show as small pre-aggregated JSON files,
+one per page and ticker, so a page fetches only its own slice instead of
+carrying hand-pasted arrays inline:
+
+    assets/data/intraday/SPX.json       gap-open and intraday completion curves
+    assets/data/golden-gate/SPY.json    headline rates and yearly breakdown
+    assets/data/gap-fill/SPX.json       fill rates by ATR level, period, weekday, time
+    assets/data/manifest.json           files, sizes, hashes and source runs
+
+Tables are stored column-wise ({"columns": {"name": [values]}}) with floats
+rounded to FLOAT_DECIMALS and no whitespace, which keeps files small and
+compresses well under the gzip/brotli GitHub Pages applies in transit.
+Results come from the result store when it has them, otherwise from the CSVs.
+assets/js/components/dashboard-data.js loads the slices in the browser.
+"""
+
+import sys
+import os
+import json
+import hashlib
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+# Add the src directory and the repository root (shared market_data package) to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from result_store import RESULTS_DB, ResultStore, load_results
+
+FLOAT_DECIMALS = 2
+RATE_DECIMALS = 1
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'analysis_results')
+# enhanced_golden_gate_analysis.py saves relative to the working directory
+ENHANCED_RESULTS_DIR = os.path.join('data', 'analysis_results')
+ASSETS_DATA_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'assets', 'data')
+
+GAP_OPEN_CHECKPOINTS = ['09:30', '10:00', '10:30', '11:00', '11:30', '12:00', '12:30',
+                        '13:00', '13:30', '14:00', '14:30', '15:00', '15:30', '16:00']
+INTRADAY_HOURS = [half_hours / 2 for half_hours in range(1, 13)]
+
+
+def compact_table(frame, drop=()):
+    """Column-wise JSON-ready table with rounded floats and NaN as null"""
+    columns = {}
+    for col in frame.columns:
+        if col in drop:
+            continue
+        values = frame[col]
+        if pd.api.types.is_bool_dtype(values):
+            values = values.astype(int)
+        elif pd.api.types.is_float_dtype(values):
+            values = values.round(FLOAT_DECIMALS)
+        values = values.astype(object).where(values.notna(), None)
+        columns[str(col)] = [value.item() if isinstance(value, np.generic) else value for value in values]
+    return {'rows': len(frame), 'columns': columns}
+
+
+def completion_curve(results, direction_col, direction, checkpoints):
+    """Share (%) of one direction's events completed by each checkpoint column"""
+    subset = results[results[direction_col] == direction]
+    labels = [checkpoint for checkpoint in checkpoints if checkpoint in subset.columns]
+    data = [round(float(subset[label].eq(True).mean() * 100), RATE_DECIMALS) if len(subset) else None
+            for label in labels]
+    return {'labels': [label.lstrip('0') if ':' in label else label for label in labels], 'data': data}
+
+
+def elapsed_completion_curve(results, direction_col, direction, hours):
+    """
+    Share (%) of one direction's events whose target was first touched within
+    each number of hours after the trigger
+
+    The per-event hour columns of the intraday results are offsets from each
+    trigger's own time and stop at the completion bucket, so the curve is
+    built from trigger_time and first_touch_time instead.
+    """
+    subset = results[results[direction_col] == direction]
+    trigger = pd.to_datetime(subset['trigger_time'], format='%H:%M')
+    touch = pd.to_datetime(subset['first_touch_time'], format='%H:%M')
+    elapsed = (touch - trigger).dt.total_seconds() / 3600
+    reached = subset['target_reached'].eq(True).to_numpy()
+    data = [round(float(((elapsed <= hour).to_numpy() & reached).mean() * 100), RATE_DECIMALS) if len(subset) else None
+            for hour in hours]
+    return {'labels': [f"{hour:.1f}h" for hour in hours], 'data': data}
+
+
+def scenario_summary(results, direction_col):
+    summary = {}
+    for direction, subset in results.groupby(direction_col):
+        completed = int(subset['target_reached'].eq(True).sum())
+        summary[direction] = {
+            'events': len(subset),
+            'completed': completed,
+            'rate': round(completed / len(subset) * 100, RATE_DECIMALS)
+        }
+    return summary
+
+
+def intraday_slice(ticker='SPX'):
+    """Completion curves and counts behind pages/analysis/intraday.html"""
+    gap_open = load_results('state_managed_gap_open',
+                            os.path.join(RESULTS_DIR, 'state_managed_gap_open_results.csv'), RESULTS_DIR)
+    intraday = load_results('state_managed_intraday',
+                            os.path.join(RESULTS_DIR, 'state_managed_intraday_results.csv'), RESULTS_DIR)
+    if gap_open is None or intraday is None:
+        return None
+    return {
+        'ticker': ticker,
+        'date_range': [str(gap_open['date'].min())[:10], str(gap_open['date'].max())[:10]],
+        'gap_open': {
+            'summary': scenario_summary(gap_open, 'gap_open_type'),
+            'curves': {direction: completion_curve(gap_open, 'gap_open_type', direction, GAP_OPEN_CHECKPOINTS)
+                       for direction in ['positive', 'negative']}
+        },
+        'intraday': {
+            'summary': scenario_summary(intraday, 'trigger_type'),
+            'curves': {direction: elapsed_completion_curve(intraday, 'trigger_type', direction, INTRADAY_HOURS)
+                       for direction in ['positive', 'negative']}
+        }
+    }
+
+
+def golden_gate_slices():
+    """Per-ticker headline rates and yearly breakdown behind golden-gate.html"""
+    summary = load_results('enhanced_summary',
+                           os.path.join(ENHANCED_RESULTS_DIR, 'enhanced_golden_gate_summary.csv'), ENHANCED_RESULTS_DIR)
+    yearly = load_results('enhanced_yearly', None, ENHANCED_RESULTS_DIR)
+    if summary is None:
+        return {}
+    slices = {}
+    for _, row in summary.iterrows():
+        ticker = row['ticker']
+        headline = compact_table(summary[summary['ticker'] == ticker], drop=('ticker',))['columns']
+        ticker_yearly = yearly[yearly['ticker'] == ticker] if yearly is not None else None
+        if ticker_yearly is None:
+            yearly_file = os.path.join(ENHANCED_RESULTS_DIR, f"{ticker}_enhanced_golden_gate_2000_2025.csv")
+            ticker_yearly = pd.read_csv(yearly_file) if os.path.exists(yearly_file) else None
+        slices[ticker] = {
+            'ticker': ticker,
+            'summary': {name: values[0] for name, values in headline.items()},
+            'yearly': compact_table(ticker_yearly, drop=('ticker',)) if ticker_yearly is not None else None
+        }
+    return slices
+
+
+def gap_fill_slices():
+    """Per-ticker gap-fill tables behind gap-fill.html"""
+    tables = {}
+    for name in ['by_atr_level', 'by_period', 'by_weekday', 'time_distribution']:
+        path = os.path.join(RESULTS_DIR, f"gap_fill_{name}.csv")
+        if os.path.exists(path):
+            tables[name] = pd.read_csv(path)
+    tickers = sorted(set().union(*(set(table['ticker']) for table in tables.values()))) if tables else []
+    return {
+        ticker: {
+            'ticker': ticker,
+            **{name: compact_table(table[table['ticker'] == ticker], drop=('ticker',)) for name, table in tables.items()}
+        }
+        for ticker in tickers
+    }
+
+
+def latest_runs():
+    """Latest completed run id of each stored analysis the slices come from"""
+    runs = {}
+    for analysis, results_dir in [('state_managed_golden_gate', RESULTS_DIR),
+                                  ('enhanced_golden_gate', ENHANCED_RESULTS_DIR),
+                                  ('significance_tests', ENHANCED_RESULTS_DIR)]:
+        if os.path.exists(os.path.join(results_dir, RESULTS_DB)):
+            with ResultStore.in_directory(results_dir) as store:
+                runs[analysis] = store.latest_run_id(analysis=analysis)
+    return runs
+
+
+def write_slice(page, ticker, payload):
+    """
+    Write one page/ticker slice as minified JSON
+
+    Slices carry no timestamp, so unchanged results rewrite byte-identical files.
+
+    Returns:
+        tuple: (path relative to assets/data, bytes, sha256 prefix)
+    """
+    relative = f"{page}/{ticker}.json"
+    path = os.path.join(ASSETS_DATA_DIR, page, f"{ticker}.json")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    text = json.dumps({'page': page, **payload}, separators=(',', ':'), allow_nan=False)
+    with open(path, 'w') as f:
+        f.write(text)
+    return relative, len(text.encode()), hashlib.sha256(text.encode()).hexdigest()[:16]
+
+
+def main():
+    """Export every page's data slices and the manifest"""
+    print("=" * 100)
+    print("DASHBOARD DATA EXPORT")
+    print(f"Target: {os.path.abspath(ASSETS_DATA_DIR)}")
+    print("=" * 100)
+
+    generated_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    pages = {}
+    intraday = intraday_slice()
+    if intraday is not None:
+        pages['intraday'] = {'SPX': intraday}
+    else:
+        print("State-managed results not found - run state_managed_golden_gate_analysis.py")
+    pages['golden-gate'] = golden_gate_slices()
+    pages['gap-fill'] = gap_fill_slices()
+
+    manifest = {'generated_at': generated_at, 'source_runs': latest_runs(), 'pages': {}, 'files': {}}
+    for page, slices in pages.items():
+        if not slices:
+            print(f"{page:<12} no results to export")
+            continue
+        manifest['pages'][page] = sorted(slices)
+        for ticker, payload in slices.items():
+            relative, size, digest = write_slice(page, ticker, payload)
+            manifest['files'][relative] = {'bytes': size, 'sha256': digest}
+            print(f"{page:<12} {ticker:<6} {size / 1024:>7.1f} KB  {relative}")
+
+    if not manifest['files']:
+        print("Nothing exported")
+        return None
+    manifest_file = os.path.join(ASSETS_DATA_DIR, 'manifest.json')
+    with open(manifest_file, 'w') as f:
+        json.dump(manifest, f, indent=1)
+    total = sum(entry['bytes'] for entry in manifest['files'].values())
+    print(f"\n{len(manifest['files'])} files, {total / 1024:.1f} KB total | manifest: {manifest_file}")
+    return manifest
+
+
+if __name__ == "__main__":
+    main()
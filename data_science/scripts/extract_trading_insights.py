@@ -7,40 +7,83 @@ Answer questions like: "If it doesn't reach by 2pm EST, don't be hopeful"
 import pandas as pd
 import numpy as np
 import os
+import sys
 
-def analyze_corrected_gap_open_insights():
+# Add the src directory and the repository root (shared market_data package) to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from insights_cube import InsightsCube, CHECKPOINTS, TRIGGER_BUCKETS, source_signature, appended_since
+
+RESULTS_DIR = os.path.join('..', '..', 'data', 'analysis_results')
+GAP_FILE = os.path.join(RESULTS_DIR, 'corrected_intraday_gap_open_results.csv')
+INTRADAY_FILE = os.path.join(RESULTS_DIR, 'corrected_intraday_trigger_results.csv')
+CUBE_FILE = os.path.join(RESULTS_DIR, 'insights_cube.npz')
+
+def load_insights_cube(symbol='SPX'):
+    """
+    Load the materialized insights cube and fold in any new results
+    
+    Result CSVs are only re-read when their size/mtime changed since the
+    cube was last saved. A file that only had rows appended adds the sessions
+    after the cube's watermark; a file rewritten any other way (e.g. refined
+    historical outcomes) or removed makes the cube rebuild from every source.
+    """
+    cube = InsightsCube.load(CUBE_FILE) if os.path.exists(CUBE_FILE) else InsightsCube()
+    sources = [(scenario, result_file) for scenario, result_file in [('gap', GAP_FILE), ('intraday', INTRADAY_FILE)]
+               if os.path.exists(result_file)]
+    
+    changed = []
+    for scenario, result_file in sources:
+        stat = os.stat(result_file)
+        if cube.sources.get(result_file, [])[:2] != [stat.st_size, stat.st_mtime]:
+            changed.append((scenario, result_file))
+    removed = [result_file for result_file in cube.sources if not os.path.exists(result_file)]
+    if not changed and not removed:
+        return cube
+    
+    if removed or any(not appended_since(result_file, cube.sources.get(result_file)) for _, result_file in changed):
+        print("Insights cube: result files were rewritten, rebuilding")
+        cube = InsightsCube(regime_thresholds=cube.regime_thresholds)
+        changed = sources
+    
+    for scenario, result_file in changed:
+        signature = source_signature(result_file)
+        added = cube.add_results(pd.read_csv(result_file), symbol, scenario)
+        cube.sources[result_file] = signature
+        print(f"Insights cube: added {added} new {scenario} events from {result_file}")
+    
+    cube.save(CUBE_FILE)
+    return cube
+
+def analyze_corrected_gap_open_insights(cube):
     """Analyze corrected gap-open data for actionable trading insights"""
     print("=" * 80)
     print("CORRECTED GAP-OPEN TRADING INSIGHTS")
     print("=" * 80)
     
-    # Load corrected gap-open data
-    gap_file = os.path.join('..', '..', 'data', 'analysis_results', 'corrected_intraday_gap_open_results.csv')
-    gap_df = pd.read_csv(gap_file)
-    
-    print(f"Analyzing {len(gap_df)} corrected gap-open scenarios...")
+    print(f"Analyzing {cube.query(scenario='gap')['events']} corrected gap-open scenarios...")
     
     # Time columns for analysis (30-minute buckets)
-    time_cols = ['09:30', '10:00', '10:30', '11:00', '11:30', '12:00', '12:30', '13:00', '13:30', '14:00', '14:30', '15:00', '15:30', '16:00']
+    time_cols = CHECKPOINTS
     
     insights = {}
     
     # Analyze by gap type
     for gap_type in ['positive', 'negative']:
-        subset = gap_df[gap_df['gap_open_type'] == gap_type].copy()
+        total_events = cube.query(direction=gap_type, scenario='gap')['events']
         
-        if len(subset) == 0:
+        if total_events == 0:
             continue
             
-        print(f"\n{gap_type.upper()} GAP-OPENS ({len(subset)} events):")
+        print(f"\n{gap_type.upper()} GAP-OPENS ({total_events} events):")
         
         # Calculate completion rates by time
         completion_rates = {}
         for time_col in time_cols:
-            if time_col in subset.columns:
-                completion_rate = subset[time_col].mean() * 100
-                completion_rates[time_col] = completion_rate
-                print(f"  {time_col}: {completion_rate:.1f}%")
+            completion_rate = cube.completion_rate(checkpoint=time_col, direction=gap_type, scenario='gap')
+            completion_rates[time_col] = completion_rate
+            print(f"  {time_col}: {completion_rate:.1f}%")
         
         # Key insights for trading decisions
         print(f"\n  CRITICAL TRADING INSIGHTS:")
@@ -56,6 +99,10 @@ def analyze_corrected_gap_open_insights():
             print(f"    - Final completion rate: {rate_final:.1f}%")
             print(f"    - Late-day improvement: {late_day_improvement:+.1f}%")
             
+            not_done_by_2pm = cube.conditional_completion('14:00', direction=gap_type, scenario='gap')
+            print(f"    - If not completed by 2:00 PM: {not_done_by_2pm['rate']:.1f}% complete by close "
+                  f"({not_done_by_2pm['late_completions']} of {not_done_by_2pm['still_open']})")
+            
             if late_day_improvement < 3:
                 print(f"    ⚠️  RULE: If {gap_type} gap not completed by 2:00 PM, only {late_day_improvement:.1f}% additional chance")
             else:
@@ -89,47 +136,55 @@ def analyze_corrected_gap_open_insights():
                 print(f"    📊 RULE: {gap_type} gaps {direction} during lunch hour ({lunch_effect:+.1f}%)")
         
         # Overall success rate
-        overall_success = subset['target_reached'].mean() * 100
+        overall_success = cube.completion_rate(direction=gap_type, scenario='gap')
         print(f"  • Overall Success Rate: {overall_success:.1f}%")
         
         insights[gap_type] = {
-            'total_events': len(subset),
+            'total_events': total_events,
             'overall_success': overall_success,
             'completion_rates': completion_rates
         }
     
     return insights
 
-def analyze_corrected_intraday_insights():
+def analyze_corrected_intraday_insights(cube):
     """Analyze corrected intraday trigger data for actionable insights"""
     print("\n" + "=" * 80)
     print("CORRECTED INTRADAY TRIGGER TRADING INSIGHTS")
     print("=" * 80)
     
-    # Load corrected intraday data
-    intraday_file = os.path.join('..', '..', 'data', 'analysis_results', 'corrected_intraday_trigger_results.csv')
-    intraday_df = pd.read_csv(intraday_file)
-    
-    print(f"Analyzing {len(intraday_df)} corrected intraday trigger events...")
+    print(f"Analyzing {cube.query(scenario='intraday')['events']} corrected intraday trigger events...")
     
     insights = {}
     
+    # Trigger-time buckets grouped by clock hour, and by morning/afternoon
+    hour_buckets = {}
+    for bucket in TRIGGER_BUCKETS:
+        if ':' in bucket:
+            hour_buckets.setdefault(int(bucket[:2]), []).append(bucket)
+    morning_buckets = ['pre'] + [b for b in TRIGGER_BUCKETS if ':' in b and int(b[:2]) < 12]
+    afternoon_buckets = [b for b in TRIGGER_BUCKETS if b not in morning_buckets]
+    
     # Analyze by trigger type
     for trigger_type in ['positive', 'negative']:
-        subset = intraday_df[intraday_df['trigger_type'] == trigger_type].copy()
+        total_events = cube.query(direction=trigger_type, scenario='intraday')['events']
         
-        if len(subset) == 0:
+        if total_events == 0:
             continue
             
-        print(f"\n{trigger_type.upper()} INTRADAY TRIGGERS ({len(subset)} events):")
-        
-        # Convert trigger_time to hour for analysis
-        subset['trigger_hour'] = pd.to_datetime(subset['trigger_time'], format='%H:%M').dt.hour
+        print(f"\n{trigger_type.upper()} INTRADAY TRIGGERS ({total_events} events):")
         
         # Analyze success rates by trigger hour
-        hourly_success = subset.groupby('trigger_hour')['target_reached'].agg(['count', 'mean']).reset_index()
-        hourly_success.columns = ['hour', 'count', 'success_rate']
-        hourly_success['success_rate'] *= 100
+        hourly_rows = []
+        for hour, buckets in sorted(hour_buckets.items()):
+            counts = cube.query(direction=trigger_type, scenario='intraday', trigger_buckets=buckets)
+            if counts['events'] > 0:
+                hourly_rows.append({
+                    'hour': hour,
+                    'count': counts['events'],
+                    'success_rate': counts['completed'] / counts['events'] * 100
+                })
+        hourly_success = pd.DataFrame(hourly_rows, columns=['hour', 'count', 'success_rate'])
         
         print(f"  SUCCESS RATES BY TRIGGER HOUR:")
         best_hour = None
@@ -139,14 +194,14 @@ def analyze_corrected_intraday_insights():
         
         for _, row in hourly_success.iterrows():
             if row['count'] >= 50:  # Only consider hours with significant data
-                print(f"  • {row['hour']:02d}:00 hour: {row['success_rate']:.1f}% ({int(row['count'])} events)")
+                print(f"  • {int(row['hour']):02d}:00 hour: {row['success_rate']:.1f}% ({int(row['count'])} events)")
                 
                 if row['success_rate'] > best_rate:
                     best_rate = row['success_rate']
-                    best_hour = row['hour']
+                    best_hour = int(row['hour'])
                 if row['success_rate'] < worst_rate:
                     worst_rate = row['success_rate']
-                    worst_hour = row['hour']
+                    worst_hour = int(row['hour'])
         
         if best_hour and worst_hour:
             print(f"\n  TIMING INSIGHTS:")
@@ -155,12 +210,12 @@ def analyze_corrected_intraday_insights():
             print(f"  • Timing advantage: {best_rate - worst_rate:.1f}%")
         
         # Morning vs Afternoon analysis
-        morning_triggers = subset[subset['trigger_hour'] < 12]
-        afternoon_triggers = subset[subset['trigger_hour'] >= 12]
+        morning_triggers = cube.query(direction=trigger_type, scenario='intraday', trigger_buckets=morning_buckets)
+        afternoon_triggers = cube.query(direction=trigger_type, scenario='intraday', trigger_buckets=afternoon_buckets)
         
-        if len(morning_triggers) > 0 and len(afternoon_triggers) > 0:
-            morning_success = morning_triggers['target_reached'].mean() * 100
-            afternoon_success = afternoon_triggers['target_reached'].mean() * 100
+        if morning_triggers['events'] > 0 and afternoon_triggers['events'] > 0:
+            morning_success = morning_triggers['completed'] / morning_triggers['events'] * 100
+            afternoon_success = afternoon_triggers['completed'] / afternoon_triggers['events'] * 100
             
             print(f"\n  MORNING vs AFTERNOON:")
             print(f"  • Morning triggers (9:30-12:00): {morning_success:.1f}% success")
@@ -173,11 +228,11 @@ def analyze_corrected_intraday_insights():
                 print(f"  ⚠️  RULE: {trigger_type} triggers work {advantage:.1f}% better in {better_time}")
         
         # Overall success rate
-        overall_success = subset['target_reached'].mean() * 100
+        overall_success = cube.completion_rate(direction=trigger_type, scenario='intraday')
         print(f"  • Overall Success Rate: {overall_success:.1f}%")
         
         insights[trigger_type] = {
-            'total_events': len(subset),
+            'total_events': total_events,
             'overall_success': overall_success,
             'morning_success': morning_success if 'morning_success' in locals() else None,
             'afternoon_success': afternoon_success if 'afternoon_success' in locals() else None
@@ -277,11 +332,14 @@ def main():
     print("Using PREVIOUS day's close and ATR for CURRENT day's Golden Gate levels")
     print("Extracting actionable trading insights from 21 years of SPX data")
     
+    # Load (and incrementally update) the pre-aggregated insights cube
+    cube = load_insights_cube()
+    
     # Analyze corrected gap-open insights
-    gap_insights = analyze_corrected_gap_open_insights()
+    gap_insights = analyze_corrected_gap_open_insights(cube)
     
     # Analyze corrected intraday trigger insights
-    intraday_insights = analyze_corrected_intraday_insights()
+    intraday_insights = analyze_corrected_intraday_insights(cube)
     
     # Generate actionable trading rules
     trading_rules = generate_actionable_rules(gap_insights, intraday_insights)
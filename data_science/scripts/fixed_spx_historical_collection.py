@@ -11,25 +11,18 @@ from datetime import datetime, timedelta
 import time
 import logging
 
-# Add the src directory to the path
+# Add the src directory and the repository root (shared market_data package) to the path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
 from stock_data_pipeline import StockDataPipeline
+from market_data.instrumentation import span, increment
+from market_data.logging_config import setup_logging as configure_logging
 
 def setup_logging():
     """Setup logging for the historical data collection"""
     log_dir = os.path.join(os.path.dirname(__file__), '..', 'data', 'logs')
-    os.makedirs(log_dir, exist_ok=True)
-    log_file = os.path.join(log_dir, 'spx_collection.log')
-    
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_file),
-            logging.StreamHandler()
-        ]
-    )
+    return configure_logging(log_file=os.path.join(log_dir, 'spx_collection.log'))
 
 def collect_spx_historical_data():
     """
@@ -111,15 +104,17 @@ def collect_spx_historical_data():
                         batch_data = batch_data.drop_duplicates(subset=['date']).sort_values('date').reset_index(drop=True)
                         
                         # Save to file
-                        if not file_created:
-                            # Create file with headers
-                            batch_data.to_csv(output_file, index=False)
-                            file_created = True
-                            print(f"  SUCCESS: {len(batch_data)} records - FILE CREATED")
-                        else:
-                            # Append without headers
-                            batch_data.to_csv(output_file, mode='a', header=False, index=False)
-                            print(f"  SUCCESS: {len(batch_data)} records - APPENDED")
+                        with span('save', symbol=symbol):
+                            if not file_created:
+                                # Create file with headers
+                                batch_data.to_csv(output_file, index=False)
+                                file_created = True
+                                print(f"  SUCCESS: {len(batch_data)} records - FILE CREATED")
+                            else:
+                                # Append without headers
+                                batch_data.to_csv(output_file, mode='a', header=False, index=False)
+                                print(f"  SUCCESS: {len(batch_data)} records - APPENDED")
+                        increment('rows_saved', len(batch_data), symbol=symbol)
                         
                         total_records += len(batch_data)
                         print(f"  Total records so far: {total_records}")
@@ -135,7 +130,7 @@ def collect_spx_historical_data():
                 
         except Exception as e:
             print(f"  ERROR: {e}")
-            logging.error(f"Batch {batch_count} failed: {e}")
+            logging.error("Batch %s failed: %s", batch_count, e)
         
         # Move to next batch
         current_date = batch_end
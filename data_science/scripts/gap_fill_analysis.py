@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Gap-Fill Analysis Engine - 10-Minute Data
+Produces the statistics behind pages/analysis/gap-fill.html in one batch run:
+
+- Gap size in % and in ATR units (14-period Pine Script ATR of the previous day)
+- Whether and when the previous close was revisited during the session
+- Maximum adverse excursion (how far price ran away from the fill before filling)
+
+Every session of every ticker with a 10-minute store is stacked into one
+session x bar-slot array and measured at once; summaries are written per
+ATR bucket, period and weekday, with fill-time distributions per bucket.
+"""
+
+import sys
+import os
+import glob
+import numpy as np
+import pandas as pd
+
+# Add the src directory and the repository root (shared market_data package) to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from session_arrays import build_session_arrays, first_true_index
+from state_managed_golden_gate_analysis import calculate_atr_pine_script, create_daily_bars_from_10min
+
+# Gaps are opens at least this far (%) from the previous close
+GAP_THRESHOLD_PCT = 0.15
+
+# |gap| in ATR units -> gap-fill page categories
+ATR_BUCKET_EDGES = [0.236, 0.382, 0.618, 1.0]
+ATR_BUCKETS = ['Below Trigger', 'Trigger to 38.2%', '38.2% to 61.8%', '61.8% to 100%', 'Beyond 100%']
+
+PERIODS = [
+    ('2004-2009', 2004, 2009),
+    ('2010-2014', 2010, 2014),
+    ('2015-2019', 2015, 2019),
+    ('2020-2024', 2020, 2024),
+    ('2025-Present', 2025, 9999)
+]
+
+OPEN_MINUTES = 9 * 60 + 30
+BAR_MINUTES = 10
+FILL_CHECKPOINTS = ['09:40', '10:00', '10:30', '11:00', '12:00', '13:00', '14:00', '15:00', '16:00']
+
+
+def find_10min_files(data_root):
+    """Map ticker -> 10-minute data file for every ticker in the data store"""
+    files = {}
+    for path in sorted(glob.glob(os.path.join(data_root, '*', '10min', '*_10min_*.csv'))):
+        ticker = os.path.basename(os.path.dirname(os.path.dirname(path)))
+        files.setdefault(ticker, path)
+    return files
+
+
+def load_ticker_arrays(ticker, data_file):
+    """Load one ticker's 10-minute store as session arrays with previous-day ATR levels"""
+    data_10min = pd.read_csv(data_file)
+    data_10min['date'] = pd.to_datetime(data_10min['date'])
+    daily_bars = create_daily_bars_from_10min(data_10min)
+    daily_bars['atr'] = calculate_atr_pine_script(daily_bars['high'], daily_bars['low'], daily_bars['close'], 14)
+    daily_bars = daily_bars.iloc[14:].reset_index(drop=True)
+
+    arrays = build_session_arrays(data_10min, daily_bars)
+    arrays['ticker'] = np.full(len(arrays['dates']), ticker, dtype=object)
+    return arrays
+
+
+def stack_session_arrays(arrays_list):
+    """Concatenate session arrays of several tickers along the session axis"""
+    stacked = {'slot_minutes': arrays_list[0]['slot_minutes']}
+    for key in ['dates', 'ticker', 'open', 'high', 'low', 'close', 'previous_close', 'previous_atr', 'has_open_bar']:
+        stacked[key] = np.concatenate([arrays[key] for arrays in arrays_list])
+    return stacked
+
+
+def measure_gap_fills(arrays, threshold_pct=GAP_THRESHOLD_PCT):
+    """
+    Gap size, fill time and maximum adverse excursion for every gap session
+
+    Args:
+        arrays (dict): Session arrays (see build_session_arrays / stack_session_arrays)
+        threshold_pct (float): Minimum |gap| in % of the previous close
+
+    Returns:
+        pd.DataFrame: One row per gap session
+    """
+    open_price = arrays['open'][:, 0]
+    previous_close = arrays['previous_close']
+    previous_atr = arrays['previous_atr']
+    gap_points = open_price - previous_close
+    with np.errstate(invalid='ignore', divide='ignore'):
+        gap_pct = gap_points / previous_close * 100
+        is_gap = arrays['has_open_bar'] & (np.abs(gap_pct) >= threshold_pct) & (previous_atr > 0)
+    sessions = np.flatnonzero(is_gap)
+
+    up = gap_points[sessions] > 0
+    high = arrays['high'][sessions]
+    low = arrays['low'][sessions]
+    close = arrays['close'][sessions]
+    prev_close = previous_close[sessions, None]
+    n_slots = high.shape[1]
+
+    # Up gaps fill when a low revisits the previous close, down gaps when a high does
+    with np.errstate(invalid='ignore'):
+        touched = np.where(up[:, None], low <= prev_close, high >= prev_close)
+    fill_slot = first_true_index(touched)
+    filled = fill_slot < n_slots
+
+    # Adverse excursion: furthest move away from the fill, up to and including the fill bar
+    positions = np.arange(n_slots)[None, :]
+    window = positions <= fill_slot[:, None]
+    with np.errstate(invalid='ignore'):
+        run_up = np.nanmax(np.where(window, high, np.nan), axis=1) - open_price[sessions]
+        run_down = open_price[sessions] - np.nanmin(np.where(window, low, np.nan), axis=1)
+    mae_points = np.maximum(np.where(up, run_up, run_down), 0)
+
+    last_close = pd.DataFrame(close).ffill(axis=1).to_numpy()[:, -1]
+    slot_minutes = arrays['slot_minutes']
+    fill_minutes = np.where(filled, slot_minutes[np.minimum(fill_slot, n_slots - 1)], np.nan)
+    atr = previous_atr[sessions]
+    dates = pd.to_datetime(arrays['dates'][sessions])
+
+    results = pd.DataFrame({
+        'ticker': arrays['ticker'][sessions],
+        'date': dates.strftime('%Y-%m-%d'),
+        'year': dates.year,
+        'weekday': dates.day_name(),
+        'gap_direction': np.where(up, 'up', 'down'),
+        'open': open_price[sessions],
+        'previous_close': previous_close[sessions],
+        'previous_atr': atr,
+        'gap_pct': gap_pct[sessions],
+        'gap_atr': gap_points[sessions] / atr,
+        'filled': filled,
+        'fill_time': [f"{int(m) // 60:02d}:{int(m) % 60:02d}" if filled_ else '' for m, filled_ in zip(fill_minutes, filled)],
+        'minutes_to_fill': fill_minutes - slot_minutes[0],
+        'mae_pct': mae_points / open_price[sessions] * 100,
+        'mae_atr': mae_points / atr,
+        'close_gap_retained_pct': np.where(filled, np.nan, (last_close - previous_close[sessions]) / gap_points[sessions] * 100)
+    })
+    results['atr_bucket'] = pd.Categorical(
+        np.array(ATR_BUCKETS)[np.digitize(np.abs(results['gap_atr']), ATR_BUCKET_EDGES)],
+        categories=ATR_BUCKETS, ordered=True
+    )
+    results['period'] = assign_periods(results['year'])
+    return results
+
+
+def assign_periods(years):
+    """Label each year with its market-regime period"""
+    labels = np.full(len(years), '', dtype=object)
+    for label, first, last in PERIODS:
+        labels[(years >= first) & (years <= last)] = label
+    return labels
+
+
+def summarize_fills(results, group_cols):
+    """Fill rate, fill timing and MAE per group"""
+    grouped = results.groupby(group_cols, observed=True)
+    summary = grouped.agg(
+        gaps=('filled', 'size'),
+        filled=('filled', 'sum'),
+        avg_gap_atr=('gap_atr', lambda g: g.abs().mean()),
+        median_minutes_to_fill=('minutes_to_fill', 'median'),
+        avg_mae_atr=('mae_atr', 'mean'),
+        median_mae_atr=('mae_atr', 'median')
+    ).reset_index()
+    summary['fill_rate'] = summary['filled'] / summary['gaps'] * 100
+
+    # MAE for filled gaps only: how much heat a fade had to take before working
+    filled_mae = results[results['filled']].groupby(group_cols, observed=True)['mae_atr'].agg(
+        filled_mae_p50='median', filled_mae_p90=lambda g: g.quantile(0.9)
+    ).reset_index()
+    return summary.merge(filled_mae, on=group_cols, how='left')
+
+
+def fill_time_distribution(results, group_cols, checkpoints=FILL_CHECKPOINTS):
+    """
+    Cumulative % of gaps filled by each checkpoint, per group
+
+    A fill in the bar starting at t counts at t + 10 minutes (the bar's close).
+    """
+    checkpoint_minutes = np.array([int(c[:2]) * 60 + int(c[3:]) for c in checkpoints])
+    fill_done = results['minutes_to_fill'].to_numpy() + OPEN_MINUTES + BAR_MINUTES
+
+    group_ids = results.groupby(group_cols, observed=True).ngroup().to_numpy()
+    n_groups = group_ids.max() + 1 if len(group_ids) else 0
+    totals = np.bincount(group_ids, minlength=n_groups)
+
+    # Bin each fill into the first checkpoint at or after it, then cumulate
+    fill_bin = np.searchsorted(checkpoint_minutes, fill_done, side='left')
+    valid = ~np.isnan(fill_done) & (fill_bin < len(checkpoints))
+    counts = np.bincount(group_ids[valid] * len(checkpoints) + fill_bin[valid],
+                         minlength=n_groups * len(checkpoints)).reshape(n_groups, len(checkpoints))
+    cumulative = np.cumsum(counts, axis=1)
+
+    keys = results.groupby(group_cols, observed=True).size().reset_index()[group_cols]
+    distribution = keys.loc[keys.index.repeat(len(checkpoints))].reset_index(drop=True)
+    distribution['checkpoint'] = np.tile(checkpoints, n_groups)
+    distribution['gaps'] = np.repeat(totals, len(checkpoints))
+    distribution['filled_by'] = cumulative.ravel()
+    distribution['fill_rate_by'] = distribution['filled_by'] / distribution['gaps'] * 100
+    return distribution
+
+
+def main():
+    """Run the gap-fill analysis over every ticker's 10-minute store"""
+    print("=" * 100)
+    print("GAP-FILL ANALYSIS - 10-MINUTE DATA")
+    print(f"Gap: open >= {GAP_THRESHOLD_PCT}% from previous close | Fill: previous close revisited during the session")
+    print("=" * 100)
+
+    data_root = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'ticker_data')
+    data_files = find_10min_files(data_root)
+    if not data_files:
+        print(f"Error: no 10-minute data found under {data_root}")
+        return
+
+    arrays_list = []
+    for ticker, data_file in data_files.items():
+        print(f"Loading {ticker}: {data_file}")
+        arrays_list.append(load_ticker_arrays(ticker, data_file))
+    arrays = stack_session_arrays(arrays_list)
+
+    results = measure_gap_fills(arrays)
+    print(f"\nGap sessions: {len(results):,} across {len(data_files)} ticker(s)")
+
+    by_atr = summarize_fills(results, ['ticker', 'atr_bucket'])
+    by_period = summarize_fills(results, ['ticker', 'period', 'gap_direction'])
+    by_weekday = summarize_fills(results, ['ticker', 'weekday'])
+    distribution = fill_time_distribution(results, ['ticker', 'gap_direction', 'atr_bucket'])
+
+    results_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'analysis_results')
+    os.makedirs(results_dir, exist_ok=True)
+    outputs = {
+        'gap_fill_sessions.csv': results,
+        'gap_fill_by_atr_level.csv': by_atr,
+        'gap_fill_by_period.csv': by_period,
+        'gap_fill_by_weekday.csv': by_weekday,
+        'gap_fill_time_distribution.csv': distribution
+    }
+    for filename, frame in outputs.items():
+        frame.to_csv(os.path.join(results_dir, filename), index=False)
+    print(f"Results saved to: {results_dir}")
+
+    for ticker, ticker_results in results.groupby('ticker'):
+        print(f"\n{ticker}: {len(ticker_results):,} gaps, {ticker_results['filled'].mean() * 100:.1f}% filled")
+
+        print("  ATR LEVEL BREAKDOWN:")
+        for _, row in by_atr[by_atr['ticker'] == ticker].iterrows():
+            median_fill = f"{row['median_minutes_to_fill']:.0f} min" if pd.notna(row['median_minutes_to_fill']) else "n/a"
+            print(f"    {row['atr_bucket']:<18} {row['fill_rate']:>5.1f}% of {int(row['gaps']):>5} gaps | "
+                  f"median fill {median_fill:>8} | avg MAE {row['avg_mae_atr']:.2f} ATR")
+
+        print("  PERIODS:")
+        for _, row in by_period[by_period['ticker'] == ticker].iterrows():
+            print(f"    {row['period']:<13} {row['gap_direction']:<5} {row['fill_rate']:>5.1f}% of {int(row['gaps']):>5} gaps")
+
+    return results
+
+
+if __name__ == "__main__":
+    main()
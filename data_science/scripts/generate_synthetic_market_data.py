@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+Synthetic Market Data Generator
+Writes realistic OHLCV bars in the StockDataPipeline.process_data() schema so
+every analysis and ingestion path can be load-tested without licensed data:
+
+- GARCH(1,1) daily volatility clustering with a GBM price drift
+- Overnight gaps (a configurable share of daily variance)
+- U-shaped intraday volatility and volume profiles
+- Regular (9:30-16:00) or extended (4:00-20:00) sessions
+- Any bar size built from a 1-minute base path, plus daily bars
+
+Symbols are generated one calendar year at a time and appended straight into
+the data/ticker_data layout, so hundreds of symbols x decades of 1-minute bars
+never have to fit in memory. Symbols run in parallel on a process pool and
+each symbol has its own seed, so output does not depend on the worker count.
+"""
+
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+TRADING_DAYS_PER_YEAR = 252
+
+RTH_START_MINUTES = 9 * 60 + 30
+RTH_END_MINUTES = 16 * 60
+ETH_START_MINUTES = 4 * 60
+ETH_END_MINUTES = 20 * 60
+
+BAR_LABELS = {1: '1min', 5: '5min', 10: '10min', 15: '15min', 30: '30min', 60: '1hour'}
+
+PROCESSED_COLUMNS = ['date', 'symbol', 'open', 'high', 'low', 'close', 'volume',
+                     'daily_range', 'daily_change', 'daily_change_pct', 'index', 'average', 'barCount']
+
+# Rough starting price, annual volatility, annual drift and average daily volume
+SYMBOL_PROFILES = {
+    'SPX': {'price': 1100.0, 'volatility': 0.18, 'drift': 0.07, 'volume': 0},
+    'SPY': {'price': 110.0, 'volatility': 0.18, 'drift': 0.07, 'volume': 80_000_000},
+    'QQQ': {'price': 35.0, 'volatility': 0.24, 'drift': 0.10, 'volume': 50_000_000},
+    'NDX': {'price': 1400.0, 'volatility': 0.24, 'drift': 0.10, 'volume': 0},
+    'AAPL': {'price': 10.0, 'volatility': 0.32, 'drift': 0.20, 'volume': 90_000_000},
+    'MSFT': {'price': 25.0, 'volatility': 0.27, 'drift': 0.12, 'volume': 30_000_000},
+    'GOOGL': {'price': 50.0, 'volatility': 0.30, 'drift': 0.15, 'volume': 30_000_000},
+    'AMZN': {'price': 40.0, 'volatility': 0.38, 'drift': 0.18, 'volume': 60_000_000},
+    'TSLA': {'price': 20.0, 'volatility': 0.60, 'drift': 0.20, 'volume': 100_000_000},
+    'META': {'price': 30.0, 'volatility': 0.40, 'drift': 0.15, 'volume': 20_000_000},
+    'NVDA': {'price': 5.0, 'volatility': 0.50, 'drift': 0.25, 'volume': 50_000_000}
+}
+
+DEFAULT_CONFIG = {
+    'start': '2004-01-01',
+    'end': '2025-06-30',
+    'bar_sizes': [10],
+    'daily': True,
+    'extended_hours': False,
+    'gap_variance_share': 0.2,     # share of daily variance realized overnight
+    'garch_alpha': 0.08,
+    'garch_beta': 0.90,
+    'eth_volatility_ratio': 0.25,  # ETH minute volatility relative to average RTH
+    'eth_volume_ratio': 0.05
+}
+
+
+def symbol_profile(symbol, rng):
+    """Price/volatility/drift/volume profile for a symbol (random for unknown symbols)"""
+    if symbol in SYMBOL_PROFILES:
+        return SYMBOL_PROFILES[symbol]
+    return {
+        'price': float(np.exp(rng.uniform(np.log(5), np.log(500)))),
+        'volatility': float(rng.uniform(0.15, 0.6)),
+        'drift': float(rng.uniform(-0.02, 0.15)),
+        'volume': int(np.exp(rng.uniform(np.log(2e5), np.log(5e7))))
+    }
+
+
+def garch_daily_returns(n_days, volatility, drift, alpha, beta, rng):
+    """
+    Daily log returns with GARCH(1,1) volatility clustering
+
+    omega is set so the unconditional variance matches the annual volatility.
+    """
+    target_variance = volatility ** 2 / TRADING_DAYS_PER_YEAR
+    omega = target_variance * (1 - alpha - beta)
+    shocks = rng.standard_normal(n_days)
+    returns = np.empty(n_days)
+    variances = np.empty(n_days)
+    variance = target_variance
+    mean = drift / TRADING_DAYS_PER_YEAR
+    for day in range(n_days):
+        variances[day] = variance
+        returns[day] = np.sqrt(variance) * shocks[day]
+        variance = omega + alpha * returns[day] ** 2 + beta * variance
+    return mean - variances / 2 + returns, variances
+
+
+def session_minutes(extended_hours):
+    """Minute-of-day for every 1-minute bar in a session"""
+    if extended_hours:
+        return np.arange(ETH_START_MINUTES, ETH_END_MINUTES)
+    return np.arange(RTH_START_MINUTES, RTH_END_MINUTES)
+
+
+def intraday_profile(minutes, config):
+    """Relative variance and volume weights per minute (U-shaped in RTH, flat and low in ETH)"""
+    rth = (minutes >= RTH_START_MINUTES) & (minutes < RTH_END_MINUTES)
+    position = np.clip((minutes - RTH_START_MINUTES) / (RTH_END_MINUTES - RTH_START_MINUTES), 0, 1)
+    u_shape = 1 + 3 * (2 * position - 1) ** 4 + 2.5 * np.exp(-position * 40)
+
+    variance = np.where(rth, u_shape, config['eth_volatility_ratio'] ** 2)
+    variance = variance / variance[rth].sum()
+    volume = np.where(rth, u_shape, config['eth_volume_ratio'])
+    volume = volume / volume[rth].sum()
+    return variance, volume
+
+
+def simulate_minutes(previous_close, day_returns, day_variances, minutes, config, profile, rng):
+    """
+    1-minute OHLCV for a block of days
+
+    Each day's minute increments are a Gaussian walk with the intraday
+    variance profile, bridged so they add up to the GARCH day return.
+
+    Returns:
+        dict: (days x minutes) open/high/low/close/volume arrays and the last close
+    """
+    n_days, n_minutes = len(day_returns), len(minutes)
+    variance_weights, volume_weights = intraday_profile(minutes, config)
+    gap_share = config['gap_variance_share']
+
+    gaps = np.sqrt(gap_share * day_variances) * rng.standard_normal(n_days)
+    intraday_returns = day_returns - gaps
+    minute_variances = (1 - gap_share) * day_variances[:, None] * variance_weights[None, :]
+    steps = np.sqrt(minute_variances) * rng.standard_normal((n_days, n_minutes))
+
+    # Bridge: condition the walk on its total so each day realizes the GARCH return
+    bridge = minute_variances / minute_variances.sum(axis=1, keepdims=True)
+    steps += bridge * (intraday_returns - steps.sum(axis=1))[:, None]
+
+    log_day_open = np.log(previous_close) + np.concatenate([[0.0], np.cumsum(day_returns)[:-1]]) + gaps
+    log_close = log_day_open[:, None] + np.cumsum(steps, axis=1)
+    log_open = np.concatenate([log_day_open[:, None], log_close[:, :-1]], axis=1)
+
+    wick = np.sqrt(minute_variances) * 0.5
+    high = np.exp(np.maximum(log_open, log_close) + np.abs(rng.standard_normal(steps.shape)) * wick)
+    low = np.exp(np.minimum(log_open, log_close) - np.abs(rng.standard_normal(steps.shape)) * wick)
+
+    activity = 1 + 0.5 * np.abs(steps) / np.sqrt(minute_variances)
+    noise = np.exp(rng.normal(-0.045, 0.3, steps.shape))
+    volume = np.round(profile['volume'] * volume_weights[None, :] * activity * noise).astype(np.int64)
+
+    return {
+        'open': np.exp(log_open),
+        'high': high,
+        'low': low,
+        'close': np.exp(log_close),
+        'volume': volume,
+        'last_close': float(np.exp(log_close[-1, -1]))
+    }
+
+
+def aggregate_bars(minute_bars, bar_starts):
+    """Aggregate (days x minutes) 1-minute arrays into bars starting at the given minute offsets"""
+    n_days, n_minutes = minute_bars['open'].shape
+    offsets = (np.arange(n_days)[:, None] * n_minutes + bar_starts[None, :]).ravel()
+    last = np.append(offsets[1:], n_days * n_minutes) - 1
+
+    flat = {key: minute_bars[key].ravel() for key in ['open', 'high', 'low', 'close', 'volume']}
+    return {
+        'open': flat['open'][offsets],
+        'high': np.maximum.reduceat(flat['high'], offsets),
+        'low': np.minimum.reduceat(flat['low'], offsets),
+        'close': flat['close'][last],
+        'volume': np.add.reduceat(flat['volume'], offsets)
+    }
+
+
+def simulate_years(profile, days, config, rng):
+    """
+    Simulate 1-minute bars for a range of business days, one calendar year at a time
+
+    Daily returns are drawn for the whole range up front and each year starts
+    from the previous year's last close, so the path does not depend on how
+    the caller consumes it.
+
+    Yields:
+        tuple: (the year's days, simulate_minutes() arrays for them)
+    """
+    day_returns, day_variances = garch_daily_returns(
+        len(days), profile['volatility'], profile['drift'], config['garch_alpha'], config['garch_beta'], rng
+    )
+    minutes = session_minutes(config['extended_hours'])
+    previous_close = profile['price']
+    for year in sorted(set(days.year)):
+        in_year = np.flatnonzero(days.year == year)
+        minute_bars = simulate_minutes(previous_close, day_returns[in_year], day_variances[in_year],
+                                       minutes, config, profile, rng)
+        previous_close = minute_bars['last_close']
+        yield days[in_year], minute_bars
+
+
+def intraday_bars(minute_bars, year_days, minutes, bar_minutes):
+    """(timestamps, bars) of one bar size aggregated from simulated 1-minute arrays"""
+    bar_starts = np.arange(0, len(minutes), bar_minutes)
+    timestamps = (year_days.repeat(len(bar_starts)) +
+                  pd.to_timedelta(np.tile(minutes[bar_starts], len(year_days)), unit='min'))
+    return timestamps, aggregate_bars(minute_bars, bar_starts)
+
+
+def daily_bars(minute_bars, minutes):
+    """Daily bars over the regular session only, like create_daily_bars_from_10min()"""
+    rth_slice = np.flatnonzero((minutes >= RTH_START_MINUTES) & (minutes < RTH_END_MINUTES))
+    rth = {key: minute_bars[key][:, rth_slice] for key in ['open', 'high', 'low', 'close', 'volume']}
+    return aggregate_bars(rth, np.array([0]))
+
+
+def to_processed_frame(symbol, timestamps, bars, date_format, start_index=0):
+    """Build a frame in the process_data() column layout"""
+    frame = pd.DataFrame({
+        'date': timestamps.strftime(date_format),
+        'symbol': symbol,
+        'open': np.round(bars['open'], 2),
+        'high': np.round(bars['high'], 2),
+        'low': np.round(bars['low'], 2),
+        'close': np.round(bars['close'], 2),
+        'volume': bars['volume']
+    })
+    frame['daily_range'] = (frame['high'] - frame['low']).round(2)
+    frame['daily_change'] = (frame['close'] - frame['open']).round(2)
+    frame['daily_change_pct'] = (frame['daily_change'] / frame['open'] * 100).round(2)
+    frame['index'] = np.arange(start_index, start_index + len(frame))
+    frame['average'] = ((frame['high'] + frame['low'] + frame['close']) / 3).round(2)
+    frame['barCount'] = np.maximum(bars['volume'] // 100, 1)
+    return frame[PROCESSED_COLUMNS]
+
+
+def output_path(output_root, symbol, label, first_year, last_year):
+    """File path in the data/ticker_data layout read by the analysis scripts"""
+    suffix = 'present' if label == 'daily' else str(last_year)
+    return os.path.join(output_root, symbol, label, f"{symbol}_{label}_{first_year}_to_{suffix}.csv")
+
+
+def generate_symbol(symbol, config, seed, output_root):
+    """
+    Generate and write every configured bar size for one symbol
+
+    1-minute bars go to one file per year ({SYMBOL}_1min_{YYYY}.csv, read by
+    fine_bar_refinement.csv_store_loader) so decades of sessions do not become
+    one file per day; other bar sizes and daily bars are appended year by year
+    to a single file.
+
+    Returns:
+        dict: symbol, rows written per label, files written
+    """
+    rng = np.random.default_rng(seed)
+    profile = symbol_profile(symbol, rng)
+    days = pd.bdate_range(config['start'], config['end'])
+    if len(days) == 0:
+        return {'symbol': symbol, 'rows': {}, 'files': 0}
+
+    minutes = session_minutes(config['extended_hours'])
+    first_year, last_year = days[0].year, days[-1].year
+    rows = {}
+    files = set()
+
+    for year_days, minute_bars in simulate_years(profile, days, config, rng):
+        for bar_minutes in config['bar_sizes']:
+            label = BAR_LABELS.get(bar_minutes, f"{bar_minutes}min")
+            timestamps, bars = intraday_bars(minute_bars, year_days, minutes, bar_minutes)
+
+            if bar_minutes == 1:
+                path = os.path.join(output_root, symbol, label, f"{symbol}_1min_{year_days[0].year}.csv")
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                to_processed_frame(symbol, timestamps, bars, '%Y-%m-%d %H:%M:%S').to_csv(path, index=False)
+                files.add(path)
+            else:
+                path = output_path(output_root, symbol, label, first_year, last_year)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                frame = to_processed_frame(symbol, timestamps, bars, '%Y-%m-%d %H:%M:%S', rows.get(label, 0))
+                frame.to_csv(path, mode='a' if label in rows else 'w', header=label not in rows, index=False)
+                files.add(path)
+            rows[label] = rows.get(label, 0) + len(bars['open'])
+
+        if config['daily']:
+            path = output_path(output_root, symbol, 'daily', first_year, last_year)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            frame = to_processed_frame(symbol, year_days, daily_bars(minute_bars, minutes), '%Y-%m-%d',
+                                       rows.get('daily', 0))
+            frame.to_csv(path, mode='a' if 'daily' in rows else 'w', header='daily' not in rows, index=False)
+            files.add(path)
+            rows['daily'] = rows.get('daily', 0) + len(year_days)
+
+    return {'symbol': symbol, 'rows': rows, 'files': len(files)}
+
+
+def generate_frame(symbol, start, end, bar_minutes=10, seed=0, config=None):
+    """
+    Generate one symbol's bars in memory (bar_minutes=None for daily bars)
+
+    Returns:
+        pd.DataFrame: Bars in the process_data() layout with a datetime 'date' column
+    """
+    config = {**DEFAULT_CONFIG, **(config or {})}
+    rng = np.random.default_rng(seed)
+    profile = symbol_profile(symbol, rng)
+    minutes = session_minutes(config['extended_hours'])
+
+    frames = []
+    for year_days, minute_bars in simulate_years(profile, pd.bdate_range(start, end), config, rng):
+        if bar_minutes is None:
+            frames.append(to_processed_frame(symbol, year_days, daily_bars(minute_bars, minutes), '%Y-%m-%d'))
+        else:
+            timestamps, bars = intraday_bars(minute_bars, year_days, minutes, bar_minutes)
+            frames.append(to_processed_frame(symbol, timestamps, bars, '%Y-%m-%d %H:%M:%S'))
+
+    frame = pd.concat(frames, ignore_index=True)
+    frame['date'] = pd.to_datetime(frame['date'])
+    frame['index'] = np.arange(len(frame))
+    return frame
+
+
+def _generate_symbol_args(args):
+    return generate_symbol(*args)
+
+
+def generate_market_data(symbols, output_root, config=None, seed=0, workers=None):
+    """
+    Generate synthetic data for many symbols in parallel
+
+    Args:
+        symbols (list): Symbols to generate (unknown symbols get a random profile)
+        output_root (str): Root of the ticker_data layout to write into
+        config (dict): Overrides for DEFAULT_CONFIG
+        seed (int): Master seed; each symbol gets its own child seed
+        workers (int): Process pool size (None = os.cpu_count(), 1 = run in-process)
+
+    Returns:
+        list: generate_symbol() summaries
+    """
+    config = {**DEFAULT_CONFIG, **(config or {})}
+    seeds = np.random.SeedSequence(seed).spawn(len(symbols))
+    jobs = [(symbol, config, child, output_root) for symbol, child in zip(symbols, seeds)]
+
+    if workers == 1 or len(jobs) == 1:
+        return [_generate_symbol_args(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_generate_symbol_args, jobs))
+
+
+def synthetic_symbols(count, prefix='SYN'):
+    """Placeholder symbol names for scale tests (SYN0001, SYN0002, ...)"""
+    return [f"{prefix}{i:04d}" for i in range(1, count + 1)]
+
+
+def main(symbols=None, output_root=None, config=None, workers=None):
+    """Generate a synthetic copy of the SPX/SPY/QQQ store used by the analysis scripts"""
+    print("=" * 80)
+    print("SYNTHETIC MARKET DATA GENERATOR")
+    print("=" * 80)
+
+    symbols = symbols or ['SPX', 'SPY', 'QQQ']
+    output_root = output_root or os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'synthetic', 'ticker_data')
+    settings = {**DEFAULT_CONFIG, **(config or {})}
+    print(f"Symbols: {', '.join(symbols)}")
+    print(f"Range: {settings['start']} to {settings['end']} | bars: {settings['bar_sizes']} min"
+          f"{' + daily' if settings['daily'] else ''} | {'extended' if settings['extended_hours'] else 'regular'} hours")
+    print(f"Output: {output_root}")
+
+    start = datetime.now()
+    summaries = generate_market_data(symbols, output_root, settings, workers=workers)
+    elapsed = (datetime.now() - start).total_seconds()
+
+    total_rows = 0
+    for summary in summaries:
+        rows = ', '.join(f"{label}: {count:,}" for label, count in summary['rows'].items())
+        total_rows += sum(summary['rows'].values())
+        print(f"  {summary['symbol']:<8} {rows} ({summary['files']:,} files)")
+    print(f"\nWrote {total_rows:,} bars in {elapsed:.1f}s ({total_rows / max(elapsed, 1e-9):,.0f} bars/sec)")
+    print("Point the analysis scripts at this store by copying or linking it to data/ticker_data")
+
+    return summaries
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Golden Gate Monitor Replay Harness
+Pushes stored 10-minute (or finer) sessions through the live GoldenGateMonitor
+as fast as it can consume them and reports:
+- Throughput (bars/sec and events/sec)
+- End-to-end latency percentiles (bar enqueued -> events emitted)
+- Parity against state_managed_intraday_results.csv
+"""
+
+import sys
+import os
+import queue
+import threading
+import time as time_module
+import numpy as np
+import pandas as pd
+
+# Add the src directory and the repository root (shared market_data package) to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from golden_gate_monitor import GoldenGateMonitor
+from state_managed_golden_gate_analysis import (
+    calculate_atr_pine_script,
+    create_daily_bars_from_10min,
+    calculate_atr_levels
+)
+
+_SESSION = 0
+_BAR = 1
+_DONE = 2
+
+
+def build_replay_sessions(data_10min, daily_bars):
+    """
+    Build the (date, levels, previous_atr, bars) sessions to replay
+
+    Uses the same previous-day close/ATR levels and 14-day warm-up as
+    analyze_state_managed_scenarios() so the events are comparable.
+    """
+    daily_bars = daily_bars.copy()
+    daily_bars['atr'] = calculate_atr_pine_script(
+        daily_bars['high'], daily_bars['low'], daily_bars['close'], 14
+    )
+    daily_bars = daily_bars.iloc[14:].reset_index(drop=True)
+
+    data_10min = data_10min.sort_values('date').reset_index(drop=True)
+    bar_dates = data_10min['date'].dt.date.values
+    timestamps = data_10min['date'].dt.to_pydatetime()
+    prices = data_10min[['open', 'high', 'low', 'close']].to_numpy(dtype=float)
+
+    # Day boundaries in the sorted bar array
+    day_starts = {}
+    day_ends = {}
+    change = np.flatnonzero(bar_dates[1:] != bar_dates[:-1]) + 1
+    starts = np.concatenate(([0], change))
+    ends = np.concatenate((change, [len(bar_dates)]))
+    for start, end in zip(starts, ends):
+        day_starts[bar_dates[start]] = start
+        day_ends[bar_dates[start]] = end
+
+    sessions = []
+    trade_dates = daily_bars['trade_date'].values
+    closes = daily_bars['close'].values
+    atrs = daily_bars['atr'].values
+    for i in range(1, len(daily_bars)):
+        current_date = trade_dates[i]
+        if current_date not in day_starts:
+            continue
+        levels = calculate_atr_levels(closes[i - 1], atrs[i - 1])
+        start, end = day_starts[current_date], day_ends[current_date]
+        bars = [(timestamps[j],) + tuple(prices[j]) for j in range(start, end)]
+        sessions.append((current_date, levels, atrs[i - 1], bars))
+
+    return sessions
+
+
+def replay_sessions(sessions, queue_size=10000, refiner=None):
+    """
+    Replay sessions through the monitor at maximum speed
+
+    A producer thread stamps every bar as it is enqueued and the consumer
+    measures the time until the monitor has emitted that bar's events.
+    Pass the same FineBarRefiner used by the batch analysis to keep parity
+    on ambiguous trigger bars.
+
+    Returns:
+        tuple: (events list, stats dict)
+    """
+    bar_queue = queue.Queue(maxsize=queue_size)
+    monitor = GoldenGateMonitor(refiner=refiner)
+    events = []
+    bar_latencies_ns = []
+    event_latencies_ns = []
+    processing_ns = []
+
+    def produce():
+        perf_counter_ns = time_module.perf_counter_ns
+        put = bar_queue.put
+        for session_date, levels, previous_atr, bars in sessions:
+            put((_SESSION, perf_counter_ns(), (session_date, levels, previous_atr)))
+            for bar in bars:
+                put((_BAR, perf_counter_ns(), bar))
+        put((_DONE, perf_counter_ns(), None))
+
+    producer = threading.Thread(target=produce, daemon=True)
+    bar_count = 0
+
+    start_ns = time_module.perf_counter_ns()
+    producer.start()
+    perf_counter_ns = time_module.perf_counter_ns
+    get = bar_queue.get
+    while True:
+        kind, enqueued_ns, payload = get()
+        if kind == _BAR:
+            dequeued_ns = perf_counter_ns()
+            bar_events = monitor.on_bar(*payload)
+            emitted_ns = perf_counter_ns()
+            latency = emitted_ns - enqueued_ns
+            bar_latencies_ns.append(latency)
+            processing_ns.append(emitted_ns - dequeued_ns)
+            bar_count += 1
+            if bar_events:
+                events.extend(bar_events)
+                event_latencies_ns.extend([latency] * len(bar_events))
+        elif kind == _SESSION:
+            monitor.start_session(*payload)
+        else:
+            break
+    elapsed = (perf_counter_ns() - start_ns) / 1e9
+    producer.join()
+
+    stats = {
+        'sessions': len(sessions),
+        'bars': bar_count,
+        'events': len(events),
+        'elapsed_seconds': elapsed,
+        'bars_per_second': bar_count / elapsed if elapsed > 0 else 0,
+        'events_per_second': len(events) / elapsed if elapsed > 0 else 0
+    }
+    latency_sets = [('bar', bar_latencies_ns), ('event', event_latencies_ns), ('processing', processing_ns)]
+    for label, latencies in latency_sets:
+        if latencies:
+            pcts = np.percentile(np.asarray(latencies) / 1000.0, [50, 90, 99, 99.9])
+            stats[f'{label}_latency_us_p50'] = float(pcts[0])
+            stats[f'{label}_latency_us_p90'] = float(pcts[1])
+            stats[f'{label}_latency_us_p99'] = float(pcts[2])
+            stats[f'{label}_latency_us_p999'] = float(pcts[3])
+            stats[f'{label}_latency_us_max'] = max(latencies) / 1000.0
+
+    return events, stats
+
+
+def events_to_intraday_results(events):
+    """Collapse monitor events into rows comparable with state_managed_intraday_results.csv"""
+    rows = []
+    open_rows = {}
+    for event in events:
+        key = (event['date'], event['direction'])
+        if event['type'] == 'trigger':
+            row = {
+                'date': event['date'],
+                'trigger_time': event['timestamp'].strftime('%H:%M'),
+                'trigger_type': event['direction'],
+                'trigger_price': event['price'],
+                'trigger_level': event['trigger_level'],
+                'target_level': event['target_level'],
+                'target_reached': False,
+                'first_touch_time': None
+            }
+            rows.append(row)
+            open_rows[key] = row
+        elif event['type'] == 'complete' and not event['gap_open'] and key in open_rows:
+            open_rows[key]['target_reached'] = True
+            open_rows[key]['first_touch_time'] = event['timestamp'].strftime('%H:%M')
+    return pd.DataFrame(rows)
+
+
+def compare_with_batch_results(replayed, batch_file):
+    """
+    Compare replayed intraday events with the batch analysis output
+
+    Returns:
+        dict: Match/mismatch counts and the mismatching rows
+    """
+    batch = pd.read_csv(batch_file)
+    key_cols = ['date', 'trigger_type', 'trigger_time']
+    batch['date'] = pd.to_datetime(batch['date']).dt.date.astype(str)
+    replayed = replayed.copy()
+    replayed['date'] = replayed['date'].astype(str)
+
+    value_cols = ['target_reached'] + (['first_touch_time'] if 'first_touch_time' in batch.columns else [])
+    merged = batch[key_cols + value_cols].merge(
+        replayed[key_cols + value_cols],
+        on=key_cols, how='outer', suffixes=('_batch', '_replay'), indicator=True
+    )
+    both = merged[merged['_merge'] == 'both']
+    mismatch = both['target_reached_batch'].astype(bool) != both['target_reached_replay'].astype(bool)
+    if 'first_touch_time' in value_cols:
+        mismatch |= both['first_touch_time_batch'].fillna('') != both['first_touch_time_replay'].fillna('')
+    outcome_mismatch = both[mismatch]
+
+    return {
+        'batch_events': len(batch),
+        'replay_events': len(replayed),
+        'matched_events': len(both) - len(outcome_mismatch),
+        'outcome_mismatches': len(outcome_mismatch),
+        'missing_in_replay': int((merged['_merge'] == 'left_only').sum()),
+        'extra_in_replay': int((merged['_merge'] == 'right_only').sum()),
+        'mismatches': pd.concat([outcome_mismatch, merged[merged['_merge'] != 'both']])
+    }
+
+
+def main():
+    """Replay the stored SPX 10-minute history through the live monitor"""
+    print("=" * 80)
+    print("GOLDEN GATE MONITOR REPLAY HARNESS")
+    print("=" * 80)
+
+    data_file = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'ticker_data', 'SPX', '10min', 'SPX_10min_2004_to_2025.csv')
+    results_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'analysis_results')
+    batch_file = os.path.join(results_dir, 'state_managed_intraday_results.csv')
+
+    if not os.path.exists(data_file):
+        print(f"Error: SPX data file not found at {data_file}")
+        return
+
+    print(f"Loading bars from: {data_file}")
+    data_10min = pd.read_csv(data_file)
+    data_10min['date'] = pd.to_datetime(data_10min['date'])
+    daily_bars = create_daily_bars_from_10min(data_10min)
+
+    sessions = build_replay_sessions(data_10min, daily_bars)
+    print(f"Prepared {len(sessions):,} sessions for replay")
+
+    events, stats = replay_sessions(sessions)
+
+    print("\nTHROUGHPUT:")
+    print(f"  Sessions: {stats['sessions']:,}")
+    print(f"  Bars: {stats['bars']:,}")
+    print(f"  Events: {stats['events']:,}")
+    print(f"  Elapsed: {stats['elapsed_seconds']:.2f}s")
+    print(f"  Bars/sec: {stats['bars_per_second']:,.0f}")
+    print(f"  Events/sec: {stats['events_per_second']:,.0f}")
+
+    if 'event_latency_us_p50' in stats:
+        print("\nEND-TO-END EVENT LATENCY (microseconds, includes queueing):")
+        for pct in ['p50', 'p90', 'p99', 'p999', 'max']:
+            print(f"  {pct}: {stats[f'event_latency_us_{pct}']:.1f}")
+        print("\nMONITOR PROCESSING LATENCY PER BAR (microseconds):")
+        for pct in ['p50', 'p90', 'p99', 'p999', 'max']:
+            print(f"  {pct}: {stats[f'processing_latency_us_{pct}']:.1f}")
+
+    replayed = events_to_intraday_results(events)
+
+    if os.path.exists(batch_file):
+        comparison = compare_with_batch_results(replayed, batch_file)
+        print("\nPARITY WITH BATCH ANALYSIS:")
+        print(f"  Batch intraday events: {comparison['batch_events']:,}")
+        print(f"  Replayed intraday events: {comparison['replay_events']:,}")
+        print(f"  Matched: {comparison['matched_events']:,}")
+        print(f"  Outcome mismatches: {comparison['outcome_mismatches']:,}")
+        print(f"  Missing in replay: {comparison['missing_in_replay']:,}")
+        print(f"  Extra in replay: {comparison['extra_in_replay']:,}")
+
+        if len(comparison['mismatches']) > 0:
+            mismatch_file = os.path.join(results_dir, 'monitor_replay_mismatches.csv')
+            comparison['mismatches'].to_csv(mismatch_file, index=False)
+            print(f"  Mismatches saved to: {mismatch_file}")
+    else:
+        print(f"\nBatch results not found at {batch_file} - skipping parity check")
+
+    stats_file = os.path.join(results_dir, 'monitor_replay_stats.csv')
+    os.makedirs(results_dir, exist_ok=True)
+    pd.DataFrame([stats]).to_csv(stats_file, index=False)
+    print(f"\nReplay statistics saved to: {stats_file}")
+
+    return stats
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Rolling-Window and Walk-Forward Golden Gate Completion Rates
+Tracks regime drift in the enhanced analysis rates instead of per-calendar-year
+or all-history numbers:
+
+- Rolling N-session completion rates for every scenario (gap-open, intraday,
+  combined; positive and negative) as a daily time series per ticker
+- Walk-forward folds: rate over a training window (expanding or trailing)
+  next to the rate over the following out-of-sample window
+
+Window sums come from differencing cumulative sums, so every window position
+costs O(1) regardless of the window length.
+"""
+
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+# Add the src directory and the repository root (shared market_data package) to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from bootstrap_confidence_intervals import RATE_METRICS, load_daily_flags, rate_metric_arrays
+
+ROLLING_WINDOWS = [63, 252]
+WALK_FORWARD_TRAIN = 756
+WALK_FORWARD_TEST = 63
+
+
+def _prefix_sums(values):
+    """Cumulative sums with a leading zero row so window totals are c[end] - c[start]"""
+    values = np.asarray(values, dtype=np.int64)
+    return np.concatenate([np.zeros((1,) + values.shape[1:], dtype=np.int64), np.cumsum(values, axis=0)])
+
+
+def window_totals(prefix, start, end):
+    """Totals over sessions [start, end) for arrays of window bounds"""
+    return prefix[end] - prefix[start]
+
+
+def _rates(successes, events):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(events > 0, successes / events * 100, np.nan)
+
+
+def rolling_completion_rates(flags, windows=ROLLING_WINDOWS, min_events=1):
+    """
+    Trailing N-session completion rates for every RATE_METRICS entry
+
+    Args:
+        flags (pd.DataFrame): Daily scenario flags (calculate_daily_scenario_flags)
+        windows (list): Window lengths in sessions
+        min_events (int): Minimum scenario count in the window to report a rate
+
+    Returns:
+        pd.DataFrame: date plus {metric}_{N} rate and {metric}_{N}_events columns
+    """
+    events, successes = rate_metric_arrays(flags)
+    event_prefix = _prefix_sums(events)
+    success_prefix = _prefix_sums(successes)
+    n_sessions = len(flags)
+
+    result = {'date': flags['date'].to_numpy()}
+    end = np.arange(1, n_sessions + 1)
+    for window in windows:
+        start = np.maximum(end - window, 0)
+        window_events = window_totals(event_prefix, start, end)
+        window_successes = window_totals(success_prefix, start, end)
+        rates = _rates(window_successes, window_events)
+
+        # Partial windows at the start of the history are not reported
+        incomplete = (end < window)[:, None] | (window_events < min_events)
+        rates = np.where(incomplete, np.nan, rates)
+
+        for column, metric in enumerate(RATE_METRICS):
+            result[f"{metric}_{window}"] = rates[:, column]
+            result[f"{metric}_{window}_events"] = window_events[:, column]
+
+    return pd.DataFrame(result)
+
+
+def walk_forward_rates(flags, train_sessions=WALK_FORWARD_TRAIN, test_sessions=WALK_FORWARD_TEST, expanding=True):
+    """
+    In-sample vs next out-of-sample completion rates for consecutive folds
+
+    Args:
+        flags (pd.DataFrame): Daily scenario flags
+        train_sessions (int): Sessions before the first test window (the trailing
+                              training length when expanding=False)
+        test_sessions (int): Out-of-sample sessions per fold (also the step)
+        expanding (bool): Train on all history before the fold instead of a trailing window
+
+    Returns:
+        pd.DataFrame: One row per (fold, metric)
+    """
+    events, successes = rate_metric_arrays(flags)
+    event_prefix = _prefix_sums(events)
+    success_prefix = _prefix_sums(successes)
+    n_sessions = len(flags)
+    dates = pd.to_datetime(flags['date']).dt.strftime('%Y-%m-%d').to_numpy()
+
+    test_start = np.arange(train_sessions, n_sessions - test_sessions + 1, test_sessions)
+    if len(test_start) == 0:
+        return pd.DataFrame()
+    test_end = test_start + test_sessions
+    train_start = np.zeros_like(test_start) if expanding else test_start - train_sessions
+
+    train_events = window_totals(event_prefix, train_start, test_start)
+    train_successes = window_totals(success_prefix, train_start, test_start)
+    test_events = window_totals(event_prefix, test_start, test_end)
+    test_successes = window_totals(success_prefix, test_start, test_end)
+    train_rate = _rates(train_successes, train_events)
+    test_rate = _rates(test_successes, test_events)
+
+    metrics = list(RATE_METRICS)
+    n_folds, n_metrics = len(test_start), len(metrics)
+    return pd.DataFrame({
+        'fold': np.repeat(np.arange(n_folds), n_metrics),
+        'train_start': np.repeat(dates[train_start], n_metrics),
+        'test_start': np.repeat(dates[test_start], n_metrics),
+        'test_end': np.repeat(dates[test_end - 1], n_metrics),
+        'metric': np.tile(metrics, n_folds),
+        'train_events': train_events.ravel(),
+        'train_rate': train_rate.ravel(),
+        'test_events': test_events.ravel(),
+        'test_rate': test_rate.ravel(),
+        'rate_change': (test_rate - train_rate).ravel()
+    })
+
+
+def main():
+    """Write rolling and walk-forward completion rate series per ticker"""
+    print("=" * 100)
+    print("ROLLING & WALK-FORWARD GOLDEN GATE COMPLETION RATES")
+    print(f"Rolling windows: {', '.join(str(w) for w in ROLLING_WINDOWS)} sessions | "
+          f"Walk-forward: {WALK_FORWARD_TRAIN} train / {WALK_FORWARD_TEST} test sessions")
+    print("=" * 100)
+
+    tickers = {
+        'SPY': '../../data/ticker_data/SPY/daily/SPY_daily_2000_to_present.csv',
+        'QQQ': '../../data/ticker_data/QQQ/daily/QQQ_daily_2000_to_present.csv'
+    }
+    results_dir = os.path.join('data', 'analysis_results')
+    os.makedirs(results_dir, exist_ok=True)
+
+    for ticker, data_file in tickers.items():
+        if not os.path.exists(data_file):
+            print(f"Data file not found for {ticker}: {data_file}")
+            continue
+
+        flags = load_daily_flags(data_file)
+        rolling = rolling_completion_rates(flags)
+        walk_forward = walk_forward_rates(flags)
+
+        rolling_file = os.path.join(results_dir, f"{ticker}_rolling_completion_rates.csv")
+        walk_forward_file = os.path.join(results_dir, f"{ticker}_walk_forward_rates.csv")
+        rolling.to_csv(rolling_file, index=False)
+        walk_forward.to_csv(walk_forward_file, index=False)
+
+        print(f"\n{ticker} ({len(flags):,} sessions):")
+        window = ROLLING_WINDOWS[-1]
+        print(f"  {'Metric':<26} {'Latest ' + str(window) + 'd':>12} {'Min':>8} {'Max':>8}")
+        for metric in RATE_METRICS:
+            series = rolling[f"{metric}_{window}"]
+            latest = series.dropna().iloc[-1] if series.notna().any() else np.nan
+            print(f"  {metric:<26} {latest:>11.1f}% {series.min():>7.1f}% {series.max():>7.1f}%")
+
+        if len(walk_forward):
+            drift = walk_forward.groupby('metric')['rate_change'].agg(['mean', 'std'])
+            print(f"  Walk-forward ({walk_forward['fold'].nunique()} folds) out-of-sample minus in-sample:")
+            for metric, row in drift.iterrows():
+                print(f"    {metric:<26} mean {row['mean']:>+6.1f} pts | std {row['std']:>5.1f} pts")
+
+        print(f"  Saved: {rolling_file}, {walk_forward_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Vectorized Backtest Engine for Golden Gate Trading Rules
+Turns the text rules from extract_trading_insights.generate_actionable_rules()
+into trades and simulates every variant at once over the intraday store:
+
+- Entry: gap-open (market open price) or intraday trigger (±38.2% ATR level)
+- Target: ±N% ATR from previous close (61.8% by default)
+- Price stop: entry ∓ k × ATR
+- Time stop: exit at the checkpoint if neither target nor stop was hit
+  ("if not completed by 2:00 PM, get out")
+- Costs: round-trip transaction cost in basis points
+
+All sessions x targets x stops x time stops x costs are evaluated in array
+form; only the four (entry, direction) combinations are looped over.
+"""
+
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+# Add the src directory and the repository root (shared market_data package) to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from session_arrays import build_session_arrays, first_true_index
+from state_managed_golden_gate_analysis import calculate_atr_pine_script, create_daily_bars_from_10min
+
+TARGET_ATR_MULTIPLES = [0.5, 0.618, 0.786, 1.0]
+STOP_ATR_MULTIPLES = [0.1, 0.236, 0.382, 0.5, np.inf]
+TIME_STOPS = ['11:00', '12:00', '13:00', '14:00', '15:00', '16:00']
+COSTS_BPS = [0.0, 1.0, 2.0, 5.0]
+TRIGGER_ATR_MULTIPLE = 0.382
+
+
+def _clock_minutes(clock):
+    hours, minutes = clock.split(':')
+    return int(hours) * 60 + int(minutes)
+
+
+def find_entries(arrays, direction, entry_type):
+    """
+    Entry slot and price per session for one (direction, entry type)
+
+    Follows the state-managed rules: gap-opens are decided on the open bar,
+    intraday triggers are the first later bar touching ±38.2% ATR, and a
+    direction that gapped open cannot also trigger intraday.
+
+    Returns:
+        tuple: (has_entry, entry_slot, entry_price) arrays over sessions
+    """
+    sign = 1 if direction == 'positive' else -1
+    trigger_level = arrays['previous_close'] + sign * arrays['previous_atr'] * TRIGGER_ATR_MULTIPLE
+    open_price = arrays['open'][:, 0]
+    with np.errstate(invalid='ignore'):
+        gap_open = arrays['has_open_bar'] & (sign * (open_price - trigger_level) > 0)
+
+    n_sessions, n_slots = arrays['open'].shape
+    if entry_type == 'gap_open':
+        return gap_open, np.zeros(n_sessions, dtype=int), open_price
+
+    touch_prices = arrays['high'] if direction == 'positive' else arrays['low']
+    with np.errstate(invalid='ignore'):
+        touched = sign * (touch_prices - trigger_level[:, None]) >= 0
+    entry_slot = first_true_index(touched, start=1)
+    has_entry = arrays['has_open_bar'] & ~gap_open & (entry_slot < n_slots)
+    entry_slot = np.minimum(entry_slot, n_slots - 1)
+
+    # Fill at the level, or at the bar open if the bar opened beyond it
+    bar_open = arrays['open'][np.arange(n_sessions), entry_slot]
+    entry_price = np.where(sign * (bar_open - trigger_level) > 0, bar_open, trigger_level)
+    return has_entry, entry_slot, entry_price
+
+
+def simulate_variants(arrays, direction, entry_type, target_multiples=TARGET_ATR_MULTIPLES,
+                      stop_multiples=STOP_ATR_MULTIPLES, time_stops=TIME_STOPS, costs_bps=COSTS_BPS):
+    """
+    Simulate every (target, stop, time stop, cost) variant for one entry rule
+
+    When target and stop fall in the same bar the stop is assumed to come
+    first (conservative). Intraday-trigger entries only look at bars after
+    the trigger bar, matching the state-managed completion rule.
+
+    Returns:
+        tuple: (returns_pct, exit_reason, sessions) with returns shaped
+               (sessions, targets, stops, time_stops, costs); NaN where the
+               entry came after the variant's time stop
+    """
+    sign = 1 if direction == 'positive' else -1
+    has_entry, entry_slot, entry_price = find_entries(arrays, direction, entry_type)
+    sessions = np.flatnonzero(has_entry)
+    entry_slot = entry_slot[sessions]
+    entry_price = entry_price[sessions]
+    atr = arrays['previous_atr'][sessions]
+    previous_close = arrays['previous_close'][sessions]
+    high = arrays['high'][sessions]
+    low = arrays['low'][sessions]
+    open_ = arrays['open'][sessions]
+    close = arrays['close'][sessions]
+    n_slots = high.shape[1]
+
+    favourable = high if direction == 'positive' else low
+    adverse = low if direction == 'positive' else high
+    first_slot = entry_slot if entry_type == 'gap_open' else entry_slot + 1
+
+    target_multiples = np.asarray(target_multiples, dtype=float)
+    stop_multiples = np.asarray(stop_multiples, dtype=float)
+    targets = previous_close[:, None] + sign * atr[:, None] * target_multiples[None, :]
+    stops = entry_price[:, None] - sign * atr[:, None] * stop_multiples[None, :]
+
+    with np.errstate(invalid='ignore'):
+        target_hit = sign * (favourable[:, :, None] - targets[:, None, :]) >= 0
+        stop_hit = sign * (adverse[:, :, None] - stops[:, None, :]) <= 0
+    start = first_slot[:, None, None]
+    target_slot = first_true_index(target_hit, axis=1, start=start)
+    stop_slot = first_true_index(stop_hit, axis=1, start=start)
+
+    # Time stop: exit at the close of the last bar before the checkpoint
+    slot_minutes = arrays['slot_minutes']
+    bar_size = slot_minutes[1] - slot_minutes[0] if len(slot_minutes) > 1 else 10
+    time_slot = np.array([np.searchsorted(slot_minutes, _clock_minutes(t) - bar_size, side='right') - 1 for t in time_stops])
+    time_slot = np.clip(time_slot, 0, n_slots - 1)
+
+    # Last available close at or before each time stop (bars can be missing)
+    filled_close = pd.DataFrame(close).ffill(axis=1).to_numpy()
+    time_exit_price = filled_close[:, time_slot]
+
+    # Shapes: (sessions, targets, stops, time_stops)
+    t_slot = target_slot[:, :, None, None]
+    s_slot = stop_slot[:, None, :, None]
+    ts = time_slot[None, None, None, :]
+    # Triggers at or after the time stop are not traded under that variant
+    taken = entry_slot[:, None, None, None] <= ts if entry_type == 'gap_open' else entry_slot[:, None, None, None] < ts
+
+    stop_first = (s_slot <= t_slot) & (s_slot <= ts) & (s_slot < n_slots)
+    target_first = ~stop_first & (t_slot <= ts) & (t_slot < n_slots)
+
+    # Stops fill at the stop or at a worse bar open (gap through the stop)
+    stop_fill_slot = np.minimum(stop_slot, n_slots - 1)
+    stop_bar_open = np.take_along_axis(open_, stop_fill_slot, axis=1)
+    stop_price = np.where(sign * (stop_bar_open - stops) < 0, stop_bar_open, stops)
+    stop_price = np.where(np.isnan(stop_price), stops, stop_price)
+
+    # Targets fill at the target, or at the entry if the trade started beyond it
+    target_price = np.where(sign * (entry_price[:, None] - targets) > 0, entry_price[:, None], targets)
+
+    exit_price = np.where(
+        stop_first, stop_price[:, None, :, None],
+        np.where(target_first, target_price[:, :, None, None], time_exit_price[:, None, None, :])
+    )
+    exit_price = np.where(np.isnan(exit_price), entry_price[:, None, None, None], exit_price)
+    exit_price = np.where(taken, exit_price, np.nan)
+    exit_reason = np.where(~taken, 'none', np.where(stop_first, 'stop', np.where(target_first, 'target', 'time')))
+
+    gross_pct = sign * (exit_price - entry_price[:, None, None, None]) / entry_price[:, None, None, None] * 100
+    costs_pct = np.asarray(costs_bps, dtype=float) / 100
+    returns_pct = gross_pct[..., None] - costs_pct
+
+    return returns_pct, exit_reason, sessions
+
+
+def summarize_variants(returns_pct, exit_reason, direction, entry_type, target_multiples=TARGET_ATR_MULTIPLES,
+                       stop_multiples=STOP_ATR_MULTIPLES, time_stops=TIME_STOPS, costs_bps=COSTS_BPS):
+    """
+    Per-variant trade statistics (computed along the session axis for all variants at once)
+
+    Returns:
+        pd.DataFrame: One row per variant
+    """
+    shape = returns_pct.shape[1:]
+    if returns_pct.shape[0] == 0:
+        return pd.DataFrame()
+
+    # Skipped trades (NaN) contribute nothing to the equity curve
+    traded = ~np.isnan(returns_pct)
+    n_trades = traded.sum(axis=0)
+    returns = np.where(traded, returns_pct, 0.0)
+
+    equity = np.cumsum(returns, axis=0)
+    running_peak = np.maximum.accumulate(np.concatenate([np.zeros((1,) + shape), equity]), axis=0)[1:]
+    max_drawdown = (running_peak - equity).max(axis=0)
+
+    wins = (returns > 0).sum(axis=0)
+    gains = np.where(returns > 0, returns, 0).sum(axis=0)
+    losses = -np.where(returns < 0, returns, 0).sum(axis=0)
+    target_exits = np.broadcast_to((exit_reason == 'target')[..., None], shape=returns.shape).sum(axis=0)
+    stop_exits = np.broadcast_to((exit_reason == 'stop')[..., None], shape=returns.shape).sum(axis=0)
+
+    grid = np.meshgrid(np.arange(shape[0]), np.arange(shape[1]), np.arange(shape[2]), np.arange(shape[3]), indexing='ij')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        profit_factor = np.where(losses > 0, gains / losses, np.inf)
+        hit_rate = target_exits / n_trades * 100
+        stop_rate = stop_exits / n_trades * 100
+        win_rate = wins / n_trades * 100
+        avg_return = equity[-1] / n_trades
+
+    return pd.DataFrame({
+        'entry_type': entry_type,
+        'direction': direction,
+        'target_atr': np.asarray(target_multiples)[grid[0].ravel()],
+        'stop_atr': np.asarray(stop_multiples)[grid[1].ravel()],
+        'time_stop': np.asarray(time_stops)[grid[2].ravel()],
+        'cost_bps': np.asarray(costs_bps)[grid[3].ravel()],
+        'trades': n_trades.ravel(),
+        'hit_rate': hit_rate.ravel(),
+        'stop_rate': stop_rate.ravel(),
+        'win_rate': win_rate.ravel(),
+        'avg_return_pct': avg_return.ravel(),
+        'total_return_pct': equity[-1].ravel(),
+        'max_drawdown_pct': max_drawdown.ravel(),
+        'profit_factor': profit_factor.ravel()
+    })
+
+
+def run_rule_backtests(arrays, **grid):
+    """Backtest every entry/direction combination over the full variant grid"""
+    summaries = []
+    for entry_type in ['gap_open', 'trigger']:
+        for direction in ['positive', 'negative']:
+            returns_pct, exit_reason, _ = simulate_variants(arrays, direction, entry_type, **grid)
+            summaries.append(summarize_variants(returns_pct, exit_reason, direction, entry_type, **grid))
+    return pd.concat(summaries, ignore_index=True)
+
+
+def main():
+    """Backtest the Golden Gate rule variants on SPX 10-minute data"""
+    print("=" * 100)
+    print("VECTORIZED GOLDEN GATE RULE BACKTEST - SPX 10-MINUTE DATA")
+    print("=" * 100)
+
+    data_file = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'ticker_data', 'SPX', '10min', 'SPX_10min_2004_to_2025.csv')
+    if not os.path.exists(data_file):
+        print(f"Error: SPX data file not found at {data_file}")
+        return
+
+    data_10min = pd.read_csv(data_file)
+    data_10min['date'] = pd.to_datetime(data_10min['date'])
+    daily_bars = create_daily_bars_from_10min(data_10min)
+    daily_bars['atr'] = calculate_atr_pine_script(daily_bars['high'], daily_bars['low'], daily_bars['close'], 14)
+    daily_bars = daily_bars.iloc[14:].reset_index(drop=True)
+
+    arrays = build_session_arrays(data_10min, daily_bars)
+    print(f"Sessions: {len(arrays['dates']):,} x {len(arrays['slot_minutes'])} bar slots")
+
+    results = run_rule_backtests(arrays)
+    print(f"Simulated {len(results):,} rule variants")
+
+    results_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'analysis_results')
+    os.makedirs(results_dir, exist_ok=True)
+    output_file = os.path.join(results_dir, 'rule_backtest_results.csv')
+    results.sort_values('total_return_pct', ascending=False).to_csv(output_file, index=False)
+    print(f"Results saved to: {output_file}")
+
+    # The 2 PM rule: 61.8% target, no price stop, exit at 14:00 vs hold to close
+    print("\n2:00 PM TIME-STOP RULE (61.8% target, no price stop):")
+    print(f"  {'Entry':<10} {'Dir':<9} {'Cost':>5} {'Exit':>6} {'Trades':>7} {'Hit %':>7} {'Avg %':>8} {'Total %':>9} {'MaxDD %':>8}")
+    rule = results[(results['target_atr'] == 0.618) & np.isinf(results['stop_atr']) &
+                   (results['time_stop'].isin(['14:00', '16:00']))]
+    for _, row in rule.sort_values(['entry_type', 'direction', 'cost_bps', 'time_stop']).iterrows():
+        print(f"  {row['entry_type']:<10} {row['direction']:<9} {row['cost_bps']:>5.1f} {row['time_stop']:>6} "
+              f"{int(row['trades']):>7} {row['hit_rate']:>6.1f}% {row['avg_return_pct']:>7.3f}% "
+              f"{row['total_return_pct']:>8.1f}% {row['max_drawdown_pct']:>7.1f}%")
+
+    print("\nTOP 10 VARIANTS AFTER COSTS (2 bps):")
+    top = results[results['cost_bps'] == 2.0].nlargest(10, 'total_return_pct')
+    for _, row in top.iterrows():
+        print(f"  {row['entry_type']:<10} {row['direction']:<9} target {row['target_atr']:.3f} stop {row['stop_atr']:.3f} "
+              f"exit {row['time_stop']} | trades {int(row['trades'])} hit {row['hit_rate']:.1f}% "
+              f"total {row['total_return_pct']:.1f}% maxDD {row['max_drawdown_pct']:.1f}% PF {row['profit_factor']:.2f}")
+
+    return results
+
+
+if __name__ == "__main__":
+    main()
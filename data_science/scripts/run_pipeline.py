@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Nightly Pipeline Runner - Ingest to Dashboard Export as One DAG
+Replaces running the collection and analysis scripts by hand. Stages:
+
+- ingest: fixed_spx_historical_collection.py (IBKR; always runs when included)
+- audit: audit_bar_data.py checks every ticker store
+- aggregate: state_managed_golden_gate_analysis.py (10-minute bars -> daily
+  bars and state-managed session events)
+- indicators: atr_regime_analysis.py (rolling ATR regimes)
+- analyses: enhanced, survival, bootstrap, backtest, gap-fill, rolling,
+  cross-asset and significance scripts, run in parallel
+- insights: extract_trading_insights.py
+- export: export_dashboard_data.py writes the page data slices to assets/data
+
+Every stage is skipped while its script, its inputs and the outputs of the
+stages it depends on are unchanged and its outputs exist; a failed run resumes at the failed stage. Stage logs go to
+data/logs/pipeline/ and stage state to data/pipeline/state.json.
+
+    python run_pipeline.py                       # everything except ingest
+    python -c "import run_pipeline as p; p.main(ingest=True)"
+    python -c "import run_pipeline as p; p.main(targets=['insights'], force=['aggregate'])"
+"""
+
+import sys
+import os
+from datetime import datetime
+
+# Add the src directory and the repository root (shared market_data package) to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from pipeline_dag import PipelineRunner, python_stage
+
+SCRIPTS_DIR = os.path.abspath(os.path.dirname(__file__))
+ROOT_DATA = os.path.join(SCRIPTS_DIR, '..', '..', 'data')
+TICKER_DATA = os.path.join(ROOT_DATA, 'ticker_data')
+RESULTS = os.path.join(ROOT_DATA, 'analysis_results')
+# Scripts that save to the relative path data/analysis_results, run from scripts/
+LOCAL_RESULTS = os.path.join(SCRIPTS_DIR, 'data', 'analysis_results')
+ASSETS_DATA = os.path.join(SCRIPTS_DIR, '..', '..', 'assets', 'data')
+
+SRC_CODE = [os.path.join(SCRIPTS_DIR, '..', 'src', '*.py'),
+            os.path.join(SCRIPTS_DIR, '..', '..', 'market_data', '*.py')]
+SPX_10MIN = os.path.join(TICKER_DATA, 'SPX', '10min', 'SPX_10min_2004_to_2025.csv')
+DAILY_FILES = os.path.join(TICKER_DATA, '*', 'daily', '*.csv')
+TEN_MINUTE_FILES = os.path.join(TICKER_DATA, '*', '10min', '*_10min_*.csv')
+STATE_MANAGED_RESULTS = [os.path.join(RESULTS, 'state_managed_gap_open_results.csv'),
+                         os.path.join(RESULTS, 'state_managed_intraday_results.csv')]
+ENHANCED_SCRIPT = os.path.join(SCRIPTS_DIR, 'enhanced_golden_gate_analysis.py')
+ENHANCED_SUMMARY = os.path.join(LOCAL_RESULTS, 'enhanced_golden_gate_summary.csv')
+STATE_MANAGED_SCRIPT = os.path.join(SCRIPTS_DIR, 'state_managed_golden_gate_analysis.py')
+
+STATE_FILE = os.path.join(ROOT_DATA, 'pipeline', 'state.json')
+LOG_DIR = os.path.join(ROOT_DATA, 'logs', 'pipeline')
+
+
+def build_stages():
+    """Declared pipeline stages (scripts run from the scripts directory)"""
+
+    def stage(name, script, group, deps=(), inputs=(), outputs=(), **kwargs):
+        return python_stage(name, script, group=group, deps=deps, inputs=SRC_CODE + list(inputs),
+                            outputs=outputs, cwd=SCRIPTS_DIR, **kwargs)
+
+    return [
+        stage('ingest', 'fixed_spx_historical_collection.py', 'ingest', always_run=True),
+        stage('audit', 'audit_bar_data.py', 'audit', deps=['ingest'],
+              inputs=[DAILY_FILES, TEN_MINUTE_FILES],
+              outputs=[os.path.join(RESULTS, 'data_audit.csv')]),
+
+        stage('aggregate', 'state_managed_golden_gate_analysis.py', 'aggregate', deps=['audit'],
+              inputs=[SPX_10MIN, os.path.join(TICKER_DATA, 'SPX', '1min', '*.csv')],
+              outputs=STATE_MANAGED_RESULTS),
+        stage('indicators', 'atr_regime_analysis.py', 'indicators', deps=['audit', 'aggregate'],
+              inputs=[DAILY_FILES, ENHANCED_SCRIPT, STATE_MANAGED_SCRIPT] + STATE_MANAGED_RESULTS,
+              outputs=[os.path.join(LOCAL_RESULTS, '*_enhanced_golden_gate_by_regime.csv'),
+                       os.path.join(RESULTS, 'state_managed_*_by_regime.csv')]),
+
+        stage('enhanced', 'enhanced_golden_gate_analysis.py', 'analyses', deps=['audit'],
+              inputs=[DAILY_FILES],
+              outputs=[ENHANCED_SUMMARY]),
+        stage('significance', 'significance_tests.py', 'analyses', deps=['enhanced'],
+              inputs=[DAILY_FILES, ENHANCED_SCRIPT, ENHANCED_SUMMARY],
+              outputs=[os.path.join(LOCAL_RESULTS, 'enhanced_golden_gate_significance.csv')]),
+        stage('bootstrap', 'bootstrap_confidence_intervals.py', 'analyses', deps=['audit', 'aggregate'],
+              inputs=[DAILY_FILES, ENHANCED_SCRIPT] + STATE_MANAGED_RESULTS,
+              outputs=[os.path.join(LOCAL_RESULTS, 'enhanced_golden_gate_summary_ci.csv')]),
+        stage('rolling', 'rolling_completion_stats.py', 'analyses', deps=['audit'],
+              inputs=[DAILY_FILES, ENHANCED_SCRIPT],
+              outputs=[os.path.join(LOCAL_RESULTS, '*_rolling_completion_rates.csv')]),
+        stage('survival', 'completion_survival_analysis.py', 'analyses', deps=['aggregate'],
+              inputs=STATE_MANAGED_RESULTS,
+              outputs=[os.path.join(RESULTS, 'conditional_completion_survival_10min.csv')]),
+        stage('backtest', 'rule_backtest_engine.py', 'analyses', deps=['audit'],
+              inputs=[SPX_10MIN, STATE_MANAGED_SCRIPT],
+              outputs=[os.path.join(RESULTS, 'rule_backtest_results.csv')]),
+        stage('gap_fill', 'gap_fill_analysis.py', 'analyses', deps=['audit'],
+              inputs=[TEN_MINUTE_FILES, STATE_MANAGED_SCRIPT],
+              outputs=[os.path.join(RESULTS, 'gap_fill_sessions.csv')]),
+        stage('cross_asset', 'cross_asset_cotrigger_analysis.py', 'analyses', deps=['audit'],
+              inputs=[TEN_MINUTE_FILES, STATE_MANAGED_SCRIPT, os.path.join(SCRIPTS_DIR, 'gap_fill_analysis.py')],
+              outputs=[os.path.join(RESULTS, 'cross_asset_*.csv')]),
+
+        # Reads the corrected_intraday_* results, which no stage here produces
+        stage('insights', 'extract_trading_insights.py', 'insights',
+              inputs=[os.path.join(RESULTS, 'corrected_intraday_*.csv')]),
+
+        stage('export', 'export_dashboard_data.py', 'export', deps=['aggregate', 'enhanced', 'significance', 'gap_fill'],
+              inputs=STATE_MANAGED_RESULTS + [os.path.join(LOCAL_RESULTS, 'enhanced_golden_gate_*.csv'),
+                                              os.path.join(RESULTS, 'gap_fill_*.csv')],
+              outputs=[os.path.join(ASSETS_DATA, 'manifest.json')])
+    ]
+
+
+def print_report(runner, status, elapsed):
+    """Per-stage status and timing, with the critical path of this run"""
+    print("\n" + "=" * 80)
+    print("PIPELINE SUMMARY")
+    print("=" * 80)
+    print(f"{'Stage':<14} {'Group':<12} {'Status':<10} {'Seconds':>9}")
+    print("-" * 80)
+    ran_seconds = 0.0
+    for name, result in status.items():
+        record = runner.state['stages'].get(name, {})
+        seconds = record.get('seconds') if result in ('completed', 'failed') else None
+        ran_seconds += seconds or 0.0
+        print(f"{name:<14} {runner.stages[name].group:<12} {result:<10} "
+              f"{'' if seconds is None else f'{seconds:.1f}':>9}")
+
+    path, path_seconds = runner.critical_path([name for name, result in status.items() if result != 'excluded'])
+    print(f"\nWall time: {elapsed:.1f}s | stage time: {ran_seconds:.1f}s")
+    print(f"Critical path ({path_seconds:.1f}s at last recorded durations): {' -> '.join(path)}")
+
+
+def main(targets=None, ingest=False, force=(), workers=None):
+    """
+    Bring the pipeline up to date
+
+    Args:
+        targets (list): Stages to update, with their upstream stages (default: all)
+        ingest (bool): Fetch new bars from IBKR first (needs TWS/Gateway)
+        force (list): Stages to rerun even if up to date ('all' for every stage)
+        workers (int): Stages run at once (default: CPU count)
+
+    Returns:
+        dict: Stage name -> status
+    """
+    print("=" * 80)
+    print("GOLDEN GATE PIPELINE")
+    print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print("=" * 80)
+
+    runner = PipelineRunner(build_stages(), STATE_FILE, LOG_DIR, workers=workers)
+    start = datetime.now()
+    status = runner.run(targets, exclude=() if ingest else ('ingest',), force=force)
+    print_report(runner, status, (datetime.now() - start).total_seconds())
+
+    failed = [name for name, result in status.items() if result in ('failed', 'blocked')]
+    if failed:
+        print(f"\nNot up to date: {', '.join(failed)} - rerun to resume from the failed stage")
+    return status
+
+
+if __name__ == "__main__":
+    status = main()
+    sys.exit(1 if any(result in ('failed', 'blocked') for result in status.values()) else 0)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Sharded Historical Backfill - Many Symbols over Parallel IBKR Clients
+Backfill mode for the ticker stores: spreads 30-day chunk windows of every
+symbol across several client connections (sharded_backfill.ShardedBackfill)
+that share one pacing budget, then processes each symbol's bars once and
+merges them into data/ticker_data/{SYMBOL}/{bar label}/{SYMBOL}_{bar label}_collection.csv
+(the file fixed_spx_historical_collection.py writes), one row per timestamp.
+
+Client IDs start at base_client_id so they do not clash with the
+collector's client 1; TWS/Gateway accepts up to 32 connected clients.
+
+    python sharded_backfill_collection.py
+    python -c "import sharded_backfill_collection as b; b.main(symbols=['SPX', 'NDX', 'SPY', 'QQQ'], clients=6)"
+"""
+
+import sys
+import os
+from datetime import datetime
+
+# Add the src directory and the repository root (shared market_data package) to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from sharded_backfill import ShardedBackfill, pacing_budget, merge_into_store, CHUNK_DAYS, SMALL_BAR_WINDOW
+from continuous_futures import bar_label
+from market_data.bar_processing import process_bars
+from market_data.logging_config import setup_logging
+
+TICKER_DATA = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'ticker_data')
+
+
+def main(symbols=('SPX',), bar_size='10 mins', start='2020-01-01', end=None, clients=4,
+         base_client_id=11, port=7496, use_rth=False, chunk_days=CHUNK_DAYS, max_requests=None):
+    """
+    Backfill and merge the ticker stores
+
+    Args:
+        symbols (list): Stock and index symbols
+        bar_size (str): IBKR bar size
+        start (str): First date
+        end (str): End date, exclusive (default: now)
+        clients (int): Concurrent client connections
+        base_client_id (int): Client ID of the first connection
+        port (int): TWS (7496) or Gateway (7497) port
+        use_rth (bool): Regular trading hours only (the collector includes extended hours)
+        chunk_days (int): Days of bars per request
+        max_requests (int): Requests allowed per 10 minutes across all clients
+                            (default: 60 for bars of 30 seconds or less, no cap otherwise)
+
+    Returns:
+        dict: Symbol -> merged store
+    """
+    setup_logging(log_file=os.path.join(os.path.dirname(__file__), '..', 'data', 'logs', 'sharded_backfill.log'))
+    end = end or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    client_ids = list(range(base_client_id, base_client_id + clients))
+
+    print("=" * 80)
+    print("SHARDED HISTORICAL BACKFILL")
+    print(f"Symbols: {', '.join(symbols)} | Bar size: {bar_size}")
+    print(f"Range: {start} to {end}")
+    print(f"Clients: {', '.join(str(client_id) for client_id in client_ids)}")
+    print("=" * 80)
+
+    budget = pacing_budget(bar_size, max_requests)
+    if budget.max_requests is not None:
+        print(f"Pacing: {budget.max_requests} requests per {SMALL_BAR_WINDOW // 60} minutes")
+    backfill = ShardedBackfill(client_ids, bar_size=bar_size, use_rth=use_rth, budget=budget, port=port)
+    fetched, failures = backfill.run(list(symbols), start, end, chunk_days=chunk_days)
+
+    stats = backfill.stats
+    print(f"\n{stats['fetched']} of {stats['chunks']} chunks fetched in {stats['seconds']:.1f}s "
+          f"({stats['pacing_wait']:.1f}s total pacing wait)")
+    for client_id in client_ids:
+        print(f"  client {client_id}: {stats['by_client'].get(client_id, 0)} chunks")
+
+    label = bar_label(bar_size)
+    stores = {}
+    for symbol, bars in fetched.items():
+        processed = process_bars(bars, symbol)
+        output_file = os.path.join(TICKER_DATA, symbol, label, f"{symbol}_{label}_collection.csv")
+        store = merge_into_store(output_file, processed)
+        stores[symbol] = store
+        print(f"\n{symbol}: {len(bars):,} bars fetched -> {len(store):,} in store")
+        print(f"  Date range: {store['date'].min()} to {store['date'].max()}")
+        print(f"  Saved to: {output_file}")
+
+    if failures:
+        print(f"\n{len(failures)} chunks not fetched (rerun to fill them; existing rows are kept):")
+        for symbol, chunk_start, chunk_end in failures:
+            print(f"  {symbol} {chunk_start.date()} to {chunk_end.date()}")
+    return stores
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+Significance Tests for the Headline Golden Gate Comparisons
+Tests whether the enhanced analysis headline differences could be chance:
+
+- gap-open vs intraday completion rate (positive and negative)
+- negative_advantage (combined negative minus combined positive rate)
+
+Two null models:
+- Label permutation: for gap-open vs intraday, whose events never share a
+  session, scenario labels are shuffled across events; the permuted success
+  split is hypergeometric, so each shuffle is a single batched draw. A session
+  can trigger both directions, so for negative_advantage the positive and
+  negative flags are instead swapped within a random half of the sessions.
+- Monte Carlo paths: every session is re-simulated as a driftless random walk
+  in ATR units with the real session's gap size (random sign) and realized
+  range, so volatility matches the ATR the levels come from but direction
+  carries no information. Batches of simulated sessions are spread across a
+  process pool whose workers attach to the session moves in shared memory.
+
+p-values are written next to each comparison in enhanced_golden_gate_summary.csv.
+"""
+
+import sys
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+# Add the src directory and the repository root (shared market_data package) to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from bootstrap_confidence_intervals import RATE_METRICS, rate_metric_arrays
+from enhanced_golden_gate_analysis import calculate_atr_pine_script, calculate_daily_scenario_flags
+from result_store import record_run
+from shared_dataset import SharedDataset, attach
+
+DEFAULT_PERMUTATIONS = 100000
+DEFAULT_PERMUTATION_BATCH = 1000
+DEFAULT_SIMULATIONS = 2000
+DEFAULT_PATH_STEPS = 26
+DEFAULT_BATCH_SIZE = 20
+
+TRIGGER_LEVEL = 0.382
+TARGET_LEVEL = 0.618
+
+HEADLINE_COMPARISONS = {
+    'gap_vs_intraday_positive': ('gap_open_positive_rate', 'intraday_positive_rate'),
+    'gap_vs_intraday_negative': ('gap_open_negative_rate', 'intraday_negative_rate'),
+    'negative_advantage': ('combined_negative_rate', 'combined_positive_rate')
+}
+
+# Worker-side session moves, set once per process by _init_worker
+_worker_state = {}
+
+
+def load_daily_moves(data_file):
+    """
+    Daily scenario flags plus each session's gap and range in ATR units
+
+    Rows line up with calculate_daily_scenario_flags() (first day of each year dropped).
+    """
+    data = pd.read_csv(data_file)
+    data['date'] = pd.to_datetime(data['date'])
+    data = data.sort_values('date').reset_index(drop=True)
+    data['atr'] = calculate_atr_pine_script(data['high'], data['low'], data['close'], 14)
+    data = data.iloc[14:].reset_index(drop=True)
+    data = data.dropna(subset=['atr']).reset_index(drop=True)
+
+    previous_close = data['close'].shift(1)
+    previous_atr = data['atr'].shift(1)
+    year = data['date'].dt.year
+    moves = pd.DataFrame({
+        'gap_atr': (data['open'] - previous_close) / previous_atr,
+        'range_atr': (data['high'] - data['low']) / previous_atr
+    })[(year == year.shift(1)).to_numpy()].reset_index(drop=True)
+
+    return calculate_daily_scenario_flags(data), moves
+
+
+def comparison_values(events, successes):
+    """Headline rate differences (percentage points) from metric totals; works on batches (last axis = metrics)"""
+    names = list(RATE_METRICS.keys())
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rates = np.where(events > 0, successes / events * 100, np.nan)
+    return np.stack([rates[..., names.index(a)] - rates[..., names.index(b)]
+                     for a, b in HEADLINE_COMPARISONS.values()], axis=-1)
+
+
+def paired_permutation_null(events, successes, n_permutations, rng, batch_size=DEFAULT_PERMUTATION_BATCH):
+    """
+    Null rate differences (A minus B, percentage points) for groups that share sessions
+
+    Each permutation swaps the A and B flags of a random half of the sessions,
+    so a session in both groups stays in both and the pairing is kept.
+
+    Args:
+        events (np.ndarray): Per-session (sessions x 2) A/B event flags
+        successes (np.ndarray): Per-session (sessions x 2) A/B success flags
+        n_permutations (int): Permutations to draw
+        rng (np.random.Generator): Random generator
+        batch_size (int): Permutations drawn per matrix product
+
+    Returns:
+        np.ndarray: n_permutations rate differences (NaN where a group is empty)
+    """
+    n_a, n_b = events.sum(axis=0)
+    s_a, s_b = successes.sum(axis=0)
+    # Swapping a session moves (B - A) of its events and successes into group A;
+    # sessions with identical A and B flags are unchanged by a swap
+    deltas = np.column_stack([events[:, 1].astype(np.int64) - events[:, 0],
+                              successes[:, 1].astype(np.int64) - successes[:, 0]])
+    deltas = deltas[(deltas != 0).any(axis=1)].astype(np.float32)
+
+    null = []
+    for start in range(0, n_permutations, batch_size):
+        size = min(batch_size, n_permutations - start)
+        swapped = (rng.random((size, len(deltas))) < 0.5).astype(np.float32)
+        moved = swapped @ deltas
+        perm_n_a, perm_s_a = n_a + moved[:, 0], s_a + moved[:, 1]
+        perm_n_b, perm_s_b = n_b - moved[:, 0], s_b - moved[:, 1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            null.append(np.where((perm_n_a > 0) & (perm_n_b > 0),
+                                 perm_s_a / perm_n_a * 100 - perm_s_b / perm_n_b * 100, np.nan))
+    return np.concatenate(null)
+
+
+def permutation_test(session_events, session_successes, n_permutations=DEFAULT_PERMUTATIONS, seed=None):
+    """
+    Two-sided label-permutation p-values for every headline comparison
+
+    When no session is in both groups, shuffling the A/B labels over the
+    pooled events leaves the total number of completions fixed; the
+    completions landing in group A are then hypergeometric, which is drawn
+    directly instead of shuffling arrays. When sessions can be in both groups
+    (negative_advantage) the labels are swapped within sessions instead
+    (paired_permutation_null).
+
+    Args:
+        session_events (np.ndarray): Per-session event flags, one column per RATE_METRICS entry
+        session_successes (np.ndarray): Per-session success flags, same layout
+        n_permutations (int): Permutations per comparison
+        seed (int): Seed for reproducible permutations
+
+    Returns:
+        dict: {comparison: (p_value, null_sd)}
+    """
+    names = list(RATE_METRICS.keys())
+    rng = np.random.default_rng(seed)
+    events, successes = session_events.sum(axis=0), session_successes.sum(axis=0)
+    observed = comparison_values(events, successes)
+
+    result = {}
+    for i, (name, (metric_a, metric_b)) in enumerate(HEADLINE_COMPARISONS.items()):
+        a, b = names.index(metric_a), names.index(metric_b)
+        n_a, n_b = events[a], events[b]
+        if n_a == 0 or n_b == 0:
+            result[name] = (np.nan, np.nan)
+            continue
+        if (session_events[:, a] & session_events[:, b]).any():
+            null = paired_permutation_null(session_events[:, [a, b]], session_successes[:, [a, b]],
+                                           n_permutations, rng)
+            null = null[~np.isnan(null)]
+        else:
+            total_successes = successes[a] + successes[b]
+            permuted_a = rng.hypergeometric(total_successes, n_a + n_b - total_successes, n_a, size=n_permutations)
+            null = permuted_a / n_a * 100 - (total_successes - permuted_a) / n_b * 100
+
+        # Small tolerance so permutations equal to the observation count as extreme
+        extreme = np.abs(null) >= abs(observed[i]) - 1e-9
+        result[name] = ((extreme.sum() + 1) / (len(null) + 1), null.std())
+    return result
+
+
+def _init_worker(gap_atr, range_scale, n_steps):
+    _worker_state['gap_atr'] = gap_atr
+    _worker_state['range_scale'] = range_scale
+    _worker_state['n_steps'] = n_steps
+
+
+def _init_shared_worker(dataset_handle, n_steps):
+    arrays = attach(dataset_handle)
+    _init_worker(arrays['gap_atr'], arrays['range_scale'], n_steps)
+
+
+def _simulate_batch(seed, batch_size):
+    """Simulate one batch of full histories; returns (batch, comparisons) rate differences"""
+    gap_atr = _worker_state['gap_atr']
+    range_scale = _worker_state['range_scale']
+    n_steps = _worker_state['n_steps']
+    n_sessions = len(gap_atr)
+    rng = np.random.default_rng(seed)
+
+    # Real gap sizes with random sign, then a driftless walk scaled to the real range
+    signs = rng.choice(np.array([-1.0, 1.0], dtype=np.float32), size=(batch_size, n_sessions))
+    open_price = np.abs(gap_atr)[None, :] * signs
+    steps = rng.standard_normal((batch_size, n_sessions, n_steps), dtype=np.float32)
+    steps *= (range_scale / np.sqrt(n_steps))[None, :, None]
+    path = np.cumsum(steps, axis=2)
+    high = open_price + np.maximum(path.max(axis=2), 0)
+    low = open_price + np.minimum(path.min(axis=2), 0)
+
+    flags = simulated_flags(open_price, high, low)
+    events = np.stack([flags[k][0] for k in RATE_METRICS], axis=-1).sum(axis=1)
+    successes = np.stack([flags[k][1] for k in RATE_METRICS], axis=-1).sum(axis=1)
+    return comparison_values(events, successes)
+
+
+def simulated_flags(open_price, high, low):
+    """Enhanced scenario (event, success) flags per metric for paths in ATR units around the previous close"""
+    gap_positive = open_price > TRIGGER_LEVEL
+    gap_negative = open_price < -TRIGGER_LEVEL
+    intraday_positive = (low <= TRIGGER_LEVEL) & (TRIGGER_LEVEL <= high) & ~gap_positive
+    intraday_negative = (low <= -TRIGGER_LEVEL) & (-TRIGGER_LEVEL <= high) & ~gap_negative
+    completed_positive = (low <= TARGET_LEVEL) & (TARGET_LEVEL <= high)
+    completed_negative = (low <= -TARGET_LEVEL) & (-TARGET_LEVEL <= high)
+
+    combined_positive = gap_positive | intraday_positive
+    combined_negative = gap_negative | intraday_negative
+    return {
+        'gap_open_positive_rate': (gap_positive, gap_positive & completed_positive),
+        'gap_open_negative_rate': (gap_negative, gap_negative & completed_negative),
+        'intraday_positive_rate': (intraday_positive, intraday_positive & completed_positive),
+        'intraday_negative_rate': (intraday_negative, intraday_negative & completed_negative),
+        'combined_positive_rate': (combined_positive, combined_positive & completed_positive),
+        'combined_negative_rate': (combined_negative, combined_negative & completed_negative)
+    }
+
+
+def expected_walk_range(n_steps=DEFAULT_PATH_STEPS, n_paths=20000, seed=0):
+    """Mean high-low range of a unit-variance walk with n_steps (including its start point)"""
+    rng = np.random.default_rng(seed)
+    path = np.cumsum(rng.standard_normal((n_paths, n_steps)) / np.sqrt(n_steps), axis=1)
+    return (np.maximum(path.max(axis=1), 0) - np.minimum(path.min(axis=1), 0)).mean()
+
+
+def monte_carlo_test(moves, observed, n_simulations=DEFAULT_SIMULATIONS, n_steps=DEFAULT_PATH_STEPS,
+                     seed=None, workers=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Two-sided Monte Carlo p-values against ATR-matched driftless paths
+
+    Args:
+        moves (pd.DataFrame): gap_atr and range_atr per session (load_daily_moves)
+        observed (np.ndarray): Observed headline comparisons
+        n_simulations (int): Simulated histories
+        n_steps (int): Intraday steps per simulated session
+        seed (int): Seed for reproducible simulations
+        workers (int): Process pool size (None = os.cpu_count(), 1 = run in-process)
+        batch_size (int): Histories simulated per vectorized batch
+
+    Returns:
+        dict: {comparison: (p_value, null_mean)}
+    """
+    valid = moves.notna().all(axis=1).to_numpy()
+    gap_atr = moves['gap_atr'].to_numpy(dtype=np.float32)[valid]
+    range_scale = (moves['range_atr'].to_numpy(dtype=np.float32)[valid] / expected_walk_range(n_steps)).astype(np.float32)
+
+    batch_sizes = [batch_size] * (n_simulations // batch_size)
+    if n_simulations % batch_size:
+        batch_sizes.append(n_simulations % batch_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(batch_sizes))
+
+    if workers == 1 or len(batch_sizes) == 1:
+        _init_worker(gap_atr, range_scale, n_steps)
+        batches = [_simulate_batch(s, b) for s, b in zip(seeds, batch_sizes)]
+    else:
+        with SharedDataset({'gap_atr': gap_atr, 'range_scale': range_scale}) as dataset, \
+                ProcessPoolExecutor(max_workers=workers, initializer=_init_shared_worker,
+                                    initargs=(dataset.handle, n_steps)) as pool:
+            batches = list(pool.map(_simulate_batch, seeds, batch_sizes))
+    null = np.concatenate(batches)
+
+    result = {}
+    for i, name in enumerate(HEADLINE_COMPARISONS):
+        samples = null[:, i][~np.isnan(null[:, i])]
+        if len(samples) == 0 or np.isnan(observed[i]):
+            result[name] = (np.nan, np.nan)
+            continue
+        upper = ((samples >= observed[i]).sum() + 1) / (len(samples) + 1)
+        lower = ((samples <= observed[i]).sum() + 1) / (len(samples) + 1)
+        result[name] = (min(1.0, 2 * min(upper, lower)), samples.mean())
+    return result
+
+
+def test_ticker(data_file, n_permutations=DEFAULT_PERMUTATIONS, n_simulations=DEFAULT_SIMULATIONS,
+                seed=42, workers=None):
+    """Permutation and Monte Carlo tests of every headline comparison for one ticker"""
+    flags, moves = load_daily_moves(data_file)
+    session_events, session_successes = rate_metric_arrays(flags)
+    observed = comparison_values(session_events.sum(axis=0), session_successes.sum(axis=0))
+
+    permutation = permutation_test(session_events, session_successes, n_permutations, seed=seed)
+    monte_carlo = monte_carlo_test(moves, observed, n_simulations, seed=seed, workers=workers)
+
+    rows = []
+    for i, name in enumerate(HEADLINE_COMPARISONS):
+        rows.append({
+            'comparison': name,
+            'observed': round(observed[i], 1),
+            'permutation_p': round(permutation[name][0], 6),
+            'permutation_null_sd': round(permutation[name][1], 2),
+            'monte_carlo_p': round(monte_carlo[name][0], 6),
+            'monte_carlo_null_mean': round(monte_carlo[name][1], 1)
+        })
+    return pd.DataFrame(rows), len(flags)
+
+
+def main(n_permutations=DEFAULT_PERMUTATIONS, n_simulations=DEFAULT_SIMULATIONS, workers=None):
+    """Attach significance tests to the enhanced Golden Gate summary"""
+    print("=" * 100)
+    print("SIGNIFICANCE TESTS - GAP-OPEN vs INTRADAY AND NEGATIVE ADVANTAGE")
+    print(f"{n_permutations:,} label permutations | {n_simulations:,} ATR-matched Monte Carlo histories")
+    print("=" * 100)
+
+    tickers = {
+        'SPY': '../../data/ticker_data/SPY/daily/SPY_daily_2000_to_present.csv',
+        'QQQ': '../../data/ticker_data/QQQ/daily/QQQ_daily_2000_to_present.csv'
+    }
+    results_dir = os.path.join('data', 'analysis_results')
+    os.makedirs(results_dir, exist_ok=True)
+
+    frames = []
+    for ticker, data_file in tickers.items():
+        if not os.path.exists(data_file):
+            print(f"Data file not found for {ticker}: {data_file}")
+            continue
+
+        start = datetime.now()
+        table, n_sessions = test_ticker(data_file, n_permutations, n_simulations, workers=workers)
+        table.insert(0, 'ticker', ticker)
+        frames.append(table)
+        elapsed = (datetime.now() - start).total_seconds()
+
+        print(f"\n{ticker} ({n_sessions:,} sessions, {elapsed:.1f}s):")
+        print(f"  {'Comparison':<26} {'Observed':>9} {'Perm p':>9} {'MC null':>9} {'MC p':>9}")
+        for _, row in table.iterrows():
+            print(f"  {row['comparison']:<26} {row['observed']:>+8.1f} {row['permutation_p']:>9.4f} "
+                  f"{row['monte_carlo_null_mean']:>+8.1f} {row['monte_carlo_p']:>9.4f}")
+
+    if not frames:
+        return
+
+    significance = pd.concat(frames, ignore_index=True)
+    significance_file = os.path.join(results_dir, 'enhanced_golden_gate_significance.csv')
+    significance.to_csv(significance_file, index=False)
+    print(f"\nSignificance tests saved to: {significance_file}")
+    tables = {'enhanced_significance': significance}
+
+    # Add p-value columns next to the headline numbers in the summary
+    summary_file = os.path.join(results_dir, 'enhanced_golden_gate_summary.csv')
+    if os.path.exists(summary_file):
+        wide = significance.pivot(index='ticker', columns='comparison', values=['permutation_p', 'monte_carlo_p'])
+        wide.columns = [f"{comparison}_{test}" for test, comparison in wide.columns]
+        summary = pd.read_csv(summary_file)
+        summary = summary.drop(columns=[c for c in wide.columns if c in summary.columns])
+        summary = summary.merge(wide.reset_index(), on='ticker', how='left')
+        summary.to_csv(summary_file, index=False)
+        # Also the latest enhanced_summary in the store, which the dashboard export reads
+        tables['enhanced_summary'] = summary
+        print(f"p-values added to: {summary_file}")
+    else:
+        print(f"Summary not found at {summary_file} - run enhanced_golden_gate_analysis.py to add p-values to it")
+
+    run_id, db_file = record_run(
+        'significance_tests',
+        tables,
+        parameters={'n_permutations': n_permutations, 'n_simulations': n_simulations},
+        sources={ticker: tickers[ticker] for ticker in significance['ticker'].unique()},
+        results_dir=results_dir
+    )
+    print(f"Run {run_id} recorded in result store: {db_file}")
+
+    return significance
+
+
+if __name__ == "__main__":
+    main()
@@ -10,23 +10,24 @@ Implements proper OPEN/CLOSED state management:
 import pandas as pd
 import numpy as np
 import os
+import sys
 from datetime import datetime, time, timedelta
 import logging
 
+# Add the src directory and the repository root (shared market_data package) to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from fine_bar_refinement import FineBarRefiner, csv_store_loader
+from atr_regimes import session_regimes, add_regime_columns
+from market_data.instrumentation import span, increment
+from market_data.logging_config import setup_logging as configure_logging
+from result_store import record_run
+
 def setup_logging():
     """Setup logging for the analysis"""
     log_dir = os.path.join(os.path.dirname(__file__), '..', 'data', 'logs')
-    os.makedirs(log_dir, exist_ok=True)
-    log_file = os.path.join(log_dir, 'state_managed_golden_gate.log')
-    
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_file),
-            logging.StreamHandler()
-        ]
-    )
+    return configure_logging(log_file=os.path.join(log_dir, 'state_managed_golden_gate.log'))
 
 def calculate_atr_pine_script(high, low, close, period=14):
     """EXACT Pine Script ATR calculation using RMA methodology"""
@@ -58,6 +59,12 @@ def calculate_atr_pine_script(high, low, close, period=14):
     
     return pd.Series(atr_values, index=true_range.index)
 
+def add_daily_atr(daily_bars, period=14):
+    """Copy of the daily bars with an 'atr' column (Pine Script RMA)"""
+    return daily_bars.assign(atr=calculate_atr_pine_script(
+        daily_bars['high'], daily_bars['low'], daily_bars['close'], period
+    ))
+
 def create_daily_bars_from_10min(data_10min):
     """Convert 10-minute data to daily bars for ATR calculation"""
     print("Converting 10-minute data to daily bars...")
@@ -109,18 +116,21 @@ def get_30min_time_buckets():
     
     return buckets
 
-def analyze_state_managed_scenarios(data_10min, daily_bars):
+def analyze_state_managed_scenarios(data_10min, daily_bars, refiner=None, ticker=None):
     """
     Analyze scenarios with proper state management:
     - OPEN: When ±38.2% is first touched (max 2 states per day)
     - CLOSED: When ±61.8% target is reached
+
+    If a FineBarRefiner is given, trigger bars that also span the target are
+    resolved with finer data instead of being left for later bars. The ticker,
+    if given, labels the instrumentation spans.
     """
     print("\nAnalyzing State-Managed Golden Gate Scenarios...")
     
-    # Calculate ATR for daily bars
-    daily_bars['atr'] = calculate_atr_pine_script(
-        daily_bars['high'], daily_bars['low'], daily_bars['close'], 14
-    )
+    # Calculate ATR for daily bars (on a copy; the caller's frame is left as is)
+    with span('atr', **({'ticker': ticker} if ticker else {})):
+        daily_bars = add_daily_atr(daily_bars)
     
     # Remove first 14 days for proper ATR calculation
     daily_bars = daily_bars.iloc[14:].reset_index(drop=True)
@@ -201,6 +211,16 @@ def analyze_state_managed_scenarios(data_10min, daily_bars):
                     else:
                         negative_state_closed = True
             
+            # Exact first-touch bar (the buckets above only resolve 30 minutes)
+            first_touch_time = None
+            if target_reached:
+                session_data = day_10min[day_10min['date'].dt.time <= time_buckets[-1]]
+                if gap_open_type == 'positive':
+                    touched = session_data[session_data['high'] >= target_level]
+                else:
+                    touched = session_data[session_data['low'] <= target_level]
+                first_touch_time = touched['date'].iloc[0].strftime('%H:%M')
+            
             gap_open_results.append({
                 'date': current_date,
                 'gap_open_type': gap_open_type,
@@ -211,6 +231,7 @@ def analyze_state_managed_scenarios(data_10min, daily_bars):
                 'target_level': target_level,
                 'target_reached': target_reached,
                 'target_time': target_time,
+                'first_touch_time': first_touch_time,
                 **completion_times
             })
         
@@ -235,6 +256,14 @@ def analyze_state_managed_scenarios(data_10min, daily_bars):
                 target_reached = False
                 target_completion_time = None
                 
+                # Ambiguous bar: trigger and target inside the same bar. Only refined when a
+                # later bucket can record the completion (the live monitor also skips the close)
+                refined_touch = None
+                if refiner is not None and current_time < time_buckets[-1] and row['high'] >= levels['target_upper']:
+                    refined_touch = refiner.target_touch_after_trigger(
+                        row['date'], 'positive', levels['trigger_upper'], levels['target_upper']
+                    )
+                
                 trigger_datetime = datetime.combine(datetime.today(), trigger_time)
                 
                 for bucket_time in time_buckets:
@@ -248,6 +277,14 @@ def analyze_state_managed_scenarios(data_10min, daily_bars):
                     remaining_minutes = (bucket_datetime - trigger_datetime).total_seconds() / 60
                     remaining_hours = remaining_minutes / 60
                     
+                    # Target already reached inside the trigger bar
+                    if refined_touch is not None:
+                        completion_by_remaining_time[f'{remaining_hours:.1f}h'] = True
+                        target_reached = True
+                        target_completion_time = f'{remaining_hours:.1f}h'
+                        positive_state_closed = True
+                        break
+                    
                     # Get data up to this bucket time
                     bucket_data = remaining_data[remaining_data['date'].dt.time <= bucket_time]
                     
@@ -265,6 +302,15 @@ def analyze_state_managed_scenarios(data_10min, daily_bars):
                         positive_state_closed = True
                         break
                 
+                # Exact first-touch bar (or refined minute) of the target
+                first_touch_time = None
+                if refined_touch is not None:
+                    first_touch_time = refined_touch.strftime('%H:%M')
+                elif target_reached:
+                    session_data = remaining_data[remaining_data['date'].dt.time <= time_buckets[-1]]
+                    touched = session_data[session_data['high'] >= levels['target_upper']]
+                    first_touch_time = touched['date'].iloc[0].strftime('%H:%M')
+                
                 intraday_results.append({
                     'date': current_date,
                     'trigger_time': trigger_time.strftime('%H:%M'),
@@ -276,6 +322,8 @@ def analyze_state_managed_scenarios(data_10min, daily_bars):
                     'target_level': levels['target_upper'],
                     'target_reached': target_reached,
                     'completion_time': target_completion_time,
+                    'refined_touch_time': refined_touch.strftime('%H:%M') if refined_touch is not None else None,
+                    'first_touch_time': first_touch_time,
                     **completion_by_remaining_time
                 })
             
@@ -292,6 +340,14 @@ def analyze_state_managed_scenarios(data_10min, daily_bars):
                 target_reached = False
                 target_completion_time = None
                 
+                # Ambiguous bar: trigger and target inside the same bar. Only refined when a
+                # later bucket can record the completion (the live monitor also skips the close)
+                refined_touch = None
+                if refiner is not None and current_time < time_buckets[-1] and row['low'] <= levels['target_lower']:
+                    refined_touch = refiner.target_touch_after_trigger(
+                        row['date'], 'negative', levels['trigger_lower'], levels['target_lower']
+                    )
+                
                 trigger_datetime = datetime.combine(datetime.today(), trigger_time)
                 
                 for bucket_time in time_buckets:
@@ -305,6 +361,14 @@ def analyze_state_managed_scenarios(data_10min, daily_bars):
                     remaining_minutes = (bucket_datetime - trigger_datetime).total_seconds() / 60
                     remaining_hours = remaining_minutes / 60
                     
+                    # Target already reached inside the trigger bar
+                    if refined_touch is not None:
+                        completion_by_remaining_time[f'{remaining_hours:.1f}h'] = True
+                        target_reached = True
+                        target_completion_time = f'{remaining_hours:.1f}h'
+                        negative_state_closed = True
+                        break
+                    
                     # Get data up to this bucket time
                     bucket_data = remaining_data[remaining_data['date'].dt.time <= bucket_time]
                     
@@ -322,6 +386,15 @@ def analyze_state_managed_scenarios(data_10min, daily_bars):
                         negative_state_closed = True
                         break
                 
+                # Exact first-touch bar (or refined minute) of the target
+                first_touch_time = None
+                if refined_touch is not None:
+                    first_touch_time = refined_touch.strftime('%H:%M')
+                elif target_reached:
+                    session_data = remaining_data[remaining_data['date'].dt.time <= time_buckets[-1]]
+                    touched = session_data[session_data['low'] <= levels['target_lower']]
+                    first_touch_time = touched['date'].iloc[0].strftime('%H:%M')
+                
                 intraday_results.append({
                     'date': current_date,
                     'trigger_time': trigger_time.strftime('%H:%M'),
@@ -333,6 +406,8 @@ def analyze_state_managed_scenarios(data_10min, daily_bars):
                     'target_level': levels['target_lower'],
                     'target_reached': target_reached,
                     'completion_time': target_completion_time,
+                    'refined_touch_time': refined_touch.strftime('%H:%M') if refined_touch is not None else None,
+                    'first_touch_time': first_touch_time,
                     **completion_by_remaining_time
                 })
             
@@ -364,20 +439,49 @@ def main():
         return
     
     print(f"Loading SPX 10-minute data from: {data_file}")
-    data_10min = pd.read_csv(data_file)
-    data_10min['date'] = pd.to_datetime(data_10min['date'])
+    with span('load', ticker='SPX'):
+        data_10min = pd.read_csv(data_file)
+        data_10min['date'] = pd.to_datetime(data_10min['date'])
+    increment('rows_loaded', len(data_10min), ticker='SPX')
     
     print(f"Loaded {len(data_10min):,} 10-minute bars")
     print(f"Date range: {data_10min['date'].min()} to {data_10min['date'].max()}")
     
     # Create daily bars for ATR calculation
-    daily_bars = create_daily_bars_from_10min(data_10min)
+    with span('daily_bars', ticker='SPX'):
+        daily_bars = create_daily_bars_from_10min(data_10min)
+    
+    # Refine ambiguous 10-minute bars with 1-minute data when a local store exists
+    refiner = None
+    fine_store_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'ticker_data', 'SPX', '1min')
+    if os.path.isdir(fine_store_dir):
+        print(f"Refining ambiguous bars with 1-minute data from: {fine_store_dir}")
+        refiner = FineBarRefiner(
+            'SPX',
+            csv_store_loader(fine_store_dir),
+            cache_dir=os.path.join(fine_store_dir, 'refinement_cache')
+        )
     
     # Run State-Managed Analysis
-    gap_open_results, intraday_results = analyze_state_managed_scenarios(data_10min, daily_bars)
+    with span('analyze', ticker='SPX'):
+        gap_open_results, intraday_results = analyze_state_managed_scenarios(data_10min, daily_bars, refiner, ticker='SPX')
+    increment('events', len(gap_open_results), ticker='SPX', scenario='gap_open')
+    increment('events', len(intraday_results), ticker='SPX', scenario='intraday')
     print(f"Found {len(gap_open_results)} gap-open scenarios")
     print(f"Found {len(intraday_results)} intraday trigger scenarios")
     
+    # Tag each session with the volatility regime of the ATR its levels come from
+    with span('regimes', ticker='SPX'):
+        regimes = session_regimes(add_daily_atr(daily_bars), date_col='trade_date')
+        gap_open_results = add_regime_columns(gap_open_results, regimes)
+        intraday_results = add_regime_columns(intraday_results, regimes)
+    
+    if refiner is not None:
+        refined = intraday_results['refined_touch_time'].notna().sum()
+        print(f"Ambiguous trigger bars: {refiner.stats['ambiguous_bars']} "
+              f"(refined to completions: {refined}, unresolved: {refiner.stats['unresolved']}, "
+              f"windows loaded: {refiner.stats['loaded']}, cache hits: {refiner.stats['memory_hits'] + refiner.stats['disk_hits']})")
+    
     # Save results
     results_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'analysis_results')
     os.makedirs(results_dir, exist_ok=True)
@@ -386,13 +490,26 @@ def main():
     gap_open_file = os.path.join(results_dir, 'state_managed_gap_open_results.csv')
     intraday_file = os.path.join(results_dir, 'state_managed_intraday_results.csv')
     
-    gap_open_results.to_csv(gap_open_file, index=False)
-    intraday_results.to_csv(intraday_file, index=False)
+    with span('export', ticker='SPX'):
+        gap_open_results.to_csv(gap_open_file, index=False)
+        intraday_results.to_csv(intraday_file, index=False)
     
     print(f"\nResults saved:")
     print(f"Gap-Open Results: {gap_open_file}")
     print(f"Intraday Results: {intraday_file}")
     
+    with span('export', ticker='SPX', store='sqlite'):
+        run_id, db_file = record_run(
+            'state_managed_golden_gate',
+            {'state_managed_gap_open': gap_open_results, 'state_managed_intraday': intraday_results},
+            parameters={'ticker': 'SPX', 'bar_size': '10min', 'atr_period': 14,
+                        'trigger_level': 0.382, 'target_level': 0.618,
+                        'fine_bar_refinement': refiner is not None},
+            sources={'SPX': data_file},
+            results_dir=results_dir
+        )
+    print(f"Run {run_id} recorded in result store: {db_file}")
+    
     # Print summary statistics
     print("\n" + "=" * 80)
     print("SUMMARY STATISTICS - STATE-MANAGED ANALYSIS")
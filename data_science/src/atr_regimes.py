@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+ATR Volatility Regimes
+Tags each session with the rolling percentile of its ATR, and of ATR as % of
+price, over configurable lookbacks and maps the percentile to a low/mid/high
+regime label.
+
+Rolling ranks and quantiles use pandas' skiplist window kernels, which update
+each window in O(log w) - no Python callback per window.
+
+A session is tagged with the previous day's values: that is the ATR its
+Golden Gate levels are built from, so the regime is known at the open.
+"""
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_LOOKBACKS = (63, 252, 756)
+DEFAULT_LOOKBACK = 252
+
+# Percentile cut-offs separating low / mid / high volatility
+DEFAULT_PERCENTILE_THRESHOLDS = (100 / 3, 200 / 3)
+REGIMES = ['low', 'mid', 'high', 'unknown']
+
+
+def rolling_percentile_rank(values, window, min_periods=None):
+    """
+    Percentile (0-100) of each value within its trailing window, itself included
+
+    Args:
+        values (pd.Series): Series to rank
+        window (int): Lookback in rows
+        min_periods (int): Rows required before a rank is reported (default: window)
+    """
+    return values.rolling(window, min_periods=min_periods or window).rank(pct=True) * 100
+
+
+def rolling_quantile(values, window, quantile, min_periods=None):
+    """Trailing-window quantile of each value (0 <= quantile <= 1)"""
+    return values.rolling(window, min_periods=min_periods or window).quantile(quantile)
+
+
+def classify_regimes(percentiles, thresholds=DEFAULT_PERCENTILE_THRESHOLDS):
+    """Map percentiles to 'low'/'mid'/'high' ('unknown' during warm-up)"""
+    percentiles = np.asarray(percentiles, dtype=float)
+    labels = np.array(REGIMES[:3], dtype=object)[np.digitize(percentiles, thresholds)]
+    return np.where(np.isnan(percentiles), 'unknown', labels)
+
+
+def regime_features(daily_bars, lookbacks=DEFAULT_LOOKBACKS, date_col='date',
+                    thresholds=DEFAULT_PERCENTILE_THRESHOLDS):
+    """
+    Rolling ATR percentiles and regimes per daily bar
+
+    Args:
+        daily_bars (pd.DataFrame): Daily bars with date_col, 'close' and 'atr'
+        lookbacks (tuple): Lookbacks in trading days
+        date_col (str): Column holding the trading date
+        thresholds (tuple): Percentile cut-offs for low/mid/high
+
+    Returns:
+        pd.DataFrame: date, atr, atr_pct and per lookback
+                      atr_pctile_{w}, atr_pct_pctile_{w}, atr_regime_{w}
+    """
+    atr = daily_bars['atr'].astype(float).reset_index(drop=True)
+    atr_pct = atr / daily_bars['close'].astype(float).reset_index(drop=True) * 100
+
+    features = pd.DataFrame({
+        'date': pd.to_datetime(pd.Series(daily_bars[date_col]).reset_index(drop=True)).dt.normalize(),
+        'atr': atr,
+        'atr_pct': atr_pct
+    })
+    for window in lookbacks:
+        features[f"atr_pctile_{window}"] = rolling_percentile_rank(atr, window)
+        features[f"atr_pct_pctile_{window}"] = rolling_percentile_rank(atr_pct, window)
+        # ATR relative to price is comparable across decades of price levels
+        features[f"atr_regime_{window}"] = classify_regimes(features[f"atr_pct_pctile_{window}"], thresholds)
+    return features
+
+
+def session_regimes(daily_bars, lookbacks=DEFAULT_LOOKBACKS, date_col='date',
+                    thresholds=DEFAULT_PERCENTILE_THRESHOLDS):
+    """Regime features keyed by session date, taken from the previous trading day"""
+    features = regime_features(daily_bars, lookbacks, date_col, thresholds)
+    values = features.drop(columns=['date']).shift(1)
+    for window in lookbacks:
+        values[f"atr_regime_{window}"] = values[f"atr_regime_{window}"].fillna('unknown')
+    values.insert(0, 'date', features['date'])
+    return values.rename(columns={'atr': 'previous_atr_value', 'atr_pct': 'previous_atr_pct'})
+
+
+def add_regime_columns(results, regimes, lookback=DEFAULT_LOOKBACK, date_col='date'):
+    """
+    Attach session regimes to a scenario table
+
+    Adds every percentile/regime column from session_regimes() and an
+    'atr_regime' column for the chosen lookback.
+    """
+    if results is None or len(results) == 0:
+        return results
+    keys = pd.to_datetime(results[date_col]).dt.normalize()
+    columns = [c for c in regimes.columns if c.startswith(('atr_pctile_', 'atr_pct_pctile_', 'atr_regime_'))]
+    tagged = regimes.set_index('date')[columns].reindex(keys.to_numpy())
+    tagged.index = results.index
+
+    results = results.drop(columns=[c for c in columns + ['atr_regime'] if c in results.columns])
+    results = pd.concat([results, tagged], axis=1)
+    results['atr_regime'] = results[f"atr_regime_{lookback}"].fillna('unknown')
+    return results
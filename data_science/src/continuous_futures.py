@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Continuous Futures - Back-Adjusted ES/NQ Series Stitched from Single Contracts
+IBKR's continuous contract only serves recent unadjusted history, and expired
+contracts drop out of its listings after a while. ContinuousFuturesBuilder
+keeps its own per-root cache instead:
+
+- the roll calendar (every contract seen, its front-month window and how much
+  of it is cached) from one contract-details request for the whole chain
+- each contract's bars as an encoded .npz (price_encoding), fetched once; a
+  contract whose front-month window has passed is never requested again
+
+Extending the series therefore fetches only the current front month since its
+last cached bar (and the next contract once its window opens), plus one chain
+request when the calendar runs out of upcoming contracts. stitch() joins the
+front-month segments and back-adjusts them in one vectorized pass.
+"""
+
+import os
+import math
+import time
+import logging
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+
+from price_encoding import encode_bars, decode_bars, save_encoded, load_encoded
+
+logger = logging.getLogger(__name__)
+
+# The front month rolls this many calendar days before expiry: the Thursday
+# before an E-mini's third-Friday expiry, when volume has moved to the next contract
+ROLL_DAYS_BEFORE_EXPIRY = 8
+
+# Contracts are fetched from this many days before they become the front month,
+# so the last bars before a roll exist in both contracts
+OVERLAP_DAYS = 5
+
+# Front-month window assumed for the oldest contract of a chain (one quarter)
+FIRST_CONTRACT_DAYS = 91
+
+# Days of bars per historical-data request (as in fixed_spx_historical_collection.py)
+CHUNK_DAYS = 30
+
+CALENDAR_FILE = 'roll_calendar.csv'
+BAR_COLUMNS = ['date', 'open', 'high', 'low', 'close', 'volume']
+
+
+def bar_label(bar_size):
+    """Store label of an IBKR bar size ('10 mins' -> '10min', '1 day' -> 'daily')"""
+    if bar_size.strip() == '1 day':
+        return 'daily'
+    count, unit = bar_size.split()
+    return f"{count}{'min' if unit.startswith('min') else unit.rstrip('s')}"
+
+
+def roll_calendar(chain, roll_days=ROLL_DAYS_BEFORE_EXPIRY):
+    """
+    Front-month windows of a contract chain
+
+    Args:
+        chain (pd.DataFrame): One row per contract with at least expiry (YYYYMMDD)
+        roll_days (int): Calendar days before expiry the front month rolls
+
+    Returns:
+        pd.DataFrame: Chain sorted by expiry with front_start and roll_date;
+                      a contract is the front month on front_start <= date < roll_date
+    """
+    calendar = chain.drop_duplicates('expiry', keep='first').sort_values('expiry').reset_index(drop=True)
+    roll_date = pd.to_datetime(calendar['expiry'], format='%Y%m%d') - pd.Timedelta(days=roll_days)
+    calendar['roll_date'] = roll_date
+    calendar['front_start'] = roll_date.shift(1)
+    if len(calendar):
+        calendar.loc[0, 'front_start'] = roll_date.iloc[0] - pd.Timedelta(days=FIRST_CONTRACT_DAYS)
+    return calendar
+
+
+def _roll_gap(old, new, method):
+    """Price gap between the new and the old contract at the old contract's last front-month bar"""
+    last_date = old['date'].to_numpy()[-1]
+    new_dates = new['date'].to_numpy()
+    at = np.searchsorted(new_dates, last_date, side='right') - 1
+    if at < 0:
+        # No overlapping bar: compare with the new contract's first open
+        logger.warning("No overlapping bar at the %s roll; using the first open", pd.Timestamp(last_date).date())
+        new_price = new['open'].to_numpy()[0]
+    else:
+        new_price = new['close'].to_numpy()[at]
+    old_price = old['close'].to_numpy()[-1]
+    return new_price / old_price if method == 'ratio' else new_price - old_price
+
+
+def stitch(calendar, bars, method='add'):
+    """
+    Back-adjusted continuous series from per-contract bars
+
+    Each contract contributes its bars on front_start <= date < roll_date. At
+    every roll all older segments are shifted by the new contract's close minus
+    the old contract's close at the old contract's last bar (method='add'), or
+    scaled by their ratio (method='ratio'), so the current contract's prices
+    are left as traded.
+
+    Args:
+        calendar (pd.DataFrame): roll_calendar() rows to stitch, sorted by expiry
+        bars (dict): expiry -> bar frame sorted by date (contracts without bars may be missing)
+        method (str): 'add' (difference) or 'ratio' back-adjustment
+
+    Returns:
+        pd.DataFrame: date, open, high, low, close, volume, contract (local symbol)
+                      and adjustment (added amount or factor applied)
+    """
+    if method not in ('add', 'ratio'):
+        raise ValueError(f"Unknown back-adjustment method: {method}")
+
+    segments, gaps, previous = [], [], None
+    for _, row in calendar.iterrows():
+        frame = bars.get(row['expiry'])
+        if frame is None or frame.empty:
+            continue
+        dates = frame['date'].to_numpy()
+        first, last = np.searchsorted(dates, [np.datetime64(row['front_start']), np.datetime64(row['roll_date'])])
+        if first == last:
+            continue
+        if previous is not None:
+            gaps.append(_roll_gap(previous, frame, method))
+        previous = frame.iloc[first:last]
+        segments.append(previous[[col for col in BAR_COLUMNS if col in frame.columns]]
+                        .assign(contract=row.get('local_symbol', row['expiry'])))
+
+    if not segments:
+        return pd.DataFrame(columns=BAR_COLUMNS + ['contract', 'adjustment'])
+
+    # Segment k is adjusted by every gap after it (the last segment not at all)
+    gaps = np.asarray(gaps, dtype=np.float64)
+    if method == 'ratio':
+        segment_adjustment = np.r_[np.cumprod(gaps[::-1])[::-1], 1.0]
+    else:
+        segment_adjustment = np.r_[np.cumsum(gaps[::-1])[::-1], 0.0]
+
+    series = pd.concat(segments, ignore_index=True)
+    adjustment = np.repeat(segment_adjustment, [len(segment) for segment in segments])
+    for col in ['open', 'high', 'low', 'close']:
+        prices = series[col].to_numpy(dtype=np.float64)
+        series[col] = prices * adjustment if method == 'ratio' else prices + adjustment
+    series['adjustment'] = adjustment
+    return series
+
+
+class ContinuousFuturesBuilder:
+    """
+    Continuous back-adjusted futures series with a per-root contract cache
+
+    Cache layout: {cache_dir}/{ROOT}/contracts/roll_calendar.csv and one
+    {ROOT}_{expiry}_{bar label}.npz of bars per contract.
+
+    Args:
+        provider: IBKRProvider (contract, contract_chain, qualify, historical_bars)
+        cache_dir (str): Directory holding one folder per futures root (e.g. data/ticker_data)
+        bar_size (str): IBKR bar size
+        use_rth (bool): Regular trading hours only
+        roll_days (int): Calendar days before expiry the front month rolls
+        pause (float): Seconds between historical-data requests (IBKR pacing)
+    """
+
+    def __init__(self, provider, cache_dir, bar_size='10 mins', use_rth=True,
+                 roll_days=ROLL_DAYS_BEFORE_EXPIRY, pause=1.0):
+        self.provider = provider
+        self.cache_dir = cache_dir
+        self.bar_size = bar_size
+        self.use_rth = use_rth
+        self.roll_days = roll_days
+        self.pause = pause
+        self.label = bar_label(bar_size)
+        self.stats = {'chain_requests': 0, 'bar_requests': 0, 'cached_contracts': 0, 'fetched_contracts': 0}
+
+    def _contract_dir(self, symbol):
+        return os.path.join(self.cache_dir, symbol, 'contracts')
+
+    def _bars_file(self, symbol, expiry):
+        return os.path.join(self._contract_dir(symbol), f"{symbol}_{expiry}_{self.label}.npz")
+
+    def load_calendar(self, symbol):
+        """Cached roll calendar, or None before the first chain request"""
+        path = os.path.join(self._contract_dir(symbol), CALENDAR_FILE)
+        if not os.path.exists(path):
+            return None
+        calendar = pd.read_csv(path, dtype={'expiry': str, 'local_symbol': str, 'multiplier': str},
+                               parse_dates=['front_start', 'roll_date', 'last_bar'])
+        calendar['complete'] = calendar['complete'].astype(bool)
+        return calendar
+
+    def save_calendar(self, symbol, calendar):
+        os.makedirs(self._contract_dir(symbol), exist_ok=True)
+        calendar.to_csv(os.path.join(self._contract_dir(symbol), CALENDAR_FILE), index=False)
+
+    def update_calendar(self, symbol, now):
+        """
+        Roll calendar, requesting the contract chain only when fewer than two
+        cached contracts (the front month and the next) are still to roll
+        """
+        calendar = self.load_calendar(symbol)
+        if calendar is not None and (calendar['roll_date'] > now).sum() >= 2:
+            return calendar
+
+        self.stats['chain_requests'] += 1
+        chain = pd.DataFrame(self.provider.contract_chain(symbol))
+        if chain.empty and calendar is None:
+            raise ValueError(f"IBKR returned no contracts for {symbol}")
+        chain['last_bar'] = pd.NaT
+        chain['complete'] = False
+        if calendar is not None:
+            # Cached contracts keep their status; expired ones IBKR no longer lists stay
+            chain = pd.concat([calendar.drop(columns=['front_start', 'roll_date']), chain], ignore_index=True)
+        calendar = roll_calendar(chain, self.roll_days)
+        self.save_calendar(symbol, calendar)
+        logger.info("%s roll calendar: %d contracts, %s to %s", symbol, len(calendar),
+                    calendar['expiry'].iloc[0], calendar['expiry'].iloc[-1])
+        return calendar
+
+    def _fetch(self, symbol, expiry, start, end):
+        """Bars of one contract on [start, end), requested in CHUNK_DAYS pieces from the end back"""
+        contract = self.provider.qualify(self.provider.contract(symbol, expiry))
+        if contract is None:
+            logger.error("Could not qualify %s %s", symbol, expiry)
+            return None
+
+        frames = []
+        chunk_end = end
+        while chunk_end > start:
+            days = min(CHUNK_DAYS, math.ceil((chunk_end - start) / timedelta(days=1)))
+            bars = self.provider.historical_bars(contract, f"{days} D", self.bar_size,
+                                                 end_date=chunk_end.strftime('%Y%m%d %H:%M:%S'),
+                                                 use_rth=self.use_rth)
+            self.stats['bar_requests'] += 1
+            if bars is not None and not bars.empty:
+                frames.append(bars)
+            chunk_end -= timedelta(days=days)
+            if self.pause:
+                time.sleep(self.pause)
+
+        if not frames:
+            return None
+        bars = pd.concat(frames, ignore_index=True)
+        bars['date'] = pd.to_datetime(bars['date'])
+        if bars['date'].dt.tz is not None:
+            bars['date'] = bars['date'].dt.tz_localize(None)
+        bars = bars[(bars['date'] >= start) & (bars['date'] < end)]
+        return bars[[col for col in BAR_COLUMNS if col in bars.columns]]
+
+    def contract_bars(self, symbol, row, now):
+        """
+        One contract's bars, fetching only the part of its window the cache lacks
+
+        Returns:
+            tuple: (bars or None, updated calendar row)
+        """
+        path = self._bars_file(symbol, row['expiry'])
+        cached = decode_bars(load_encoded(path)) if os.path.exists(path) else None
+        if row['complete']:
+            self.stats['cached_contracts'] += 1
+            return cached, row
+
+        window_end = min(row['roll_date'], now)
+        start = row['front_start'] - pd.Timedelta(days=OVERLAP_DAYS)
+        if cached is not None and not cached.empty:
+            # Refetch from the last cached bar, which may have been partial
+            start = max(start, cached['date'].iloc[-1])
+        fetched = self._fetch(symbol, row['expiry'], start, window_end)
+        self.stats['fetched_contracts'] += 1
+
+        frames = [frame for frame in (cached, fetched) if frame is not None and not frame.empty]
+        bars = None
+        row = row.copy()
+        if frames:
+            bars = pd.concat(frames, ignore_index=True)
+            bars = bars.drop_duplicates('date', keep='last').sort_values('date').reset_index(drop=True)
+            os.makedirs(self._contract_dir(symbol), exist_ok=True)
+            save_encoded(path, encode_bars(bars))
+            row['last_bar'] = bars['date'].iloc[-1]
+        # Past windows never gain bars, so they are not requested again even when empty
+        row['complete'] = row['roll_date'] <= now
+        return bars, row
+
+    def build(self, symbol, start=None, method='add', now=None):
+        """
+        Continuous back-adjusted series, brought up to date
+
+        Args:
+            symbol (str): Futures root ('ES', 'NQ')
+            start (str): First date of the series (default: oldest cached contract)
+            method (str): 'add' or 'ratio' back-adjustment (see stitch())
+            now (datetime): Current time (default: now)
+
+        Returns:
+            pd.DataFrame: stitch() output from start to now
+        """
+        now = pd.Timestamp(now or datetime.now())
+        calendar = self.update_calendar(symbol, now)
+        start = pd.Timestamp(start) if start else calendar['front_start'].min()
+        needed = calendar[(calendar['roll_date'] > start)
+                          & (calendar['front_start'] - pd.Timedelta(days=OVERLAP_DAYS) <= now)]
+
+        bars = {}
+        for index, row in needed.iterrows():
+            bars[row['expiry']], updated = self.contract_bars(symbol, row, now)
+            if not row['complete']:
+                calendar.loc[index] = updated
+                self.save_calendar(symbol, calendar)
+
+        series = stitch(calendar.loc[needed.index], bars, method)
+        return series[series['date'] >= start].reset_index(drop=True)
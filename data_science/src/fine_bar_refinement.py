@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Fine Bar Refinement for Ambiguous Bars
+When a single 10-minute bar spans both the ±38.2% trigger and the ±61.8%
+target, the bar alone cannot tell whether the target was reached after the
+trigger. FineBarRefiner lazily loads 1-minute bars (or ticks) for just that
+window, caches them in memory and on disk, and resolves the first-touch order.
+"""
+
+import os
+import logging
+import pandas as pd
+from datetime import timedelta
+
+from price_encoding import load_encoded, decode_bars
+
+
+def _read_fine_file(csv_file):
+    """Bars of one store file sorted by date (from its encoded .npz when present), or None"""
+    encoded_file = os.path.splitext(csv_file)[0] + '.npz'
+    if os.path.exists(encoded_file):
+        return decode_bars(load_encoded(encoded_file))
+    if os.path.exists(csv_file):
+        data = pd.read_csv(csv_file)
+        data['date'] = pd.to_datetime(data['date'])
+        return data.sort_values('date').reset_index(drop=True)
+    return None
+
+
+def csv_store_loader(store_dir):
+    """
+    Loader for a local 1-minute store with one CSV per day or per year:
+    {store_dir}/{SYMBOL}_1min_{YYYYMMDD}.csv (collected sessions)
+    {store_dir}/{SYMBOL}_1min_{YYYY}.csv (generate_synthetic_market_data.py)
+
+    A day file is used when one exists, otherwise the year file; only the most
+    recently used year file is kept in memory. An encoded .npz next to either
+    (encode_price_store.py) is read instead of the CSV. Ticks are also
+    accepted: CSV files with a 'price' column instead of OHLC.
+    """
+    day_cache = {}
+    year_cache = {}
+
+    def load(symbol, start, end):
+        day_key = (symbol, start.strftime('%Y%m%d'))
+        if day_key not in day_cache:
+            day_cache[day_key] = _read_fine_file(os.path.join(store_dir, f"{symbol}_1min_{day_key[1]}.csv"))
+        data = day_cache[day_key]
+        if data is None:
+            year_key = (symbol, start.year)
+            if year_key not in year_cache:
+                year_cache.clear()
+                year_cache[year_key] = _read_fine_file(os.path.join(store_dir, f"{symbol}_1min_{start.year}.csv"))
+            data = year_cache[year_key]
+        if data is None:
+            return None
+        return data[(data['date'] >= start) & (data['date'] < end)]
+
+    return load
+
+
+def ibkr_loader(pipeline, bar_size='1 min'):
+    """
+    Loader that fetches just the requested window from IBKR
+
+    Args:
+        pipeline: A StockDataPipeline with fetch_historical_data(symbol, duration, bar_size, end_date)
+        bar_size (str): IBKR bar size for the refinement data
+    """
+    def load(symbol, start, end):
+        duration = f"{int((end - start).total_seconds())} S"
+        raw_data = pipeline.fetch_historical_data(
+            symbol=symbol,
+            duration=duration,
+            bar_size=bar_size,
+            end_date=end.strftime('%Y%m%d %H:%M:%S')
+        )
+        if raw_data is None or raw_data.empty:
+            return None
+        raw_data['date'] = pd.to_datetime(raw_data['date'])
+        if raw_data['date'].dt.tz is not None:
+            raw_data['date'] = raw_data['date'].dt.tz_localize(None)
+        return raw_data[(raw_data['date'] >= start) & (raw_data['date'] < end)]
+
+    return load
+
+
+class FineBarRefiner:
+    """Resolve first-touch ordering inside ambiguous bars using finer data"""
+
+    def __init__(self, symbol, loaders, cache_dir=None, bar_minutes=10):
+        """
+        Args:
+            symbol (str): Symbol the coarse bars belong to
+            loaders (list): Loader callables tried in order: loader(symbol, start, end) -> DataFrame
+            cache_dir (str): Optional directory for the on-disk window cache
+            bar_minutes (int): Size of the coarse bars being refined
+        """
+        self.symbol = symbol
+        self.loaders = loaders if isinstance(loaders, (list, tuple)) else [loaders]
+        self.cache_dir = cache_dir
+        self.bar_minutes = bar_minutes
+        self.memory_cache = {}
+        self.stats = {'ambiguous_bars': 0, 'memory_hits': 0, 'disk_hits': 0, 'loaded': 0, 'unresolved': 0}
+
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _cache_file(self, start):
+        return os.path.join(self.cache_dir, f"{self.symbol}_{start.strftime('%Y%m%d_%H%M')}.csv")
+
+    def get_window(self, start):
+        """Get finer data for the coarse bar starting at `start` (memory -> disk -> loaders)"""
+        start = pd.Timestamp(start)
+        if start in self.memory_cache:
+            self.stats['memory_hits'] += 1
+            return self.memory_cache[start]
+
+        window = None
+        if self.cache_dir and os.path.exists(self._cache_file(start)):
+            window = pd.read_csv(self._cache_file(start))
+            window['date'] = pd.to_datetime(window['date'])
+            self.stats['disk_hits'] += 1
+        else:
+            end = start + timedelta(minutes=self.bar_minutes)
+            for loader in self.loaders:
+                try:
+                    window = loader(self.symbol, start, end)
+                except Exception as e:
+                    logging.error(f"Refinement loader failed for {self.symbol} {start}: {e}")
+                    window = None
+                if window is not None and not window.empty:
+                    window = window.sort_values('date').reset_index(drop=True)
+                    self.stats['loaded'] += 1
+                    if self.cache_dir:
+                        window.to_csv(self._cache_file(start), index=False)
+                    break
+                window = None
+
+        self.memory_cache[start] = window
+        return window
+
+    def target_touch_after_trigger(self, bar_start, direction, trigger_level, target_level):
+        """
+        Find when the target was first touched after the trigger inside one coarse bar
+
+        Args:
+            bar_start (datetime): Start time of the ambiguous coarse bar
+            direction (str): 'positive' or 'negative'
+            trigger_level (float): ±38.2% ATR level
+            target_level (float): ±61.8% ATR level
+
+        Returns:
+            pd.Timestamp: Time of the first target touch after the trigger, or None
+            if the target was not reached after the trigger (or finer data is missing)
+        """
+        self.stats['ambiguous_bars'] += 1
+        window = self.get_window(bar_start)
+        if window is None or window.empty:
+            self.stats['unresolved'] += 1
+            return None
+
+        # Ticks carry a single price, bars carry OHLC
+        if 'price' in window.columns:
+            opens = highs = lows = window['price'].values
+        else:
+            opens, highs, lows = window['open'].values, window['high'].values, window['low'].values
+
+        if direction == 'positive':
+            triggered = highs >= trigger_level
+            reached = highs >= target_level
+            opened_beyond = opens >= trigger_level
+        else:
+            triggered = lows <= trigger_level
+            reached = lows <= target_level
+            opened_beyond = opens <= trigger_level
+
+        if not triggered.any():
+            self.stats['unresolved'] += 1
+            return None
+
+        first_trigger = triggered.argmax()
+        # The trigger sub-bar itself only counts if it opened beyond the trigger
+        first_check = first_trigger if opened_beyond[first_trigger] else first_trigger + 1
+        after = reached[first_check:]
+        if not after.any():
+            return None
+        return window['date'].iloc[first_check + after.argmax()]
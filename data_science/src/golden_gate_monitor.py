@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Golden Gate Live Monitor
+Streaming version of the state-managed Golden Gate logic:
+- OPEN: When ±38.2% ATR level is first touched (or gapped through at the open)
+- CLOSED: When ±61.8% ATR target is reached
+- Maximum 2 OPEN states per day (one positive, one negative)
+
+Bars are pushed one at a time through on_bar() and events are emitted as soon
+as they happen, so the same engine can be driven by a live feed or by the
+replay harness in scripts/replay_golden_gate_monitor.py.
+"""
+
+from datetime import time
+
+MARKET_OPEN = time(9, 30)
+MARKET_CLOSE = time(16, 0)
+
+
+class _DirectionState:
+    """OPEN/CLOSED state for one direction of the current session"""
+    __slots__ = ('open', 'closed', 'trigger_bar', 'gap_open')
+
+    def __init__(self):
+        self.open = False
+        self.closed = False
+        self.trigger_bar = None
+        self.gap_open = False
+
+
+class GoldenGateMonitor:
+    """
+    Event-driven Golden Gate state machine
+
+    Matches analyze_state_managed_scenarios():
+    - The gap-open decision is made on the market open bar
+    - Bars before the market open bar are ignored (days without one emit nothing)
+    - Intraday triggers are checked on every bar after the open bar
+    - Intraday completions only count bars after the trigger bar
+    - Gap-open completions count the open bar itself
+    - Completions after the market close are ignored
+    - With a FineBarRefiner, trigger bars spanning the target are resolved
+      from finer data
+    """
+
+    def __init__(self, on_event=None, market_open=MARKET_OPEN, market_close=MARKET_CLOSE, refiner=None):
+        """
+        Args:
+            on_event (callable): Optional callback invoked with every event dict
+            market_open (datetime.time): Bar time used for the gap-open decision
+            market_close (datetime.time): Last bar time that can complete a target
+            refiner (FineBarRefiner): Optional resolver for ambiguous trigger bars
+        """
+        self.on_event = on_event
+        self.refiner = refiner
+        self.market_open = market_open
+        self.market_close = market_close
+        self.session_date = None
+        self.levels = None
+        self.previous_atr = None
+        self.session_opened = False
+        self.bar_count = 0
+        self.positive = _DirectionState()
+        self.negative = _DirectionState()
+
+    def start_session(self, session_date, levels, previous_atr=None):
+        """
+        Reset state for a new trading day
+
+        Args:
+            session_date: Trading date of the session
+            levels (dict): Output of calculate_atr_levels() for this session
+            previous_atr (float): Previous day's ATR (carried on events)
+        """
+        self.session_date = session_date
+        self.levels = levels
+        self.previous_atr = previous_atr
+        self.session_opened = False
+        self.bar_count = 0
+        self.positive = _DirectionState()
+        self.negative = _DirectionState()
+
+    def on_bar(self, timestamp, open_price, high, low, close):
+        """
+        Process one bar and return the list of events it produced
+
+        Args:
+            timestamp (datetime): Bar start time
+            open_price, high, low, close (float): Bar prices
+
+        Returns:
+            list: Event dicts ('gap_open', 'trigger' or 'complete')
+        """
+        if self.levels is None:
+            raise RuntimeError("start_session() must be called before on_bar()")
+
+        events = []
+        bar_time = timestamp.time()
+        bar_index = self.bar_count
+        self.bar_count += 1
+        levels = self.levels
+
+        if bar_time == self.market_open:
+            if not self.session_opened:
+                self.session_opened = True
+                if open_price > levels['trigger_upper']:
+                    self._open(self.positive, bar_index, gap_open=True)
+                    events.append(self._event('gap_open', 'positive', timestamp, open_price,
+                                              levels['trigger_upper'], levels['target_upper']))
+                elif open_price < levels['trigger_lower']:
+                    self._open(self.negative, bar_index, gap_open=True)
+                    events.append(self._event('gap_open', 'negative', timestamp, open_price,
+                                              levels['trigger_lower'], levels['target_lower']))
+            # Gap-open states can complete on the open bar itself
+            self._check_completion(self.positive, 'positive', bar_index, timestamp, high, events)
+            self._check_completion(self.negative, 'negative', bar_index, timestamp, low, events)
+        elif self.session_opened:
+            # Completions of states opened on earlier bars
+            if bar_time <= self.market_close:
+                self._check_completion(self.positive, 'positive', bar_index, timestamp, high, events)
+                self._check_completion(self.negative, 'negative', bar_index, timestamp, low, events)
+
+            # New triggers (only if not already open or closed)
+            positive = self.positive
+            if not positive.open and not positive.closed and high >= levels['trigger_upper']:
+                self._open(positive, bar_index)
+                events.append(self._event('trigger', 'positive', timestamp, high,
+                                          levels['trigger_upper'], levels['target_upper']))
+                if high >= levels['target_upper']:
+                    self._refine_trigger_bar(positive, 'positive', timestamp, bar_time, events)
+            negative = self.negative
+            if not negative.open and not negative.closed and low <= levels['trigger_lower']:
+                self._open(negative, bar_index)
+                events.append(self._event('trigger', 'negative', timestamp, low,
+                                          levels['trigger_lower'], levels['target_lower']))
+                if low <= levels['target_lower']:
+                    self._refine_trigger_bar(negative, 'negative', timestamp, bar_time, events)
+
+        if self.on_event is not None:
+            for event in events:
+                self.on_event(event)
+        return events
+
+    def _open(self, state, bar_index, gap_open=False):
+        state.open = True
+        state.trigger_bar = bar_index
+        state.gap_open = gap_open
+
+    def _check_completion(self, state, direction, bar_index, timestamp, price, events):
+        if not state.open or state.closed:
+            return
+        if not state.gap_open and bar_index <= state.trigger_bar:
+            return
+        if direction == 'positive':
+            reached = price >= self.levels['target_upper']
+            trigger_level, target_level = self.levels['trigger_upper'], self.levels['target_upper']
+        else:
+            reached = price <= self.levels['target_lower']
+            trigger_level, target_level = self.levels['trigger_lower'], self.levels['target_lower']
+        if reached:
+            state.closed = True
+            events.append(self._event('complete', direction, timestamp, price,
+                                      trigger_level, target_level, gap_open=state.gap_open))
+
+    def _refine_trigger_bar(self, state, direction, timestamp, bar_time, events):
+        """Complete on the trigger bar itself if finer data shows the target came after the trigger"""
+        if self.refiner is None or bar_time >= self.market_close:
+            return
+        if direction == 'positive':
+            trigger_level, target_level = self.levels['trigger_upper'], self.levels['target_upper']
+        else:
+            trigger_level, target_level = self.levels['trigger_lower'], self.levels['target_lower']
+        touch_time = self.refiner.target_touch_after_trigger(timestamp, direction, trigger_level, target_level)
+        if touch_time is not None:
+            state.closed = True
+            events.append(self._event('complete', direction, touch_time, target_level,
+                                      trigger_level, target_level, gap_open=False))
+
+    def _event(self, event_type, direction, timestamp, price, trigger_level, target_level, gap_open=None):
+        return {
+            'type': event_type,
+            'date': self.session_date,
+            'timestamp': timestamp,
+            'direction': direction,
+            'gap_open': event_type == 'gap_open' if gap_open is None else gap_open,
+            'price': price,
+            'previous_close': self.levels['previous_close'],
+            'previous_atr': self.previous_atr,
+            'trigger_level': trigger_level,
+            'target_level': target_level
+        }
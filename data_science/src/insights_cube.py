@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Golden Gate Insights Cube
+Materialized counts/completions keyed by:
+(symbol, direction, gap vs intraday, trigger time bucket, checkpoint time,
+ year, weekday, ATR regime)
+
+Questions like "if it hasn't completed by 2 PM, what are the odds it completes
+by the close?" are answered by slicing and summing the cube instead of
+re-reading and re-filtering the result CSVs. Results a source file gained by
+appending rows are folded in incrementally (only sessions after the
+per-(symbol, scenario) watermark are added); a source rewritten any other way
+invalidates the counts it contributed, so the cube is rebuilt.
+"""
+
+import os
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+
+DIRECTIONS = ['positive', 'negative']
+SCENARIOS = ['gap', 'intraday']
+CHECKPOINTS = ['09:30', '10:00', '10:30', '11:00', '11:30', '12:00', '12:30',
+               '13:00', '13:30', '14:00', '14:30', '15:00', '15:30', '16:00']
+TRIGGER_BUCKETS = ['pre'] + CHECKPOINTS[:-1] + ['post']
+WEEKDAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+ATR_REGIMES = ['low', 'mid', 'high', 'unknown']
+
+# Keyword filters accepted by InsightsCube.query() and the rate methods
+FILTERS = ['symbol', 'direction', 'scenario', 'trigger_buckets', 'year', 'weekday', 'atr_regime']
+
+# ATR as % of previous close separating low/mid/high volatility regimes
+# (used when result rows carry no rolling-percentile atr_regime column)
+DEFAULT_REGIME_THRESHOLDS = (1.0, 2.0)
+
+_OPEN_MINUTES = 9 * 60 + 30
+
+
+def clock_to_minutes(values):
+    """Convert 'HH:MM' strings to minutes after midnight (NaN when missing)"""
+    clock = pd.to_datetime(pd.Series(values, dtype=object), format='%H:%M', errors='coerce')
+    return (clock.dt.hour * 60 + clock.dt.minute).to_numpy(dtype=float)
+
+
+def trigger_minutes(results, scenario):
+    """Clock time (minutes) of the trigger; gap-opens trigger at the open"""
+    if scenario == 'gap':
+        return np.full(len(results), float(_OPEN_MINUTES))
+    return clock_to_minutes(results['trigger_time'])
+
+
+def completion_minutes(results, scenario):
+    """
+    Clock time (minutes) at which the target was first reached (NaN if never)
+
+    Uses the exact first_touch_time column when present. Older result files
+    only carry 30-minute resolution: target_time for gap-opens, and hours from
+    trigger to the completion bucket for intraday triggers.
+    """
+    reached = results['target_reached'].astype(bool).to_numpy()
+    if 'first_touch_time' in results.columns:
+        minutes = clock_to_minutes(results['first_touch_time'])
+    elif scenario == 'gap':
+        minutes = clock_to_minutes(results['target_time'])
+    else:
+        hours = pd.to_numeric(results['completion_time'].astype(str).str.rstrip('h'), errors='coerce').to_numpy()
+        raw = trigger_minutes(results, scenario) + hours * 60
+        minutes = np.round((raw - _OPEN_MINUTES) / 30) * 30 + _OPEN_MINUTES
+    return np.where(reached, minutes, np.nan)
+
+
+def _trigger_bucket_index(minutes):
+    """30-minute trigger bucket index into TRIGGER_BUCKETS"""
+    buckets = np.floor((minutes - _OPEN_MINUTES) / 30).astype(int) + 1
+    return np.clip(buckets, 0, len(TRIGGER_BUCKETS) - 1)
+
+
+def source_signature(path):
+    """[size, mtime, SHA-256 of the contents] of a result file, as kept in InsightsCube.sources"""
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime, _prefix_digest(path, stat.st_size)]
+
+
+def appended_since(path, signature):
+    """True if the file only grew since `signature` (same leading bytes, more of them)"""
+    if signature is None or len(signature) < 3:
+        return False
+    size, _, digest = signature[:3]
+    return os.path.getsize(path) > size and _prefix_digest(path, size) == digest
+
+
+def _prefix_digest(path, size):
+    digest = hashlib.sha256()
+    remaining = size
+    with open(path, 'rb') as f:
+        while remaining > 0:
+            block = f.read(min(1 << 20, remaining))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+    return digest.hexdigest()
+
+
+class InsightsCube:
+    """Dense count cube over Golden Gate result rows"""
+
+    def __init__(self, regime_thresholds=DEFAULT_REGIME_THRESHOLDS):
+        self.regime_thresholds = tuple(regime_thresholds)
+        self.symbols = []
+        self.years = []
+        self.watermarks = {}
+        self.sources = {}
+        self.events = self._empty(with_checkpoint=False)
+        self.completed = self._empty(with_checkpoint=False)
+        self.completed_by = self._empty(with_checkpoint=True)
+
+    def _shape(self, with_checkpoint):
+        shape = [len(self.symbols), len(DIRECTIONS), len(SCENARIOS), len(TRIGGER_BUCKETS)]
+        if with_checkpoint:
+            shape.append(len(CHECKPOINTS))
+        shape += [len(self.years), len(WEEKDAYS), len(ATR_REGIMES)]
+        return tuple(shape)
+
+    def _empty(self, with_checkpoint):
+        return np.zeros(self._shape(with_checkpoint), dtype=np.int32)
+
+    def _grow(self, symbols, years):
+        """Extend the symbol/year axes, keeping existing counts"""
+        new_symbols = [s for s in symbols if s not in self.symbols]
+        new_years = sorted(y for y in years if y not in self.years)
+        if not new_symbols and not new_years:
+            return
+
+        old_symbols, old_years = list(self.symbols), list(self.years)
+        old = (self.events, self.completed, self.completed_by)
+        self.symbols = old_symbols + new_symbols
+        self.years = sorted(old_years + new_years)
+        year_positions = [self.years.index(y) for y in old_years]
+
+        self.events = self._empty(with_checkpoint=False)
+        self.completed = self._empty(with_checkpoint=False)
+        self.completed_by = self._empty(with_checkpoint=True)
+        if old_symbols and old_years:
+            n = len(old_symbols)
+            self.events[:n, ..., year_positions, :, :] = old[0]
+            self.completed[:n, ..., year_positions, :, :] = old[1]
+            self.completed_by[:n, ..., year_positions, :, :] = old[2]
+
+    def _regime_index(self, atr_pct):
+        regimes = np.digitize(atr_pct, self.regime_thresholds)
+        return np.where(np.isnan(atr_pct), ATR_REGIMES.index('unknown'), regimes)
+
+    def add_results(self, results, symbol, scenario):
+        """
+        Fold new result rows into the cube
+
+        Args:
+            results (pd.DataFrame): state-managed/corrected gap-open or intraday results
+            symbol (str): Symbol the results belong to (used if there is no 'symbol' column)
+            scenario (str): 'gap' or 'intraday'
+
+        Returns:
+            int: Number of rows added
+        """
+        if results is None or len(results) == 0:
+            return 0
+
+        dates = pd.to_datetime(results['date'])
+        watermark_key = f"{symbol}|{scenario}"
+        watermark = self.watermarks.get(watermark_key)
+        if watermark is not None:
+            keep = (dates > pd.Timestamp(watermark)).to_numpy()
+            results, dates = results[keep], dates[keep]
+            if len(results) == 0:
+                return 0
+
+        symbols = results['symbol'].astype(str).to_numpy() if 'symbol' in results.columns else np.full(len(results), symbol)
+        years = dates.dt.year.to_numpy()
+        self._grow(list(dict.fromkeys(symbols)), set(years.tolist()))
+
+        symbol_lookup = {s: i for i, s in enumerate(self.symbols)}
+        year_lookup = {y: i for i, y in enumerate(self.years)}
+        symbol_idx = np.array([symbol_lookup[s] for s in symbols])
+        year_idx = np.array([year_lookup[y] for y in years])
+        weekday_idx = dates.dt.weekday.to_numpy()
+
+        direction_col = 'gap_open_type' if scenario == 'gap' else 'trigger_type'
+        direction_idx = (results[direction_col] == 'negative').to_numpy().astype(int)
+        trigger_idx = _trigger_bucket_index(trigger_minutes(results, scenario))
+        scenario_idx = np.full(len(results), SCENARIOS.index(scenario))
+
+        if 'atr_regime' in results.columns:
+            # Rolling-percentile regimes tagged by atr_regimes.add_regime_columns()
+            regime_idx = results['atr_regime'].map({r: i for i, r in enumerate(ATR_REGIMES)})
+            regime_idx = regime_idx.fillna(ATR_REGIMES.index('unknown')).to_numpy().astype(int)
+        else:
+            atr_pct = (results['previous_atr'] / results['previous_close'] * 100).to_numpy(dtype=float)
+            regime_idx = self._regime_index(atr_pct)
+
+        reached = results['target_reached'].astype(bool).to_numpy()
+        completed_at = completion_minutes(results, scenario)
+
+        index = (symbol_idx, direction_idx, scenario_idx, trigger_idx, year_idx, weekday_idx, regime_idx)
+        flat = np.ravel_multi_index(index, self.events.shape)
+        self.events += np.bincount(flat, minlength=self.events.size).reshape(self.events.shape).astype(np.int32)
+        self.completed += np.bincount(flat, weights=reached, minlength=self.events.size).reshape(self.events.shape).astype(np.int32)
+
+        checkpoint_minutes = clock_to_minutes(CHECKPOINTS)
+        by_checkpoint = reached[:, None] & (completed_at[:, None] <= checkpoint_minutes[None, :])
+        rows, checkpoint_idx = np.nonzero(by_checkpoint)
+        if len(rows):
+            index = (symbol_idx[rows], direction_idx[rows], scenario_idx[rows], trigger_idx[rows],
+                     checkpoint_idx, year_idx[rows], weekday_idx[rows], regime_idx[rows])
+            flat = np.ravel_multi_index(index, self.completed_by.shape)
+            self.completed_by += np.bincount(flat, minlength=self.completed_by.size).reshape(self.completed_by.shape).astype(np.int32)
+
+        self.watermarks[watermark_key] = dates.max().strftime('%Y-%m-%d')
+        return len(results)
+
+    def _selector(self, with_checkpoint, symbol=None, direction=None, scenario=None,
+                  trigger_buckets=None, checkpoint=None, year=None, weekday=None, atr_regime=None):
+        def axis(labels, value):
+            if value is None:
+                return slice(None)
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            return [labels.index(v) for v in values if v in labels]
+
+        selector = [axis(self.symbols, symbol), axis(DIRECTIONS, direction),
+                    axis(SCENARIOS, scenario), axis(TRIGGER_BUCKETS, trigger_buckets)]
+        if with_checkpoint:
+            selector.append(axis(CHECKPOINTS, checkpoint))
+        selector += [axis(self.years, year), axis(WEEKDAYS, weekday), axis(ATR_REGIMES, atr_regime)]
+        return selector
+
+    @staticmethod
+    def _sum(array, selector):
+        # Apply one axis at a time so several list selectors don't broadcast together
+        for axis_number, index in enumerate(selector):
+            if not isinstance(index, slice):
+                array = np.take(array, index, axis=axis_number)
+        return int(array.sum())
+
+    def query(self, checkpoint=None, **filters):
+        """
+        Aggregate the cube over everything not filtered on
+
+        Args:
+            checkpoint (str): Optional 'HH:MM' checkpoint for completed_by
+            **filters: symbol, direction, scenario, trigger_buckets, year, weekday, atr_regime
+                       (each a single label or a list of labels)
+
+        Returns:
+            dict: events, completed and (if checkpoint given) completed_by
+        """
+        result = {
+            'events': self._sum(self.events, self._selector(False, **filters)),
+            'completed': self._sum(self.completed, self._selector(False, **filters))
+        }
+        if checkpoint is not None:
+            result['completed_by'] = self._sum(self.completed_by, self._selector(True, checkpoint=checkpoint, **filters))
+        return result
+
+    def completion_rate(self, checkpoint=None, **filters):
+        """Completion rate (%) by checkpoint, or by the close if no checkpoint"""
+        counts = self.query(checkpoint=checkpoint, **filters)
+        completed = counts['completed_by'] if checkpoint is not None else counts['completed']
+        return completed / counts['events'] * 100 if counts['events'] > 0 else 0
+
+    def conditional_completion(self, checkpoint, **filters):
+        """
+        P(complete by close | not complete by checkpoint), in %
+
+        Only triggers that had already happened by the checkpoint are counted.
+        """
+        if 'trigger_buckets' not in filters:
+            checkpoint_position = CHECKPOINTS.index(checkpoint)
+            filters['trigger_buckets'] = TRIGGER_BUCKETS[:checkpoint_position + 1]
+        counts = self.query(checkpoint=checkpoint, **filters)
+        still_open = counts['events'] - counts['completed_by']
+        late_completions = counts['completed'] - counts['completed_by']
+        return {
+            'still_open': still_open,
+            'late_completions': late_completions,
+            'rate': late_completions / still_open * 100 if still_open > 0 else 0
+        }
+
+    def save(self, path):
+        """Save the cube to a .npz file"""
+        np.savez_compressed(
+            path,
+            events=self.events,
+            completed=self.completed,
+            completed_by=self.completed_by,
+            meta=json.dumps({
+                'symbols': self.symbols,
+                'years': self.years,
+                'watermarks': self.watermarks,
+                'sources': self.sources,
+                'regime_thresholds': self.regime_thresholds
+            })
+        )
+
+    @classmethod
+    def load(cls, path):
+        """Load a cube saved with save()"""
+        with np.load(path) as stored:
+            meta = json.loads(str(stored['meta']))
+            cube = cls(regime_thresholds=meta['regime_thresholds'])
+            cube.symbols = meta['symbols']
+            cube.years = meta['years']
+            cube.watermarks = meta['watermarks']
+            cube.sources = meta.get('sources', {})
+            cube.events = stored['events']
+            cube.completed = stored['completed']
+            cube.completed_by = stored['completed_by']
+        return cube
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Pipeline DAG Runner - Dependency-Aware Stages with Skip-If-Fresh
+Runs declared stages (scripts) in dependency order:
+
+- Each stage lists the stages it depends on, its input files/globs and its
+  output files/globs
+- A stage's fingerprint hashes its command, its script, the contents of its
+  inputs and the outputs of the stages it depends on, so rerunning an
+  upstream stage invalidates everything downstream of it; a stage whose last
+  run completed with the same fingerprint and whose outputs still exist is
+  skipped
+- The fingerprint is recorded after the stage finishes, so a stage that
+  rewrites one of its inputs (significance_tests.py adds columns to the
+  enhanced summary) is fresh against the files it left behind
+- Stages whose dependencies are done run in parallel (subprocesses), so the
+  wall time of a full refresh is bounded by the critical path, not the sum
+- State is saved after every stage: after a failure the next run skips what
+  already completed and resumes at the failed stage (its downstream stages
+  are reported as blocked; independent branches still run)
+
+File hashes are cached by (size, mtime), so unchanged multi-GB bar stores are
+not re-read to be fingerprinted.
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import hashlib
+import subprocess
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+DONE_STATUSES = ('completed', 'skipped')
+
+
+class Stage:
+    """
+    One pipeline stage
+
+    Args:
+        name (str): Unique stage name
+        command (list): Command line to run (e.g. [python, 'script.py'])
+        deps (list): Names of stages that must finish first
+        inputs (list): Files or glob patterns whose contents the stage depends on
+        outputs (list): Files or glob patterns the stage produces
+        group (str): Stage group for reporting (ingest, audit, analyses, ...)
+        cwd (str): Working directory for the command
+        always_run (bool): Never skip (e.g. fetching new bars from IBKR)
+    """
+
+    def __init__(self, name, command, deps=(), inputs=(), outputs=(), group=None, cwd=None, always_run=False):
+        self.name = name
+        self.command = list(command)
+        self.deps = list(deps)
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.group = group or name
+        self.cwd = cwd
+        self.always_run = always_run
+
+    def __repr__(self):
+        return f"Stage({self.name!r}, deps={self.deps})"
+
+
+def _expand(patterns, cwd=None):
+    """Sorted existing files matching patterns (relative patterns resolve against cwd)"""
+    paths = set()
+    for pattern in patterns:
+        if cwd and not os.path.isabs(pattern):
+            pattern = os.path.join(cwd, pattern)
+        paths.update(path for path in glob.glob(pattern) if os.path.isfile(path))
+    return sorted(paths)
+
+
+def _missing(patterns, cwd=None):
+    """Patterns that currently match no file"""
+    return [pattern for pattern in patterns if not _expand([pattern], cwd)]
+
+
+class PipelineRunner:
+    """
+    Schedules stages by dependency and records their state
+
+    Args:
+        stages (list): Stage objects
+        state_file (str): JSON file holding per-stage state and the file hash cache
+        log_dir (str): Each stage's stdout/stderr goes to {log_dir}/{stage}.log
+        workers (int): Maximum stages running at once (default: CPU count)
+    """
+
+    def __init__(self, stages, state_file, log_dir, workers=None):
+        self.stages = {stage.name: stage for stage in stages}
+        if len(self.stages) != len(stages):
+            raise ValueError("Stage names must be unique")
+        self.state_file = state_file
+        self.log_dir = log_dir
+        self.workers = workers or os.cpu_count() or 1
+        self.order = self._topological_order()
+        self.state = self._load_state()
+
+    def _topological_order(self):
+        order = []
+        visiting = set()
+        visited = set()
+
+        def visit(name, path):
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency cycle: {' -> '.join(path + [name])}")
+            if name not in self.stages:
+                raise ValueError(f"Unknown stage '{name}' (required by {path[-1]})")
+            visiting.add(name)
+            for dep in self.stages[name].deps:
+                visit(dep, path + [name])
+            visiting.discard(name)
+            visited.add(name)
+            order.append(name)
+
+        for name in self.stages:
+            visit(name, [])
+        return order
+
+    # State
+
+    def _load_state(self):
+        if os.path.exists(self.state_file):
+            with open(self.state_file) as f:
+                state = json.load(f)
+        else:
+            state = {}
+        state.setdefault('stages', {})
+        state.setdefault('file_hashes', {})
+        return state
+
+    def _save_state(self):
+        directory = os.path.dirname(self.state_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_file = self.state_file + '.tmp'
+        with open(temp_file, 'w') as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(temp_file, self.state_file)
+
+    def _file_hash(self, path):
+        """SHA-256 of a file, reused while its size and mtime are unchanged"""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        cached = self.state['file_hashes'].get(path)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        self.state['file_hashes'][path] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+        return digest.hexdigest()
+
+    def fingerprint(self, stage):
+        """Hash of the command, the script files it names, every input file and every dependency's outputs"""
+        digest = hashlib.sha256(json.dumps(stage.command).encode())
+        scripts = [arg for arg in stage.command if arg.endswith('.py')]
+        paths = _expand(scripts + stage.inputs, stage.cwd)
+        for dep in stage.deps:
+            paths.extend(_expand(self.stages[dep].outputs, self.stages[dep].cwd))
+        for path in sorted(set(paths)):
+            digest.update(os.path.relpath(path, stage.cwd or '.').encode())
+            digest.update(self._file_hash(path).encode())
+        return digest.hexdigest()
+
+    def is_fresh(self, stage, fingerprint):
+        """True if the last run completed with this fingerprint and its outputs exist"""
+        record = self.state['stages'].get(stage.name)
+        return (not stage.always_run and record is not None and record.get('status') == 'completed'
+                and record.get('fingerprint') == fingerprint and not _missing(stage.outputs, stage.cwd))
+
+    # Scheduling
+
+    def select(self, targets=None):
+        """Targets plus everything upstream of them, in dependency order"""
+        if not targets:
+            return list(self.order)
+        selected = set()
+        stack = list(targets)
+        while stack:
+            name = stack.pop()
+            if name not in self.stages:
+                raise ValueError(f"Unknown stage '{name}'")
+            if name not in selected:
+                selected.add(name)
+                stack.extend(self.stages[name].deps)
+        return [name for name in self.order if name in selected]
+
+    def _run_stage(self, stage):
+        """Run one stage's command, logging its output; returns (exit code, seconds)"""
+        os.makedirs(self.log_dir, exist_ok=True)
+        log_file = os.path.join(self.log_dir, f"{stage.name}.log")
+        env = dict(os.environ, PYTHONUNBUFFERED='1')
+        start = time.perf_counter()
+        with open(log_file, 'w') as log:
+            try:
+                code = subprocess.run(stage.command, cwd=stage.cwd, stdout=log, stderr=subprocess.STDOUT,
+                                      env=env).returncode
+            except OSError as e:
+                log.write(f"Could not start {stage.command}: {e}\n")
+                code = -1
+        return code, time.perf_counter() - start
+
+    def run(self, targets=None, exclude=(), force=()):
+        """
+        Run the selected stages, skipping fresh ones
+
+        Args:
+            targets (list): Stage names to bring up to date (default: all)
+            exclude (list): Stages treated as done without running (e.g. ingest
+                            on a machine without IBKR access)
+            force (list): Stages to run even if fresh ('all' forces every stage)
+
+        Returns:
+            dict: Stage name -> 'completed', 'skipped', 'excluded', 'failed' or 'blocked'
+        """
+        selected = self.select(targets)
+        forced = set(selected) if 'all' in force else set(force)
+        status = {name: 'excluded' for name in selected if name in exclude}
+        pending = [name for name in selected if name not in status]
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while pending or running:
+                # Resolve every stage whose dependencies are settled; repeat so chains of skips cascade
+                progressed = True
+                while progressed:
+                    progressed = False
+                    for name in list(pending):
+                        stage = self.stages[name]
+                        dep_status = [status.get(dep) for dep in stage.deps]
+                        if any(s in ('failed', 'blocked') for s in dep_status):
+                            status[name] = 'blocked'
+                        elif all(s in DONE_STATUSES + ('excluded',) for s in dep_status):
+                            if len(running) >= self.workers:
+                                continue
+                            fingerprint = self.fingerprint(stage)
+                            if name not in forced and self.is_fresh(stage, fingerprint):
+                                status[name] = 'skipped'
+                                print(f"  [skip] {name} (up to date)")
+                            else:
+                                print(f"  [run ] {name}")
+                                self.state['stages'][name] = {
+                                    'fingerprint': fingerprint,
+                                    'status': 'running',
+                                    'started_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                                }
+                                running[pool.submit(self._run_stage, stage)] = name
+                        else:
+                            continue
+                        pending.remove(name)
+                        progressed = True
+                self._save_state()
+
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    code, seconds = future.result()
+                    record = self.state['stages'][name]
+                    record['status'] = 'completed' if code == 0 else 'failed'
+                    record['finished_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                    record['seconds'] = round(seconds, 3)
+                    record['exit_code'] = code
+                    if code == 0:
+                        missing = _missing(self.stages[name].outputs, self.stages[name].cwd)
+                        if missing:
+                            record['status'] = 'failed'
+                            record['missing_outputs'] = missing
+                        else:
+                            record['fingerprint'] = self.fingerprint(self.stages[name])
+                    status[name] = record['status']
+                    label = 'done' if status[name] == 'completed' else 'FAIL'
+                    print(f"  [{label}] {name} ({seconds:.1f}s)"
+                          + ('' if status[name] == 'completed' else f" - see {os.path.join(self.log_dir, name + '.log')}"))
+                self._save_state()
+
+        for name in pending:
+            status[name] = 'blocked'
+        return {name: status[name] for name in selected}
+
+    def critical_path(self, names=None):
+        """
+        Longest chain of recorded stage durations through the DAG
+
+        Returns:
+            tuple: (list of stage names, total seconds)
+        """
+        names = names or self.order
+        best = {}
+        for name in [n for n in self.order if n in names]:
+            seconds = self.state['stages'].get(name, {}).get('seconds', 0.0)
+            upstream = [best[dep] for dep in self.stages[name].deps if dep in best]
+            path, total = max(upstream, key=lambda item: item[1], default=([], 0.0))
+            best[name] = (path + [name], total + seconds)
+        return max(best.values(), key=lambda item: item[1], default=([], 0.0))
+
+
+def python_stage(name, script, **kwargs):
+    """Stage running a script with the current interpreter"""
+    return Stage(name, [sys.executable, script], **kwargs)
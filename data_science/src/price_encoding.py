@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Price Encoding - Integer Cents with Per-Session Delta Compression
+Compact, exact storage for long intraday histories (1-minute and 10-minute bars):
+
+- Prices become integer cents. Each session keeps its first close as an
+  integer anchor; closes are stored as bar-to-bar deltas and open/high/low as offsets
+  from the bar's close, in the smallest signed integer type that holds them
+  (int16 for ordinary index and stock bars)
+- Bar times are minutes since the session date's midnight (int16), with the
+  session date stored once per session
+- Volume uses the smallest integer type that holds it
+
+Decoding is vectorized (one cumulative sum with per-session resets) and
+returns float64 prices identical to parsing the 2-decimal CSV, or the integer
+cents themselves (as_cents=True) so level-touch checks can compare integers
+exactly with touched_cents().
+"""
+
+import numpy as np
+import pandas as pd
+
+PRICE_SCALE = 100
+PRICE_COLUMNS = ['open', 'high', 'low', 'close']
+
+# Cents tolerance used when turning a computed (float) level into a cent boundary
+LEVEL_EPSILON = 1e-6
+
+
+def to_cents(prices):
+    """Prices (2 decimals) as int64 cents; raises ValueError for missing or non-finite prices"""
+    prices = np.asarray(prices, dtype=np.float64)
+    if not np.isfinite(prices).all():
+        raise ValueError("Prices must be finite to encode as cents")
+    return np.rint(prices * PRICE_SCALE).astype(np.int64)
+
+
+def from_cents(cents):
+    """Integer cents as float64 prices"""
+    return np.asarray(cents, dtype=np.int64) / PRICE_SCALE
+
+
+def touched_cents(high_cents, low_cents, level):
+    """
+    Exact low <= level <= high on integer cents
+
+    The level is a computed float (e.g. previous close + 0.382 ATR); low must be
+    at or below it and high at or above it, so it is floored/ceiled to cents
+    after absorbing float noise of up to LEVEL_EPSILON cents.
+    """
+    level_cents = np.round(np.asarray(level, dtype=np.float64) * PRICE_SCALE / LEVEL_EPSILON) * LEVEL_EPSILON
+    return (np.asarray(low_cents) <= np.floor(level_cents)) & (np.asarray(high_cents) >= np.ceil(level_cents))
+
+
+def _smallest_int(values, signed=True):
+    """Smallest integer dtype holding every value"""
+    if len(values) == 0:
+        return np.int8 if signed else np.uint8
+    candidates = [np.int8, np.int16, np.int32, np.int64] if signed else [np.uint8, np.uint16, np.uint32, np.uint64]
+    low, high = values.min(), values.max()
+    for dtype in candidates:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return dtype
+    return np.int64
+
+
+def encode_bars(data):
+    """
+    Encode OHLCV bars
+
+    Args:
+        data (pd.DataFrame): date, open, high, low, close and optionally volume,
+                             prices on a cent grid
+
+    Returns:
+        dict: NumPy arrays (session_start, session_date, minute, anchor,
+              close_delta, open_offset, high_offset, low_offset, volume) plus
+              'tz' - everything save_encoded() writes
+    """
+    data = data.sort_values('date', kind='stable')
+    try:
+        dates = pd.to_datetime(data['date'])
+    except ValueError:
+        # Mixed UTC offsets (IBKR dates across DST changes) are kept as UTC instants
+        dates = pd.to_datetime(data['date'], utc=True)
+    tz = str(dates.dt.tz) if dates.dt.tz is not None else ''
+    if tz:
+        dates = dates.dt.tz_localize(None)
+    stamps = dates.to_numpy(dtype='datetime64[ns]')
+    days = stamps.astype('datetime64[D]')
+    n = len(stamps)
+
+    starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]]) if n else np.array([], dtype=np.int64)
+    seconds = (stamps - days).astype('timedelta64[s]').astype(np.int64)
+    if (seconds % 60).any():
+        raise ValueError("encode_bars stores minute resolution; bar times have seconds")
+
+    cents = {col: to_cents(data[col]) for col in PRICE_COLUMNS}
+    close = cents['close']
+    close_delta = np.diff(close, prepend=close[:1])
+    close_delta[starts] = 0
+
+    encoded = {
+        'session_start': np.r_[starts, n].astype(np.int64),
+        'session_date': days[starts].astype('datetime64[ns]').view(np.int64),
+        'minute': (seconds // 60).astype(np.int16),
+        'anchor': close[starts].astype(_smallest_int(close[starts])),
+        'close_delta': close_delta.astype(_smallest_int(close_delta))
+    }
+    for col in ['open', 'high', 'low']:
+        offset = cents[col] - close
+        encoded[f"{col}_offset"] = offset.astype(_smallest_int(offset))
+    if 'volume' in data.columns:
+        volume = np.rint(data['volume'].fillna(0).to_numpy(dtype=np.float64)).astype(np.int64)
+        encoded['volume'] = volume.astype(_smallest_int(volume, signed=volume.min(initial=0) < 0))
+    encoded['tz'] = np.array(tz)
+    return encoded
+
+
+def decode_cents(encoded):
+    """Integer cents (int64) of every price column, decoded in one vectorized pass"""
+    session_start = encoded['session_start']
+    lengths = np.diff(session_start)
+    running = np.cumsum(encoded['close_delta'], dtype=np.int64)
+    # Reset the running sum at each session start and add that session's anchor
+    base = np.repeat(encoded['anchor'].astype(np.int64) - running[session_start[:-1]], lengths)
+    close = running + base
+    return {
+        'open': close + encoded['open_offset'],
+        'high': close + encoded['high_offset'],
+        'low': close + encoded['low_offset'],
+        'close': close
+    }
+
+
+def decode_bars(encoded, as_cents=False):
+    """
+    Decode to a bar frame
+
+    Args:
+        encoded (dict): Output of encode_bars() or load_encoded()
+        as_cents (bool): Keep prices as int64 cents instead of float64
+
+    Returns:
+        pd.DataFrame: date, open, high, low, close and volume (if encoded)
+    """
+    lengths = np.diff(encoded['session_start'])
+    stamps = (np.repeat(encoded['session_date'], lengths)
+              + encoded['minute'].astype(np.int64) * 60_000_000_000).view('datetime64[ns]')
+    date = pd.DatetimeIndex(stamps)
+    tz = str(encoded['tz'])
+    if tz:
+        date = date.tz_localize(tz)
+
+    cents = decode_cents(encoded)
+    columns = {'date': date}
+    for col in PRICE_COLUMNS:
+        columns[col] = cents[col] if as_cents else from_cents(cents[col])
+    if 'volume' in encoded:
+        columns['volume'] = encoded['volume'].astype(np.int64)
+    return pd.DataFrame(columns)
+
+
+def encoded_nbytes(encoded):
+    """In-memory size of the encoded arrays in bytes"""
+    return sum(values.nbytes for values in encoded.values())
+
+
+def save_encoded(path, encoded):
+    """Write encoded bars as a compressed .npz"""
+    np.savez_compressed(path, **encoded)
+
+
+def load_encoded(path):
+    """Read bars written by save_encoded()"""
+    with np.load(path) as stored:
+        return {name: stored[name] for name in stored.files}
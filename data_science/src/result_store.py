@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Result Store - Indexed SQLite Database for Analysis Results
+One embedded database next to the result CSVs instead of loose files found
+through hard-coded paths:
+
+- runs: one row per analysis run (analysis name, start/finish time, status,
+  parameters and source files as JSON)
+- run_tables: which result tables each run wrote, with row counts and the
+  run's columns and dtypes (so old runs read back with the columns they wrote)
+- one table per result (enhanced_yearly, enhanced_summary, state_managed_gap_open, ...)
+  with a run_id column, indexed on (run_id, key columns)
+
+Reading the latest run, comparing two runs or exporting a dashboard slice is an
+indexed query rather than reading and joining whole CSVs:
+
+    store = ResultStore()
+    summary = store.read('enhanced_summary')
+    change = store.compare_runs('enhanced_summary', old_run, new_run, ['ticker'], ['combined_negative_rate'])
+
+The scripts keep writing their CSVs as compatibility exports. SQLite ships
+with Python, so the store needs no extra dependency; WAL mode lets readers
+(e.g. the analysis server) query while an analysis writes.
+"""
+
+import os
+import json
+import sqlite3
+import contextlib
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+RESULTS_DB = 'results.sqlite'
+DEFAULT_RESULTS_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'analysis_results')
+
+# Key columns indexed together with run_id; other tables are indexed on run_id only
+TABLE_KEYS = {
+    'enhanced_yearly': ('ticker', 'year'),
+    'enhanced_summary': ('ticker',),
+    'enhanced_significance': ('ticker', 'comparison'),
+    'state_managed_gap_open': ('date',),
+    'state_managed_intraday': ('date',)
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    analysis TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    status TEXT NOT NULL,
+    parameters TEXT,
+    sources TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_analysis ON runs (analysis, status, run_id);
+CREATE TABLE IF NOT EXISTS run_tables (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id),
+    table_name TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    columns TEXT NOT NULL,
+    PRIMARY KEY (table_name, run_id)
+);
+"""
+
+
+def _quote(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _now():
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _sqlite_value(value):
+    """Plain Python scalar SQLite can bind (times, dates and other objects become text)"""
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    if value is pd.NaT:
+        return None
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def _storable(frame):
+    """Copy of frame with object columns reduced to values SQLite can bind"""
+    frame = frame.copy()
+    for col in frame.columns:
+        if frame[col].dtype == object:
+            frame[col] = frame[col].map(_sqlite_value)
+    return frame
+
+
+class ResultStore:
+    """
+    Analysis results in one SQLite database
+
+    Args:
+        path (str): Database file (default: data/analysis_results/results.sqlite)
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(DEFAULT_RESULTS_DIR, RESULTS_DB)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(self.path, timeout=30)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(SCHEMA)
+
+    @classmethod
+    def in_directory(cls, results_dir):
+        """Store that lives next to the result CSVs in results_dir"""
+        return cls(os.path.join(results_dir, RESULTS_DB))
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    # Runs
+
+    def start_run(self, analysis, parameters=None, sources=None):
+        """Register a run and return its run_id"""
+        with self.conn:
+            cursor = self.conn.execute(
+                'INSERT INTO runs (analysis, started_at, status, parameters, sources) VALUES (?, ?, ?, ?, ?)',
+                (analysis, _now(), 'running', json.dumps(parameters or {}, default=str),
+                 json.dumps(sources or {}, default=str))
+            )
+        return cursor.lastrowid
+
+    def finish_run(self, run_id, status='completed'):
+        with self.conn:
+            self.conn.execute('UPDATE runs SET finished_at = ?, status = ? WHERE run_id = ?', (_now(), status, run_id))
+
+    @contextlib.contextmanager
+    def run(self, analysis, parameters=None, sources=None):
+        """Context manager yielding a run_id; the run is marked failed if the block raises"""
+        run_id = self.start_run(analysis, parameters, sources)
+        try:
+            yield run_id
+        except BaseException:
+            self.finish_run(run_id, 'failed')
+            raise
+        self.finish_run(run_id)
+
+    def runs(self, analysis=None):
+        """Run metadata (newest first) with parameters and sources decoded"""
+        query = 'SELECT * FROM runs'
+        params = ()
+        if analysis:
+            query += ' WHERE analysis = ?'
+            params = (analysis,)
+        runs = pd.read_sql_query(query + ' ORDER BY run_id DESC', self.conn, params=params)
+        for col in ['parameters', 'sources']:
+            runs[col] = runs[col].map(lambda text: json.loads(text) if text else {})
+        return runs
+
+    def latest_run_id(self, table=None, analysis=None):
+        """Newest completed run that wrote table (and/or belongs to analysis), or None"""
+        query = 'SELECT MAX(r.run_id) FROM runs r'
+        clauses = ["r.status = 'completed'"]
+        params = []
+        if table:
+            query += ' JOIN run_tables t ON t.run_id = r.run_id'
+            clauses.append('t.table_name = ?')
+            params.append(table)
+        if analysis:
+            clauses.append('r.analysis = ?')
+            params.append(analysis)
+        row = self.conn.execute(f"{query} WHERE {' AND '.join(clauses)}", params).fetchone()
+        return row[0]
+
+    # Result tables
+
+    def tables(self):
+        """Result tables with the number of runs and rows stored in each"""
+        return pd.read_sql_query(
+            'SELECT table_name, COUNT(*) AS runs, SUM(rows) AS rows, MAX(run_id) AS latest_run_id '
+            'FROM run_tables GROUP BY table_name ORDER BY table_name', self.conn
+        )
+
+    def _existing_columns(self, table):
+        return [row[1] for row in self.conn.execute(f'PRAGMA table_info({_quote(table)})')]
+
+    def write(self, table, frame, run_id, keys=None):
+        """
+        Append one run's result frame to table
+
+        New columns are added to the table as they appear, and the table is
+        indexed on (run_id, keys) so per-run reads and comparisons stay indexed.
+
+        Args:
+            table (str): Result table name
+            frame (pd.DataFrame): Results (the index is not stored)
+            run_id (int): Run from start_run()/run()
+            keys (tuple): Key columns to index (default: TABLE_KEYS[table])
+
+        Returns:
+            int: Rows written
+        """
+        keys = [key for key in (keys or TABLE_KEYS.get(table, ())) if key in frame.columns]
+        rows = _storable(frame.reset_index(drop=True))
+        rows.insert(0, 'run_id', run_id)
+
+        with self.conn:
+            existing = self._existing_columns(table)
+            if existing:
+                for col in rows.columns:
+                    if col not in existing:
+                        self.conn.execute(f'ALTER TABLE {_quote(table)} ADD COLUMN {_quote(col)}')
+            rows.to_sql(table, self.conn, if_exists='append', index=False, chunksize=10000)
+            self.conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {_quote(f'idx_{table}_run')} "
+                f"ON {_quote(table)} ({', '.join(_quote(col) for col in ['run_id'] + keys)})"
+            )
+            self.conn.execute(
+                'INSERT OR REPLACE INTO run_tables (run_id, table_name, rows, columns) VALUES (?, ?, ?, ?)',
+                (run_id, table, len(rows), json.dumps([[str(col), str(dtype)] for col, dtype in frame.dtypes.items()]))
+            )
+        return len(rows)
+
+    def read(self, table, run_id=None, where=None, params=()):
+        """
+        One run's rows of a result table, with the columns that run wrote
+
+        Args:
+            table (str): Result table name
+            run_id (int): Run to read (None = latest completed run that wrote table)
+            where (str): Optional extra SQL condition, e.g. "ticker = ?"
+            params (tuple): Parameters for where
+
+        Returns:
+            pd.DataFrame: Results, or None if no run wrote the table
+        """
+        if run_id is None:
+            run_id = self.latest_run_id(table)
+        if run_id is None:
+            return None
+        row = self.conn.execute('SELECT columns FROM run_tables WHERE table_name = ? AND run_id = ?',
+                                (table, run_id)).fetchone()
+        if row is None:
+            return None
+        columns = json.loads(row[0])
+        query = (f"SELECT {', '.join(_quote(col) for col, _ in columns)} FROM {_quote(table)} "
+                 f"WHERE run_id = ?")
+        if where:
+            query += f" AND ({where})"
+        results = pd.read_sql_query(query, self.conn, params=(run_id, *params))
+        # SQLite stores booleans as 0/1 and all-NULL columns as objects; restore the numeric dtypes written
+        for col, dtype in columns:
+            if dtype.startswith('float') or (dtype in ('bool', 'int32', 'int64') and results[col].notna().all()):
+                results[col] = results[col].astype(dtype)
+        return results
+
+    def compare_runs(self, table, run_a, run_b, keys, metrics):
+        """
+        Join two runs of a table on keys and difference the metrics
+
+        Returns:
+            pd.DataFrame: keys, then {metric}_a, {metric}_b and {metric}_change for each
+                          metric; only keys present in both runs are returned
+        """
+        selected = [f"a.{_quote(key)} AS {_quote(key)}" for key in keys]
+        for metric in metrics:
+            col = _quote(metric)
+            selected += [f"a.{col} AS {_quote(f'{metric}_a')}",
+                         f"b.{col} AS {_quote(f'{metric}_b')}",
+                         f"b.{col} - a.{col} AS {_quote(f'{metric}_change')}"]
+        on = ' AND '.join(f"a.{_quote(key)} = b.{_quote(key)}" for key in keys)
+        query = (f"SELECT {', '.join(selected)} FROM {_quote(table)} a JOIN {_quote(table)} b ON {on} "
+                 f"WHERE a.run_id = ? AND b.run_id = ? ORDER BY {', '.join(f'a.{_quote(key)}' for key in keys)}")
+        return pd.read_sql_query(query, self.conn, params=(run_a, run_b))
+
+
+def record_run(analysis, tables, parameters=None, sources=None, results_dir=None):
+    """
+    Store one completed run's result frames
+
+    Args:
+        analysis (str): Analysis name (e.g. 'enhanced_golden_gate')
+        tables (dict): Result table name -> DataFrame
+        parameters (dict): Analysis parameters stored with the run
+        sources (dict): Input files stored with the run
+        results_dir (str): Directory holding the database (default: data/analysis_results)
+
+    Returns:
+        tuple: (run_id, database path)
+    """
+    store = ResultStore.in_directory(results_dir or DEFAULT_RESULTS_DIR)
+    with store, store.run(analysis, parameters, sources) as run_id:
+        for table, frame in tables.items():
+            store.write(table, frame, run_id)
+    return run_id, store.path
+
+
+def load_results(table, csv_file=None, results_dir=None):
+    """
+    Latest stored results of a table, falling back to a CSV export
+
+    Returns:
+        pd.DataFrame: Results, or None if neither the store nor csv_file has them
+    """
+    db_file = os.path.join(results_dir or DEFAULT_RESULTS_DIR, RESULTS_DB)
+    if os.path.exists(db_file):
+        with ResultStore(db_file) as store:
+            results = store.read(table)
+        if results is not None:
+            return results
+    if csv_file and os.path.exists(csv_file):
+        return pd.read_csv(csv_file)
+    return None
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Session Arrays
+Reshapes an intraday bar store into dense session x bar-slot NumPy matrices
+(NaN where a bar is missing) so analyses can run over every session at once
+instead of filtering the frame day by day.
+"""
+
+import numpy as np
+import pandas as pd
+from datetime import time
+
+
+def build_session_arrays(data_intraday, daily_bars, bar_minutes=10,
+                         session_start=time(9, 30), session_end=time(16, 0)):
+    """
+    Build aligned session arrays with previous-day close/ATR levels
+
+    Args:
+        data_intraday (pd.DataFrame): Intraday bars with 'date', 'open', 'high', 'low', 'close'
+        daily_bars (pd.DataFrame): Daily bars with 'trade_date', 'close', 'atr'
+                                   (warm-up rows already removed by the caller)
+        bar_minutes (int): Intraday bar size in minutes
+        session_start (datetime.time): First slot (market open bar)
+        session_end (datetime.time): Last slot (bars starting later are dropped)
+
+    Returns:
+        dict: dates, slot_minutes, open/high/low/close (sessions x slots),
+              previous_close, previous_atr, has_open_bar
+    """
+    start_minutes = session_start.hour * 60 + session_start.minute
+    end_minutes = session_end.hour * 60 + session_end.minute
+    slot_minutes = np.arange(start_minutes, end_minutes + 1, bar_minutes)
+    n_slots = len(slot_minutes)
+
+    # Sessions = days with a previous day in daily_bars (levels come from the previous day)
+    daily_dates = pd.to_datetime(pd.Series(daily_bars['trade_date'])).to_numpy()
+    dates = daily_dates[1:]
+    previous_close = daily_bars['close'].to_numpy(dtype=float)[:-1]
+    previous_atr = daily_bars['atr'].to_numpy(dtype=float)[:-1]
+    n_sessions = len(dates)
+
+    timestamps = pd.to_datetime(data_intraday['date'])
+    bar_days = timestamps.dt.normalize().to_numpy()
+    bar_minutes_of_day = (timestamps.dt.hour * 60 + timestamps.dt.minute).to_numpy()
+
+    if n_sessions > 0:
+        session_idx = np.minimum(np.searchsorted(dates, bar_days), n_sessions - 1)
+        in_session = dates[session_idx] == bar_days
+    else:
+        session_idx = np.zeros(len(bar_days), dtype=int)
+        in_session = np.zeros(len(bar_days), dtype=bool)
+    offset = bar_minutes_of_day - start_minutes
+    in_slot = (offset >= 0) & (offset % bar_minutes == 0) & (bar_minutes_of_day <= end_minutes)
+    keep = in_session & in_slot
+    rows = session_idx[keep]
+    cols = (offset[keep] // bar_minutes).astype(int)
+
+    arrays = {
+        'dates': dates,
+        'slot_minutes': slot_minutes,
+        'previous_close': previous_close,
+        'previous_atr': previous_atr
+    }
+    for column in ['open', 'high', 'low', 'close']:
+        matrix = np.full((n_sessions, n_slots), np.nan)
+        matrix[rows, cols] = data_intraday[column].to_numpy(dtype=float)[keep]
+        arrays[column] = matrix
+
+    arrays['has_open_bar'] = ~np.isnan(arrays['open'][:, 0])
+    return arrays
+
+
+def first_true_index(mask, axis=1, start=None):
+    """
+    Index of the first True along `axis` (at or after `start`), or the axis length if none
+
+    Args:
+        mask (np.ndarray): Boolean array
+        axis (int): Axis to search along
+        start (np.ndarray): Optional per-row first eligible index (broadcast against mask)
+    """
+    length = mask.shape[axis]
+    if start is not None:
+        positions = np.arange(length).reshape([-1 if a == axis % mask.ndim else 1 for a in range(mask.ndim)])
+        mask = mask & (positions >= start)
+    found = mask.any(axis=axis)
+    return np.where(found, mask.argmax(axis=axis), length)
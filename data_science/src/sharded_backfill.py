@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Sharded Backfill - Historical Chunks over Parallel IBKR Client Connections
+A sequential collector waits one round trip per chunk, so a long multi-symbol
+backfill is bound by a single connection's latency. ShardedBackfill splits
+each symbol's date range into chunk windows and hands them to several client
+connections (one thread and one distinct client ID each), which all draw from
+one PacingBudget, so the account's historical-data pacing rules hold across
+connections:
+
+- fewer than six requests for the same contract within two seconds
+- no identical request within fifteen seconds (retries wait)
+- for bars of 30 seconds or less only, at most SMALL_BAR_REQUESTS requests
+  in any SMALL_BAR_WINDOW seconds (pacing_budget() picks this by bar size)
+
+Chunks that fail are retried on any client up to MAX_ATTEMPTS times. Results
+come back per symbol, sorted and deduplicated, and merge_into_store() folds
+them into a ticker store CSV.
+"""
+
+import os
+import math
+import time
+import queue
+import asyncio
+import logging
+import threading
+from collections import deque, defaultdict
+from datetime import timedelta
+import pandas as pd
+
+from market_data.instrumentation import span, increment
+from market_data.ibkr_provider import IBKRProvider, FUTURE_EXCHANGES
+
+logger = logging.getLogger(__name__)
+
+# IBKR historical-data pacing rules (per account, across all client connections)
+SAME_CONTRACT_REQUESTS = 5
+SAME_CONTRACT_SECONDS = 2
+IDENTICAL_REQUEST_SECONDS = 15
+
+# Window cap that applies only to bars of SMALL_BAR_SECONDS or less
+SMALL_BAR_REQUESTS = 60
+SMALL_BAR_WINDOW = 600
+SMALL_BAR_SECONDS = 30
+
+# Days of bars per request (as in fixed_spx_historical_collection.py)
+CHUNK_DAYS = 30
+MAX_ATTEMPTS = 3
+
+
+class PacingBudget:
+    """
+    Sliding-window request budget shared by every client thread
+
+    Args:
+        max_requests (int): Requests allowed in any `window` seconds (None: no window cap)
+        window (float): Length of the sliding window in seconds
+        per_contract (int): Requests allowed for one contract in `per_contract_window` seconds
+        per_contract_window (float): Length of the per-contract window in seconds
+        identical_interval (float): Seconds before the same request may be repeated
+    """
+
+    def __init__(self, max_requests=None, window=SMALL_BAR_WINDOW,
+                 per_contract=SAME_CONTRACT_REQUESTS, per_contract_window=SAME_CONTRACT_SECONDS,
+                 identical_interval=IDENTICAL_REQUEST_SECONDS):
+        self.max_requests = max_requests
+        self.window = window
+        self.per_contract = per_contract
+        self.per_contract_window = per_contract_window
+        self.identical_interval = identical_interval
+        self._requests = deque()
+        self._by_contract = defaultdict(deque)
+        self._last_request = {}
+        self._condition = threading.Condition()
+        self.waited = 0.0
+
+    def acquire(self, contract_key, request_key=None):
+        """
+        Block until one more request for `contract_key` fits the budget, then record it
+
+        Args:
+            contract_key: Contract the request is for
+            request_key: Identity of the request (e.g. contract, end date, duration, bar size)
+
+        Returns:
+            float: Seconds waited
+        """
+        start = time.monotonic()
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                recent = self._by_contract[contract_key]
+                while self._requests and self._requests[0] <= now - self.window:
+                    self._requests.popleft()
+                while recent and recent[0] <= now - self.per_contract_window:
+                    recent.popleft()
+
+                wait = 0.0
+                if self.max_requests is not None and len(self._requests) >= self.max_requests:
+                    wait = self._requests[0] + self.window - now
+                if len(recent) >= self.per_contract:
+                    wait = max(wait, recent[0] + self.per_contract_window - now)
+                if request_key in self._last_request:
+                    wait = max(wait, self._last_request[request_key] + self.identical_interval - now)
+                if wait <= 0:
+                    if self.max_requests is not None:
+                        self._requests.append(now)
+                    recent.append(now)
+                    if request_key is not None:
+                        self._last_request[request_key] = now
+                    waited = now - start
+                    self.waited += waited
+                    return waited
+                self._condition.wait(wait)
+
+
+def bar_seconds(bar_size):
+    """Length of an IBKR bar size in seconds ('30 secs' -> 30, '10 mins' -> 600)"""
+    count, unit = bar_size.split()
+    unit_seconds = {'sec': 1, 'min': 60, 'hour': 3600, 'day': 86400, 'week': 604800, 'month': 2592000}
+    return int(count) * next(seconds for prefix, seconds in unit_seconds.items() if unit.startswith(prefix))
+
+
+def pacing_budget(bar_size, max_requests=None, window=SMALL_BAR_WINDOW):
+    """
+    PacingBudget for a bar size
+
+    Args:
+        bar_size (str): IBKR bar size
+        max_requests (int): Window cap override; by default SMALL_BAR_REQUESTS per
+                            SMALL_BAR_WINDOW for bars of 30 seconds or less, none otherwise
+        window (float): Window length in seconds for the cap
+    """
+    if max_requests is None and bar_seconds(bar_size) <= SMALL_BAR_SECONDS:
+        max_requests = SMALL_BAR_REQUESTS
+    return PacingBudget(max_requests=max_requests, window=window)
+
+
+def chunk_windows(start, end, chunk_days=CHUNK_DAYS):
+    """[start, end) split into (chunk_start, chunk_end) windows of at most chunk_days"""
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    windows = []
+    chunk_start = start
+    while chunk_start < end:
+        chunk_end = min(chunk_start + timedelta(days=chunk_days), end)
+        windows.append((chunk_start, chunk_end))
+        chunk_start = chunk_end
+    return windows
+
+
+class ShardedBackfill:
+    """
+    Historical bars for many symbols and chunks over parallel client connections
+
+    Args:
+        client_ids (list): One connection (and thread) per client ID; must not
+                           clash with other connected clients
+        bar_size (str): IBKR bar size
+        use_rth (bool): Regular trading hours only
+        budget (PacingBudget): Shared pacing budget (default: pacing_budget(bar_size))
+        host (str): TWS/Gateway host
+        port (int): TWS (7496) or Gateway (7497) port
+        provider_factory: Callable client_id -> IBKRProvider-like object (default: IBKRProvider)
+    """
+
+    def __init__(self, client_ids, bar_size='10 mins', use_rth=False, budget=None,
+                 host='127.0.0.1', port=7496, provider_factory=None):
+        if len(set(client_ids)) != len(client_ids):
+            raise ValueError("Client IDs must be distinct")
+        self.client_ids = list(client_ids)
+        self.bar_size = bar_size
+        self.use_rth = use_rth
+        self.budget = budget or pacing_budget(bar_size)
+        self.provider_factory = provider_factory or (lambda client_id: IBKRProvider(host, port, client_id))
+        self._lock = threading.Lock()
+        self.stats = {}
+
+    def _fetch_chunk(self, provider, contract, chunk_start, chunk_end):
+        """Bars of one window, dates without timezone (as the collector stores them)"""
+        days = math.ceil((chunk_end - chunk_start) / timedelta(days=1))
+        end_date = chunk_end.strftime('%Y%m%d %H:%M:%S')
+        self.budget.acquire(contract.symbol, (contract.symbol, end_date, days, self.bar_size, self.use_rth))
+        bars = provider.historical_bars(contract, f"{days} D", self.bar_size,
+                                        end_date=end_date, use_rth=self.use_rth)
+        if bars is None or bars.empty:
+            return None
+        bars['date'] = pd.to_datetime(bars['date'])
+        if bars['date'].dt.tz is not None:
+            bars['date'] = bars['date'].dt.tz_localize(None)
+        return bars[(bars['date'] >= chunk_start) & (bars['date'] < chunk_end)]
+
+    def _worker(self, client_id, tasks, results, failures):
+        # ib_insync runs on an asyncio event loop; each connection thread needs its own
+        asyncio.set_event_loop(asyncio.new_event_loop())
+        provider = self.provider_factory(client_id)
+        try:
+            provider.connect()
+        except Exception as e:
+            logger.error("Client %s could not connect: %s", client_id, e)
+            return
+
+        contracts = {}
+        try:
+            while True:
+                try:
+                    symbol, chunk_start, chunk_end, attempt = tasks.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    if symbol not in contracts:
+                        contracts[symbol] = provider.qualify(provider.contract(symbol))
+                    if contracts[symbol] is None:
+                        raise ValueError(f"could not qualify {symbol}")
+                    with span('backfill_chunk', symbol=symbol):
+                        bars = self._fetch_chunk(provider, contracts[symbol], chunk_start, chunk_end)
+                    with self._lock:
+                        self.stats['fetched'] += 1
+                        self.stats['by_client'][client_id] += 1
+                        if bars is not None and not bars.empty:
+                            results[symbol].append(bars)
+                    increment('rows_fetched', 0 if bars is None else len(bars), symbol=symbol)
+                except Exception as e:
+                    increment('errors', stage='backfill', symbol=symbol)
+                    if attempt + 1 < MAX_ATTEMPTS:
+                        logger.warning("Client %s: %s %s chunk failed (%s), retrying", client_id, symbol,
+                                       chunk_end.date(), e)
+                        tasks.put((symbol, chunk_start, chunk_end, attempt + 1))
+                    else:
+                        logger.error("Client %s: %s %s chunk failed after %d attempts: %s", client_id, symbol,
+                                     chunk_end.date(), MAX_ATTEMPTS, e)
+                        with self._lock:
+                            failures.append((symbol, chunk_start, chunk_end))
+        finally:
+            provider.disconnect()
+
+    def run(self, symbols, start, end, chunk_days=CHUNK_DAYS):
+        """
+        Fetch every chunk window of every symbol
+
+        Args:
+            symbols (list): Stock and index symbols (futures come from continuous_futures)
+            start (str): First date
+            end (str): End date (exclusive)
+            chunk_days (int): Days of bars per request
+
+        Returns:
+            tuple: (dict symbol -> raw bars sorted and deduplicated on date,
+                    list of (symbol, chunk_start, chunk_end) windows that were not fetched)
+        """
+        futures = [symbol for symbol in symbols if symbol in FUTURE_EXCHANGES]
+        if futures:
+            raise ValueError(f"Dated futures history comes from continuous_futures, not a backfill: {futures}")
+
+        # Chunks interleaved across symbols, so concurrent clients mostly ask for different contracts
+        tasks = queue.Queue()
+        for chunk_start, chunk_end in chunk_windows(start, end, chunk_days):
+            for symbol in symbols:
+                tasks.put((symbol, chunk_start, chunk_end, 0))
+        self.stats = {'chunks': tasks.qsize(), 'fetched': 0, 'by_client': defaultdict(int)}
+        results = defaultdict(list)
+        failures = []
+
+        started = time.monotonic()
+        threads = [threading.Thread(target=self._worker, args=(client_id, tasks, results, failures),
+                                    name=f"backfill-client-{client_id}", daemon=True)
+                   for client_id in self.client_ids]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.stats['seconds'] = time.monotonic() - started
+        self.stats['pacing_wait'] = self.budget.waited
+
+        # Chunks left queued when every client failed to connect
+        while not tasks.empty():
+            symbol, chunk_start, chunk_end, _ = tasks.get_nowait()
+            failures.append((symbol, chunk_start, chunk_end))
+
+        merged = {}
+        for symbol, frames in results.items():
+            bars = pd.concat(frames, ignore_index=True)
+            merged[symbol] = bars.drop_duplicates('date', keep='last').sort_values('date').reset_index(drop=True)
+        return merged, sorted(failures)
+
+
+def merge_into_store(path, bars):
+    """
+    Merge bars into a ticker store CSV, keeping one row per date (new bars win)
+
+    Returns:
+        pd.DataFrame: The merged store
+    """
+    frames = [bars]
+    if os.path.exists(path):
+        stored = pd.read_csv(path)
+        stored['date'] = pd.to_datetime(stored['date'])
+        frames.insert(0, stored)
+    store = pd.concat(frames, ignore_index=True)
+    store = store.drop_duplicates('date', keep='last').sort_values('date').reset_index(drop=True)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    store.to_csv(path, index=False)
+    return store
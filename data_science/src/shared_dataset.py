@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Shared Dataset - Publish NumPy Arrays Once for Process-Pool Workers
+Pool initializer arguments are pickled and copied into every worker, so each
+worker holds its own copy of the data and startup time grows with its size.
+SharedDataset copies a set of named arrays into one multiprocessing.shared_memory
+block instead; workers receive only a small handle (block name plus each
+array's offset, shape and dtype) and attach read-only views of the same pages:
+
+    with SharedDataset({'event_prefix': event_prefix, 'success_prefix': success_prefix}) as dataset:
+        with ProcessPoolExecutor(initializer=_init_shared_worker, initargs=(dataset.handle,)) as pool:
+            ...
+
+    def _init_shared_worker(handle):
+        _worker_state.update(attach(handle))
+
+Per-worker memory and startup cost then stay constant as the pool grows.
+bar_arrays() lays out OHLCV bars, the session (day) index and ATR as plain
+arrays for publishing.
+"""
+
+import sys
+import numpy as np
+from multiprocessing import shared_memory, resource_tracker
+
+# Array offsets are rounded up to this many bytes
+ALIGNMENT = 64
+
+# Blocks attached by this process, kept alive for as long as their views are used
+_attached = {}
+
+
+def _aligned(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+class SharedDataset:
+    """
+    Named arrays copied once into a shared memory block owned by this process
+
+    The block is released by close() or on leaving the with-block; views
+    handed out by attach() must not be used after that.
+
+    Args:
+        arrays (dict): Name -> array-like (copied as C-contiguous arrays)
+    """
+
+    def __init__(self, arrays):
+        arrays = {name: np.ascontiguousarray(values) for name, values in arrays.items()}
+        layout = {}
+        offset = 0
+        for name, values in arrays.items():
+            offset = _aligned(offset)
+            layout[name] = (offset, values.shape, values.dtype.str)
+            offset += values.nbytes
+
+        self._shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for name, values in arrays.items():
+            start, shape, dtype = layout[name]
+            np.ndarray(shape, dtype=dtype, buffer=self._shm.buf, offset=start)[...] = values
+        self.handle = {'name': self._shm.name, 'arrays': layout}
+        self.nbytes = offset
+
+    @property
+    def arrays(self):
+        """Read-only views of the published arrays in the owning process"""
+        return _views(self._shm, self.handle['arrays'])
+
+    def close(self):
+        """Release and unlink the block (owner only)"""
+        if self._shm is not None:
+            _attached.pop(self._shm.name, None)
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def _views(shm, layout):
+    views = {}
+    for name, (offset, shape, dtype) in layout.items():
+        view = np.ndarray(tuple(shape), dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+        view.flags.writeable = False
+        views[name] = view
+    return views
+
+
+def _attach_untracked(name):
+    """
+    Open an existing block without registering it with the resource tracker
+
+    Before Python 3.13 attaching registers the block, so a spawned worker's
+    tracker would unlink it at exit, and unregistering afterwards would drop
+    the owner's registration under fork (where the tracker is shared). Only
+    the owner may unlink, so the attaching side skips registration entirely.
+    """
+    register = resource_tracker.register
+    resource_tracker.register = lambda *args, **kwargs: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def attach(handle):
+    """
+    Read-only views of a published dataset (call in the worker, e.g. from the pool initializer)
+
+    Attaching again in the same process reuses the open block.
+
+    Returns:
+        dict: Name -> read-only np.ndarray backed by the shared block
+    """
+    shm = _attached.get(handle['name'])
+    if shm is None:
+        if sys.version_info >= (3, 13):
+            shm = shared_memory.SharedMemory(name=handle['name'], track=False)
+        else:
+            shm = _attach_untracked(handle['name'])
+        _attached[handle['name']] = shm
+    return _views(shm, handle['arrays'])
+
+
+def bar_arrays(data, atr=None):
+    """
+    OHLCV bars as flat arrays ready to publish
+
+    Args:
+        data (pd.DataFrame): Bars sorted by date with date, open, high, low, close and optionally volume
+        atr (array-like): Optional per-session ATR (one value per session)
+
+    Returns:
+        dict: date (int64 ns), open/high/low/close (float64), volume (float64, if present),
+              session_start (int64 row offset of each session plus the end row),
+              session_date (int64 ns of each session's date) and atr (float64, if given)
+    """
+    dates = data['date'].to_numpy(dtype='datetime64[ns]')
+    days = dates.astype('datetime64[D]')
+    starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]]) if len(days) else np.array([], dtype=np.int64)
+
+    arrays = {'date': dates.view(np.int64)}
+    for col in ['open', 'high', 'low', 'close', 'volume']:
+        if col in data.columns:
+            arrays[col] = data[col].to_numpy(dtype=np.float64)
+    arrays['session_start'] = np.r_[starts, len(dates)].astype(np.int64)
+    arrays['session_date'] = days[starts].astype('datetime64[ns]').view(np.int64)
+    if atr is not None:
+        arrays['atr'] = np.asarray(atr, dtype=np.float64)
+    return arrays
@@ -4,122 +4,93 @@ Stock Data Pipeline for IBKR Historical Data Collection
 Restored after accidental deletion
 """
 
-import pandas as pd
-from datetime import datetime
-import time
 import logging
-from ib_insync import *
+
+from market_data.instrumentation import timed, increment
+from market_data.ibkr_provider import IBKRProvider, FUTURE_EXCHANGES
+from market_data.bar_processing import process_bars
 
 class StockDataPipeline:
     def __init__(self, host='127.0.0.1', port=7496, client_id=1):
-        """Initialize the IBKR connection"""
-        self.ib = IB()
+        """Set up the IBKR provider; ib_insync is imported and connected on the first fetch"""
+        self.provider = IBKRProvider(host, port, client_id)
         self.host = host
         self.port = port
         self.client_id = client_id
-        self.connected = False
         
-        # Setup logging
-        logging.basicConfig(level=logging.INFO)
+        # Handlers are installed by the calling script (logging_config.setup_logging)
         self.logger = logging.getLogger(__name__)
-        
-        # Connect to IBKR
-        self.connect()
+    
+    @property
+    def ib(self):
+        return self.provider.ib
+    
+    @property
+    def connected(self):
+        return self.provider.connected
     
     def connect(self):
         """Connect to IBKR TWS/Gateway"""
         try:
-            self.logger.info(f"Connecting to {self.host}:{self.port} with clientId {self.client_id}...")
-            self.ib.connect(self.host, self.port, clientId=self.client_id)
-            self.connected = True
-            self.logger.info(f"Connected to IBKR at {self.host}:{self.port}")
+            self.logger.info("Connecting to %s:%s with clientId %s...", self.host, self.port, self.client_id)
+            self.provider.connect()
         except Exception as e:
-            self.logger.error(f"Failed to connect to IBKR: {e}")
-            self.connected = False
+            self.logger.error("Failed to connect to IBKR: %s", e)
+        return self.connected
     
     def fetch_historical_data(self, symbol, duration='1 Y', bar_size='1 day', end_date=''):
-        """Fetch historical data from IBKR"""
-        if not self.connected:
+        """Fetch historical data from IBKR (connects on first use)"""
+        if not self.connected and not self.connect():
             self.logger.error("Not connected to IBKR")
             return None
         
+        if symbol in FUTURE_EXCHANGES and end_date:
+            # IBKR's continuous contract has no endDateTime; dated history is stitched per contract
+            self.logger.error("Dated %s history comes from continuous_futures.ContinuousFuturesBuilder", symbol)
+            return None
+        
         try:
-            # Create contract
-            if symbol == 'SPX':
-                contract = Index('SPX', 'CBOE')
-            else:
-                contract = Stock(symbol, 'SMART', 'USD')
+            contract = self.provider.contract(symbol)
             
-            self.logger.info(f"Fetching {duration} of {symbol} data...")
+            self.logger.info("Fetching %s of %s data...", duration, symbol)
             
-            # Request historical data
-            bars = self.ib.reqHistoricalData(
-                contract,
-                endDateTime=end_date,
-                durationStr=duration,
-                barSizeSetting=bar_size,
-                whatToShow='TRADES',
-                useRTH=False,  # Include extended hours
-                formatDate=1
-            )
+            # Request historical data (extended hours included)
+            df = self.provider.historical_bars(contract, duration, bar_size, end_date, use_rth=False)
             
-            if bars:
-                self.logger.info(f"Successfully fetched {len(bars)} records from IBKR for {symbol}")
-                # Convert to DataFrame
-                df = util.df(bars)
+            if df is not None:
+                increment('rows_fetched', len(df), symbol=symbol)
+                self.logger.info("Successfully fetched %d records from IBKR for %s", len(df), symbol,
+                                 extra={'symbol': symbol, 'rows': len(df), 'bar_size': bar_size})
                 return df
             else:
-                self.logger.error(f"No data received for {symbol}")
+                self.logger.error("No data received for %s", symbol)
                 return None
                 
         except Exception as e:
-            self.logger.error(f"Error fetching data for {symbol}: {e}")
+            increment('errors', stage='fetch', symbol=symbol)
+            self.logger.error("Error fetching data for %s: %s", symbol, e)
             return None
     
+    @timed('process')
     def process_data(self, df, symbol):
-        """Process the raw IBKR data"""
+        """Process the raw IBKR data (see bar_processing.process_bars)"""
         if df is None or df.empty:
             return None
         
         try:
-            # Rename columns to match our format
-            df = df.rename(columns={
-                'date': 'date',
-                'open': 'open',
-                'high': 'high',
-                'low': 'low',
-                'close': 'close',
-                'volume': 'volume',
-                'average': 'average',
-                'barCount': 'barCount'
-            })
-            
-            # Add symbol column
-            df['symbol'] = symbol
-            
-            # Calculate additional metrics
-            df['daily_range'] = df['high'] - df['low']
-            df['daily_change'] = df['close'] - df['open']
-            df['daily_change_pct'] = (df['daily_change'] / df['open']) * 100
-            
-            # Add index column
-            df['index'] = range(len(df))
-            
-            # Reorder columns
-            columns = ['date', 'symbol', 'open', 'high', 'low', 'close', 'volume', 
-                      'daily_range', 'daily_change', 'daily_change_pct', 'index', 'average', 'barCount']
-            df = df[columns]
+            # Compact schema shared with src/stock_data_pipeline.py (no rounding here)
+            df = process_bars(df, symbol)
             
-            self.logger.info(f"Data processing completed successfully for {symbol}")
+            increment('rows_processed', len(df), symbol=symbol)
+            self.logger.info("Data processing completed successfully for %s", symbol,
+                             extra={'symbol': symbol, 'rows': len(df)})
             return df
             
         except Exception as e:
-            self.logger.error(f"Error processing data for {symbol}: {e}")
+            increment('errors', stage='process', symbol=symbol)
+            self.logger.error("Error processing data for %s: %s", symbol, e)
             return None
     
     def disconnect(self):
         """Disconnect from IBKR"""
-        if self.connected:
-            self.ib.disconnect()
-            self.connected = False
-            self.logger.info("Disconnected from IBKR")
\ No newline at end of file
+        self.provider.disconnect()
\ No newline at end of file
@@ -0,0 +1,9 @@
+"""Put data_science/src, data_science/scripts and the repository root (market_data) on the path, as the scripts do"""
+
+import os
+import sys
+
+TESTS_DIR = os.path.dirname(__file__)
+sys.path.append(os.path.join(TESTS_DIR, '..', 'src'))
+sys.path.append(os.path.join(TESTS_DIR, '..', 'scripts'))
+sys.path.append(os.path.join(TESTS_DIR, '..', '..'))
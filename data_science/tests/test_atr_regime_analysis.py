@@ -0,0 +1,17 @@
+"""Regime grid printing"""
+
+import pandas as pd
+
+from atr_regime_analysis import print_regime_rates
+
+
+def test_regimes_without_events_print_a_placeholder(capsys):
+    table = pd.DataFrame([
+        {'lookback': 20, 'atr_regime': 'low', 'metric': 'gap_open_positive_rate', 'events': 3, 'rate': 100 / 3},
+        {'lookback': 20, 'atr_regime': 'high', 'metric': 'gap_open_negative_rate', 'events': 2, 'rate': 50.0}
+    ])
+    print_regime_rates(table, 'metric', 20)
+    lines = capsys.readouterr().out.splitlines()
+
+    assert lines[1].split() == ['gap_open_negative_rate', '—', '50.0%', '(', '2)']
+    assert lines[2].split() == ['gap_open_positive_rate', '33.3%', '(', '3)', '—']
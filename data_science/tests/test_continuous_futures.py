@@ -0,0 +1,121 @@
+"""Roll calendar, stitching and incremental-build checks for continuous_futures"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from continuous_futures import (ContinuousFuturesBuilder, roll_calendar, stitch, ROLL_DAYS_BEFORE_EXPIRY,
+                                FIRST_CONTRACT_DAYS)
+
+EXPIRIES = ['20240315', '20240621', '20240920', '20241220', '20250321']
+
+
+def rth_index(start, end):
+    """10-minute regular-hours bar times on weekdays"""
+    index = pd.date_range(start, end, freq='10min')
+    times = index.time
+    return index[(index.dayofweek < 5) & (times >= pd.Timestamp('09:30').time())
+                 & (times < pd.Timestamp('16:00').time())]
+
+
+def chain_frame(expiries=EXPIRIES):
+    return pd.DataFrame({'expiry': expiries, 'local_symbol': [f"ES{expiry}" for expiry in expiries]})
+
+
+def contract_frame(dates, prices):
+    return pd.DataFrame({'date': dates, 'open': prices, 'high': prices + 1, 'low': prices - 1,
+                         'close': prices, 'volume': 100.0})
+
+
+class FakeProvider:
+    """Quarterly chain and bars of spot plus a per-contract basis; records every request"""
+
+    def __init__(self):
+        self.dates = rth_index('2023-09-01', '2025-03-31')
+        self.spot = 4000 + np.round(np.cumsum(np.random.default_rng(0).normal(0, 1, len(self.dates))) * 4) / 4
+        self.calls = []
+
+    def contract_chain(self, symbol):
+        self.calls.append(('chain', symbol))
+        return chain_frame().to_dict('records')
+
+    def contract(self, symbol, expiry=None):
+        return (symbol, expiry)
+
+    def qualify(self, contract):
+        return contract
+
+    def historical_bars(self, contract, duration, bar_size, end_date='', use_rth=True):
+        expiry = pd.Timestamp(contract[1])
+        end = pd.Timestamp(end_date)
+        self.calls.append(('bars', contract[1], end))
+        mask = ((self.dates < end) & (self.dates >= end - pd.Timedelta(days=int(duration.split()[0])))
+                & (self.dates <= expiry + pd.Timedelta(hours=16)))
+        return contract_frame(self.dates[mask], self.spot[mask] + EXPIRIES.index(contract[1]) * 10.0)
+
+    def bar_expiries(self):
+        return sorted({call[1] for call in self.calls if call[0] == 'bars'})
+
+
+def test_roll_calendar_orders_dedups_and_chains_windows():
+    chain = chain_frame(['20240621', '20240315', '20240621', '20240920'])
+    calendar = roll_calendar(chain)
+
+    assert calendar['expiry'].tolist() == ['20240315', '20240621', '20240920']
+    expected_rolls = pd.to_datetime(calendar['expiry']) - pd.Timedelta(days=ROLL_DAYS_BEFORE_EXPIRY)
+    assert calendar['roll_date'].tolist() == expected_rolls.tolist()
+    # Each window starts where the previous contract rolled
+    assert calendar['front_start'].iloc[1:].tolist() == calendar['roll_date'].iloc[:-1].tolist()
+    assert calendar['front_start'].iloc[0] == calendar['roll_date'].iloc[0] - pd.Timedelta(days=FIRST_CONTRACT_DAYS)
+
+
+@pytest.mark.parametrize('method', ['add', 'ratio'])
+def test_stitch_is_continuous_across_rolls(method):
+    calendar = roll_calendar(chain_frame(EXPIRIES[:3]))
+    dates = rth_index('2023-12-01', '2024-09-10')
+    spot = 4000 + np.arange(len(dates)) * 0.25
+    # Contract k trades at a fixed offset (or factor) from spot over its whole life
+    levels = [1.0, 1.01, 1.02] if method == 'ratio' else [0.0, 12.5, 30.0]
+    bars = {expiry: contract_frame(dates, spot * level if method == 'ratio' else spot + level)
+            for expiry, level in zip(EXPIRIES[:3], levels)}
+
+    series = stitch(calendar, bars, method)
+
+    # Back-adjusted onto the current contract, the whole series is the last contract's prices
+    last = spot * levels[-1] if method == 'ratio' else spot + levels[-1]
+    in_range = (dates >= calendar['front_start'].iloc[0]) & (dates < calendar['roll_date'].iloc[-1])
+    np.testing.assert_allclose(series['close'].to_numpy(), last[in_range])
+    assert series['date'].is_monotonic_increasing and series['date'].is_unique
+    assert series['contract'].unique().tolist() == [f"ES{expiry}" for expiry in EXPIRIES[:3]]
+    unadjusted = 1.0 if method == 'ratio' else 0.0
+    assert (series.loc[series['contract'] == f"ES{EXPIRIES[2]}", 'adjustment'] == unadjusted).all()
+
+
+def test_stitch_rejects_unknown_method():
+    with pytest.raises(ValueError):
+        stitch(roll_calendar(chain_frame()), {}, method='difference')
+
+
+def test_incremental_build_fetches_only_the_front_month(tmp_path):
+    provider = FakeProvider()
+    first = ContinuousFuturesBuilder(provider, str(tmp_path), pause=0).build('ES', start='2024-01-02',
+                                                                            now='2024-05-01')
+    assert first['date'].max() < pd.Timestamp('2024-05-01')
+    assert first['contract'].iloc[-1] == 'ES20240621'
+
+    # At the same time only the front month's last (possibly partial) bar is refetched
+    provider.calls.clear()
+    rebuilt_builder = ContinuousFuturesBuilder(provider, str(tmp_path), pause=0)
+    rebuilt = rebuilt_builder.build('ES', start='2024-01-02', now='2024-05-01')
+    assert provider.calls == [('bars', '20240621', pd.Timestamp('2024-05-01'))]
+    assert (rebuilt_builder.stats['cached_contracts'], rebuilt_builder.stats['fetched_contracts']) == (1, 1)
+    pd.testing.assert_frame_equal(rebuilt, first, check_dtype=False)
+
+    # Later in the same front-month window: only that contract is requested, no chain
+    provider.calls.clear()
+    builder = ContinuousFuturesBuilder(provider, str(tmp_path), pause=0)
+    extended = builder.build('ES', start='2024-01-02', now='2024-05-20')
+    assert provider.bar_expiries() == ['20240621']
+    assert builder.stats['chain_requests'] == 0
+    assert extended['date'].max() > first['date'].max()
+    pd.testing.assert_frame_equal(extended.iloc[:len(first)], first, check_dtype=False)
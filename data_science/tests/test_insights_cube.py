@@ -0,0 +1,64 @@
+"""Incremental and rebuild paths of the materialized insights cube"""
+
+import os
+
+import pandas as pd
+import pytest
+
+import extract_trading_insights as insights
+
+
+def gap_results(outcomes, start='2024-03-04'):
+    """Gap-open result rows, one session per outcome (True: target reached at 10:00)"""
+    dates = pd.bdate_range(start, periods=len(outcomes))
+    return pd.DataFrame({
+        'date': dates.strftime('%Y-%m-%d'),
+        'gap_open_type': 'positive',
+        'target_reached': outcomes,
+        'target_time': ['10:00' if reached else '' for reached in outcomes],
+        'previous_close': 100.0,
+        'previous_atr': 1.5
+    })
+
+
+def write(path, results, bump):
+    results.to_csv(path, index=False)
+    # Keep mtimes distinct however fast the test runs
+    os.utime(path, ns=(bump * 10**9, bump * 10**9))
+
+
+@pytest.fixture
+def result_files(tmp_path, monkeypatch):
+    gap_file = tmp_path / 'gap.csv'
+    monkeypatch.setattr(insights, 'GAP_FILE', str(gap_file))
+    monkeypatch.setattr(insights, 'INTRADAY_FILE', str(tmp_path / 'intraday.csv'))
+    monkeypatch.setattr(insights, 'CUBE_FILE', str(tmp_path / 'cube.npz'))
+    return gap_file
+
+
+def test_appended_rows_are_added_past_the_watermark(result_files):
+    write(result_files, gap_results([True, False]), 1)
+    assert insights.load_insights_cube().query(scenario='gap') == {'events': 2, 'completed': 1}
+
+    write(result_files, gap_results([True, False, True]), 2)
+    assert insights.load_insights_cube().query(scenario='gap') == {'events': 3, 'completed': 2}
+
+
+def test_rewritten_history_rebuilds_the_cube(result_files):
+    write(result_files, gap_results([True, False, False]), 1)
+    assert insights.load_insights_cube().query(scenario='gap')['completed'] == 1
+
+    # Refinement flips past outcomes without adding sessions
+    write(result_files, gap_results([False, True, True]), 2)
+    assert insights.load_insights_cube().query(scenario='gap') == {'events': 3, 'completed': 2}
+
+    # Rewritten and extended at once: still counted once per session
+    write(result_files, gap_results([True, True, True, False]), 3)
+    assert insights.load_insights_cube().query(scenario='gap') == {'events': 4, 'completed': 3}
+
+
+def test_removed_source_drops_its_counts(result_files):
+    write(result_files, gap_results([True, False]), 1)
+    insights.load_insights_cube()
+    os.remove(result_files)
+    assert insights.load_insights_cube().query(scenario='gap')['events'] == 0
@@ -0,0 +1,127 @@
+"""Skip, resume and blocking behaviour of PipelineRunner"""
+
+import pytest
+
+from pipeline_dag import PipelineRunner, Stage, python_stage
+
+# Copies its input to its output, tagged; exits 1 while a fail_{name} file exists
+SCRIPT = """
+import os, sys
+name, source, target = sys.argv[1:]
+if os.path.exists(f"fail_{name}"):
+    sys.exit(1)
+text = open(source).read() if source != '-' else ''
+with open(target, 'w') as f:
+    f.write(text + name + '\\n')
+"""
+
+
+@pytest.fixture
+def workdir(tmp_path):
+    (tmp_path / 'copy.py').write_text(SCRIPT)
+    (tmp_path / 'raw.txt').write_text('raw\n')
+    return tmp_path
+
+
+def copy_stage(workdir, name, source, target, deps=(), inputs=(), outputs=None):
+    stage = python_stage(name, 'copy.py', deps=deps, inputs=inputs,
+                         outputs=[target] if outputs is None else outputs, cwd=str(workdir))
+    stage.command += [name, source, target]
+    return stage
+
+
+def make_runner(workdir, stages=None):
+    """raw.txt -> a -> b, plus c on its own"""
+    stages = stages or [
+        copy_stage(workdir, 'a', 'raw.txt', 'a.txt', inputs=['raw.txt']),
+        copy_stage(workdir, 'b', 'a.txt', 'b.txt', deps=['a']),
+        copy_stage(workdir, 'c', '-', 'c.txt'),
+    ]
+    return PipelineRunner(stages, str(workdir / 'state.json'), str(workdir / 'logs'), workers=2)
+
+
+def test_fresh_stages_are_skipped(workdir):
+    assert make_runner(workdir).run() == {'a': 'completed', 'b': 'completed', 'c': 'completed'}
+    assert (workdir / 'b.txt').read_text() == 'raw\na\nb\n'
+    assert make_runner(workdir).run() == {'a': 'skipped', 'b': 'skipped', 'c': 'skipped'}
+
+
+def test_input_change_reruns_downstream(workdir):
+    make_runner(workdir).run()
+    (workdir / 'raw.txt').write_text('raw changed\n')
+
+    assert make_runner(workdir).run() == {'a': 'completed', 'b': 'completed', 'c': 'skipped'}
+    assert (workdir / 'b.txt').read_text() == 'raw changed\na\nb\n'
+
+
+def test_forced_upstream_invalidates_dependents(workdir):
+    # a reads raw.txt without declaring it (like an ingest stage reading IBKR)
+    stages = [copy_stage(workdir, 'a', 'raw.txt', 'a.txt'), copy_stage(workdir, 'b', 'a.txt', 'b.txt', deps=['a'])]
+    make_runner(workdir, stages).run()
+    (workdir / 'raw.txt').write_text('raw changed\n')
+    assert make_runner(workdir, stages).run() == {'a': 'skipped', 'b': 'skipped'}
+
+    # Forced, a writes a new output, so b (which reads it) is stale too
+    assert make_runner(workdir, stages).run(force=['a']) == {'a': 'completed', 'b': 'completed'}
+    assert (workdir / 'b.txt').read_text() == 'raw changed\na\nb\n'
+
+
+def test_unchanged_upstream_output_keeps_dependents_fresh(workdir):
+    make_runner(workdir).run()
+    assert make_runner(workdir).run(force=['a']) == {'a': 'completed', 'b': 'skipped', 'c': 'skipped'}
+
+
+def test_failure_blocks_downstream_and_resumes(workdir):
+    (workdir / 'fail_a').write_text('')
+    assert make_runner(workdir).run() == {'a': 'failed', 'b': 'blocked', 'c': 'completed'}
+    assert not (workdir / 'b.txt').exists()
+    assert (workdir / 'logs' / 'a.log').exists()
+
+    (workdir / 'fail_a').unlink()
+    assert make_runner(workdir).run() == {'a': 'completed', 'b': 'completed', 'c': 'skipped'}
+
+
+def test_resume_skips_completed_upstream(workdir):
+    (workdir / 'fail_b').write_text('')
+    assert make_runner(workdir).run() == {'a': 'completed', 'b': 'failed', 'c': 'completed'}
+
+    (workdir / 'fail_b').unlink()
+    assert make_runner(workdir).run() == {'a': 'skipped', 'b': 'completed', 'c': 'skipped'}
+
+
+def test_targets_select_upstream_only(workdir):
+    assert make_runner(workdir).run(targets=['b']) == {'a': 'completed', 'b': 'completed'}
+    assert not (workdir / 'c.txt').exists()
+
+
+def test_excluded_stage_counts_as_done(workdir):
+    (workdir / 'a.txt').write_text('fetched elsewhere\n')
+    assert make_runner(workdir).run(exclude=['a']) == {'a': 'excluded', 'b': 'completed', 'c': 'completed'}
+    assert (workdir / 'b.txt').read_text() == 'fetched elsewhere\nb\n'
+
+
+def test_missing_outputs_fail_the_stage(workdir):
+    stages = [copy_stage(workdir, 'a', 'raw.txt', 'a.txt', outputs=['a.txt', 'never_written.txt']),
+              copy_stage(workdir, 'b', 'a.txt', 'b.txt', deps=['a'])]
+    runner = make_runner(workdir, stages)
+
+    assert runner.run() == {'a': 'failed', 'b': 'blocked'}
+    assert runner.state['stages']['a']['missing_outputs'] == ['never_written.txt']
+
+
+def test_always_run_is_never_skipped(workdir):
+    stages = [copy_stage(workdir, 'a', 'raw.txt', 'a.txt')]
+    stages[0].always_run = True
+    make_runner(workdir, stages).run()
+    assert make_runner(workdir, stages).run() == {'a': 'completed'}
+
+
+def test_dependency_cycle_is_rejected(workdir):
+    stages = [Stage('a', ['true'], deps=['b']), Stage('b', ['true'], deps=['a'])]
+    with pytest.raises(ValueError, match='cycle'):
+        make_runner(workdir, stages)
+
+
+def test_unknown_dependency_is_rejected(workdir):
+    with pytest.raises(ValueError, match='Unknown stage'):
+        make_runner(workdir, [Stage('a', ['true'], deps=['missing'])])
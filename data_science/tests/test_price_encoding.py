@@ -0,0 +1,116 @@
+"""Round trip and level-touch checks for price_encoding"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from price_encoding import (PRICE_COLUMNS, encode_bars, decode_bars, decode_cents, save_encoded,
+                            load_encoded, to_cents, touched_cents)
+
+
+def make_bars(sessions=3, bars_per_session=39, start_price=4500.0, step=0.25, seed=0):
+    """10-minute bars on a cent grid over several sessions"""
+    rng = np.random.default_rng(seed)
+    days = pd.bdate_range('2024-03-04', periods=sessions)
+    dates = [day + pd.Timedelta(hours=9, minutes=30) + pd.Timedelta(minutes=10 * i)
+             for day in days for i in range(bars_per_session)]
+    close = start_price + np.cumsum(rng.integers(-8, 9, len(dates))) * step
+    open_price = np.r_[start_price, close[:-1]]
+    high = np.maximum(open_price, close) + rng.integers(0, 5, len(dates)) * step
+    low = np.minimum(open_price, close) - rng.integers(0, 5, len(dates)) * step
+    return pd.DataFrame({'date': dates, 'open': open_price, 'high': high, 'low': low, 'close': close,
+                         'volume': rng.integers(0, 50000, len(dates)).astype(float)})
+
+
+def test_round_trip_is_exact():
+    bars = make_bars()
+    decoded = decode_bars(encode_bars(bars))
+
+    assert decoded['date'].tolist() == bars['date'].tolist()
+    for col in PRICE_COLUMNS:
+        np.testing.assert_array_equal(decoded[col].to_numpy(), bars[col].to_numpy())
+    np.testing.assert_array_equal(decoded['volume'].to_numpy(), bars['volume'].to_numpy())
+
+
+def test_round_trip_through_npz(tmp_path):
+    bars = make_bars(sessions=5)
+    path = tmp_path / 'bars.npz'
+    save_encoded(path, encode_bars(bars))
+    decoded = decode_bars(load_encoded(path))
+
+    for col in PRICE_COLUMNS:
+        np.testing.assert_array_equal(decoded[col].to_numpy(), bars[col].to_numpy())
+
+
+def test_decode_as_cents_matches_to_cents():
+    bars = make_bars()
+    cents = decode_bars(encode_bars(bars), as_cents=True)
+    for col in PRICE_COLUMNS:
+        np.testing.assert_array_equal(cents[col].to_numpy(), to_cents(bars[col]))
+
+
+def test_unsorted_input_decodes_sorted():
+    bars = make_bars()
+    decoded = decode_bars(encode_bars(bars.sample(frac=1, random_state=1)))
+    assert decoded['date'].is_monotonic_increasing
+    np.testing.assert_array_equal(decoded['close'].to_numpy(), bars['close'].to_numpy())
+
+
+def test_sessions_reset_to_their_anchor():
+    bars = make_bars(sessions=3)
+    encoded = encode_bars(bars)
+    starts = encoded['session_start'][:-1]
+
+    assert len(starts) == 3
+    np.testing.assert_array_equal(encoded['close_delta'][starts], 0)
+    np.testing.assert_array_equal(encoded['anchor'], to_cents(bars['close'].to_numpy()[starts]))
+
+
+def test_large_moves_widen_the_delta_type():
+    bars = make_bars(sessions=1, bars_per_session=4)
+    bars.loc[2, ['open', 'high', 'low', 'close']] = [4500.0, 9000.0, 4500.0, 9000.0]
+    encoded = encode_bars(bars)
+
+    assert encoded['close_delta'].dtype == np.int32
+    np.testing.assert_array_equal(decode_cents(encoded)['close'], to_cents(bars['close']))
+
+
+def test_timezone_aware_dates_round_trip():
+    bars = make_bars(sessions=2)
+    bars['date'] = bars['date'].dt.tz_localize('US/Eastern')
+    decoded = decode_bars(encode_bars(bars))
+    assert str(decoded['date'].dt.tz) == 'US/Eastern'
+    assert decoded['date'].tolist() == bars['date'].tolist()
+
+
+def test_seconds_are_rejected():
+    bars = make_bars(sessions=1, bars_per_session=3)
+    bars.loc[1, 'date'] += pd.Timedelta(seconds=30)
+    with pytest.raises(ValueError):
+        encode_bars(bars)
+
+
+def test_missing_prices_are_rejected():
+    bars = make_bars(sessions=1, bars_per_session=3)
+    bars.loc[1, 'high'] = np.nan
+    with pytest.raises(ValueError):
+        encode_bars(bars)
+
+
+@pytest.mark.parametrize('level, high, low, touched', [
+    (4.35, 435, 435, True),            # 4.35 * 100 is 434.99999999999994
+    (0.07, 7, 7, True),                # 0.07 * 100 is 7.000000000000001
+    (100.1 + 0.2, 10030, 10030, True),
+    (100.30, 10029, 10000, False),     # high one cent short
+    (100.30, 10100, 10031, False),     # low one cent above
+    (100.105, 10010, 10000, False),    # level between cents: high must reach the next cent
+    (100.105, 10011, 10010, True),
+])
+def test_touched_cents_boundaries(level, high, low, touched):
+    assert bool(touched_cents(np.array([high]), np.array([low]), level)[0]) is touched
+
+
+def test_touched_cents_is_vectorized():
+    high = np.array([10030, 10029, 10031])
+    low = np.array([10000, 10000, 10031])
+    np.testing.assert_array_equal(touched_cents(high, low, 100.30), [True, False, False])
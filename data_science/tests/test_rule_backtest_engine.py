@@ -0,0 +1,53 @@
+"""Fill prices and exit labels of the vectorized rule backtest"""
+
+import numpy as np
+import pandas as pd
+
+from session_arrays import build_session_arrays
+from rule_backtest_engine import simulate_variants
+
+
+def one_session(bars, previous_close=100.0, atr=10.0):
+    """Session arrays for one day of 10-minute (open, high, low, close) bars after a day closing at previous_close"""
+    dates = pd.date_range('2024-03-05 09:30', periods=len(bars), freq='10min')
+    intraday = pd.DataFrame(bars, columns=['open', 'high', 'low', 'close']).assign(date=dates)
+    daily = pd.DataFrame({'trade_date': ['2024-03-04', '2024-03-05'], 'close': [previous_close, np.nan],
+                          'atr': [atr, np.nan]})
+    return build_session_arrays(intraday, daily)
+
+
+def simulate(arrays, direction, entry_type, **grid):
+    grid = dict(dict(target_multiples=[0.5], stop_multiples=[np.inf], time_stops=['16:00'], costs_bps=[0.0]), **grid)
+    returns_pct, exit_reason, sessions = simulate_variants(arrays, direction, entry_type, **grid)
+    return returns_pct[0, 0, 0, 0, 0], exit_reason[0, 0, 0, 0]
+
+
+def test_gap_open_beyond_target_fills_at_entry():
+    # Opens at 108, past the 105 target (previous close 100 + 0.5 ATR)
+    arrays = one_session([(108, 109, 107, 108), (108, 108.5, 106, 107)])
+    returns_pct, reason = simulate(arrays, 'positive', 'gap_open')
+    assert reason == 'target'
+    assert returns_pct == 0.0
+
+
+def test_short_gap_open_beyond_target_fills_at_entry():
+    arrays = one_session([(92, 93, 91, 92), (92, 94, 91.5, 93)])
+    returns_pct, reason = simulate(arrays, 'negative', 'gap_open')
+    assert reason == 'target'
+    assert returns_pct == 0.0
+
+
+def test_trigger_bar_opening_beyond_target_fills_at_entry():
+    # Trigger bar opens at 106, beyond both the 103.82 trigger level and the 105 target
+    arrays = one_session([(100, 101, 99, 100), (106, 107, 105.5, 106), (106, 106.5, 104, 105)])
+    returns_pct, reason = simulate(arrays, 'positive', 'trigger')
+    assert reason == 'target'
+    assert returns_pct == 0.0
+
+
+def test_target_below_entry_still_books_the_target():
+    # Gap open at 104 (past the trigger), target 105 reached on the next bar
+    arrays = one_session([(104, 104.5, 103.9, 104.2), (104.2, 105.5, 104, 105)])
+    returns_pct, reason = simulate(arrays, 'positive', 'gap_open')
+    assert reason == 'target'
+    np.testing.assert_allclose(returns_pct, (105 - 104) / 104 * 100)
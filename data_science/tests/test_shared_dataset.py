@@ -0,0 +1,51 @@
+"""Publishing bar arrays in shared memory and the pool that reads them"""
+
+import numpy as np
+import pandas as pd
+
+from shared_dataset import SharedDataset, attach, bar_arrays
+from bootstrap_confidence_intervals import calculate_daily_scenario_flags, rate_confidence_intervals, \
+    yearly_rate_confidence_intervals
+
+
+def daily_bars(days=800, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, days))
+    open_price = close + rng.normal(0, 0.5, days)
+    return pd.DataFrame({'date': pd.bdate_range('2021-01-04', periods=days), 'open': open_price,
+                         'high': np.maximum(open_price, close) + rng.uniform(0, 1, days),
+                         'low': np.minimum(open_price, close) - rng.uniform(0, 1, days),
+                         'close': close, 'atr': rng.uniform(1, 2, days)})
+
+
+def test_bar_arrays_index_sessions():
+    dates = pd.to_datetime(['2024-03-04 09:30', '2024-03-04 09:40', '2024-03-05 09:30'])
+    bars = pd.DataFrame({'date': dates, 'open': 1.0, 'high': 2.0, 'low': 0.5, 'close': 1.5})
+    arrays = bar_arrays(bars, atr=[3.0, 4.0])
+
+    np.testing.assert_array_equal(arrays['session_start'], [0, 2, 3])
+    assert arrays['session_date'].view('datetime64[ns]').astype('datetime64[D]').astype(str).tolist() == \
+        ['2024-03-04', '2024-03-05']
+    np.testing.assert_array_equal(arrays['date'].view('datetime64[ns]'), dates.to_numpy())
+    assert 'volume' not in arrays
+    np.testing.assert_array_equal(arrays['atr'], [3.0, 4.0])
+
+
+def test_attached_views_match_and_are_read_only():
+    arrays = bar_arrays(daily_bars(50), atr=np.arange(50.0))
+    with SharedDataset(arrays) as dataset:
+        views = attach(dataset.handle)
+        for name, values in arrays.items():
+            np.testing.assert_array_equal(views[name], values)
+            assert not views[name].flags.writeable
+
+
+def test_yearly_pool_matches_grouping_flags_by_year():
+    data = daily_bars()
+    args = dict(n_resamples=200, block_length=3, seed=7)
+    flags = calculate_daily_scenario_flags(data)
+    expected = [{'year': year, 'total_days': len(year_flags), **rate_confidence_intervals(year_flags, workers=1, **args)}
+                for year, year_flags in flags.groupby('year')]
+
+    assert yearly_rate_confidence_intervals(data, workers=1, **args) == expected
+    assert yearly_rate_confidence_intervals(data, workers=2, **args) == expected
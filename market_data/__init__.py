@@ -0,0 +1,7 @@
+"""
+Market Data - Modules Shared by the Root and Data Science Pipelines
+IBKR access (ibkr_provider), bar processing (bar_processing), stage
+instrumentation (instrumentation) and logging setup (logging_config). Entry
+points put the repository root on sys.path and import them as
+market_data.<module>.
+"""
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Bar Processing Engine - One Schema for Both StockDataPipeline Variants
+Turns raw IBKR bars (util.df output) into the processed layout with compact
+dtypes:
+
+- date: datetime64 (int64 epoch time, timezone kept) instead of strings
+- symbol: categorical (one code byte per row)
+- prices, average and derived columns: float32
+- volume: int64, index/barCount: int32
+
+Each output column is built once from the raw NumPy arrays and the frame is
+assembled in one step, so there are no rename/reset_index/re-selection
+copies. Derived columns are computed in one reused float64 scratch buffer.
+
+Float32 keeps every 2-decimal price exact through CSV round-trips below
+FLOAT32_CENT_LIMIT; larger prices are kept as float64 automatically.
+"""
+
+import numpy as np
+import pandas as pd
+
+PRICE_COLUMNS = ['open', 'high', 'low', 'close']
+DERIVED_COLUMNS = ['daily_range', 'daily_change', 'daily_change_pct']
+
+# Column order of every processed CSV; optional raw columns are skipped when absent
+PROCESSED_COLUMNS = ['date', 'symbol', 'open', 'high', 'low', 'close', 'volume',
+                     'daily_range', 'daily_change', 'daily_change_pct', 'index', 'average', 'barCount']
+
+BAR_SCHEMA = {
+    'date': 'datetime64',
+    'symbol': 'category',
+    'open': 'float32',
+    'high': 'float32',
+    'low': 'float32',
+    'close': 'float32',
+    'volume': 'int64',
+    'daily_range': 'float32',
+    'daily_change': 'float32',
+    'daily_change_pct': 'float32',
+    'index': 'int32',
+    'average': 'float32',
+    'barCount': 'int32'
+}
+
+REQUIRED_COLUMNS = ['date'] + PRICE_COLUMNS
+
+# float32 resolves 0.01 below 2**17, so cent prices print and parse back unchanged
+FLOAT32_CENT_LIMIT = 2 ** 17
+
+
+def _as_float64(values):
+    return np.asarray(values, dtype=np.float64)
+
+
+def _compact_float(scratch, dtype, decimals=None):
+    """Copy the scratch buffer out as dtype, rounding (optionally) in float64 first"""
+    if decimals is not None:
+        return np.round(scratch, decimals).astype(dtype, copy=False)
+    return scratch.astype(dtype)
+
+
+def _integer_column(values, dtype):
+    """Cast to dtype when every value is a whole number, otherwise keep float64"""
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.integer):
+        return values.astype(dtype, copy=False)
+    values = values.astype(np.float64, copy=False)
+    if np.isfinite(values).all() and (values == np.floor(values)).all():
+        return values.astype(dtype)
+    return values
+
+
+def price_dtype_for(prices, price_dtype='float32'):
+    """float32 unless the largest price would lose cent resolution"""
+    if np.dtype(price_dtype) == np.float32 and len(prices) and np.nanmax(np.abs(prices)) >= FLOAT32_CENT_LIMIT:
+        return np.float64
+    return np.dtype(price_dtype)
+
+
+def process_bars(raw, symbol, decimals=None, price_dtype='float32'):
+    """
+    Process raw IBKR bars into the compact processed layout
+
+    Args:
+        raw (pd.DataFrame): Bars with date, open, high, low, close and optionally
+                            volume, average and barCount
+        symbol (str): Symbol stored in the categorical 'symbol' column
+        decimals (int): Round prices and derived columns to this many decimals (None = no rounding)
+        price_dtype (str): Storage dtype for prices and derived columns ('float32' or 'float64')
+
+    Returns:
+        pd.DataFrame: PROCESSED_COLUMNS (minus absent optional columns) with BAR_SCHEMA dtypes,
+                      or None for empty input
+    """
+    if raw is None or raw.empty:
+        return None
+    if 'date' not in raw.columns and raw.index.name == 'date':
+        raw = raw.reset_index()
+    missing = [col for col in REQUIRED_COLUMNS if col not in raw.columns]
+    if missing:
+        raise KeyError(f"Raw bars are missing columns: {', '.join(missing)}")
+
+    n = len(raw)
+    prices = {col: _as_float64(raw[col]) for col in PRICE_COLUMNS}
+    if decimals is not None:
+        prices = {col: np.round(values, decimals) for col, values in prices.items()}
+    dtype = price_dtype_for(prices['high'], price_dtype)
+
+    columns = {}
+    date = raw['date']
+    columns['date'] = date.to_numpy() if pd.api.types.is_datetime64_any_dtype(date) and date.dt.tz is None \
+        else pd.to_datetime(date).array
+    columns['symbol'] = pd.Categorical.from_codes(np.zeros(n, dtype=np.int8), categories=[symbol])
+    for col in PRICE_COLUMNS:
+        columns[col] = prices[col].astype(dtype, copy=False)
+    if 'volume' in raw.columns:
+        columns['volume'] = _integer_column(raw['volume'].to_numpy(), np.int64)
+
+    # Derived columns share one float64 scratch buffer before being stored compactly
+    scratch = np.empty(n, dtype=np.float64)
+    np.subtract(prices['high'], prices['low'], out=scratch)
+    columns['daily_range'] = _compact_float(scratch, dtype, decimals)
+    np.subtract(prices['close'], prices['open'], out=scratch)
+    columns['daily_change'] = _compact_float(scratch, dtype, decimals)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(scratch, prices['open'], out=scratch)
+    np.multiply(scratch, 100, out=scratch)
+    columns['daily_change_pct'] = _compact_float(scratch, dtype, decimals)
+
+    columns['index'] = np.arange(n, dtype=np.int32)
+    if 'average' in raw.columns:
+        columns['average'] = _as_float64(raw['average']).astype(dtype, copy=False)
+    if 'barCount' in raw.columns:
+        columns['barCount'] = _integer_column(raw['barCount'].to_numpy(), np.int32)
+
+    return pd.DataFrame(columns, columns=[col for col in PROCESSED_COLUMNS if col in columns], copy=False)
+
+
+def frame_memory_mb(frame):
+    """Deep memory footprint of a frame in MB"""
+    return frame.memory_usage(deep=True).sum() / 1024 ** 2
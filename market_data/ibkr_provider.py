@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+IBKR Data Provider - Lazy ib_insync Import and Deferred Connection
+The only module that touches ib_insync. Nothing is imported or connected when
+a provider is created; ib_insync is imported on first use and the gateway is
+connected on the first request, so processing, storage and analysis code can
+import the pipelines on workers without ib_insync or a running TWS/Gateway.
+"""
+
+import logging
+
+from .instrumentation import span
+
+logger = logging.getLogger(__name__)
+
+_ib_insync = None
+
+# Index symbols and their listing exchange; everything else not a futures root is a stock
+INDEX_EXCHANGES = {'SPX': 'CBOE', 'NDX': 'NASDAQ'}
+
+# Futures roots (quarterly E-minis) and their exchange
+FUTURE_EXCHANGES = {'ES': 'CME', 'NQ': 'CME'}
+
+
+def load_ib_insync():
+    """Import ib_insync on first use (cached)"""
+    global _ib_insync
+    if _ib_insync is None:
+        try:
+            import ib_insync
+        except ImportError as e:
+            raise ImportError("ib_insync not installed. Install with: pip install ib_insync") from e
+        _ib_insync = ib_insync
+    return _ib_insync
+
+
+def ib_insync_available():
+    """True if ib_insync can be imported (without raising)"""
+    try:
+        load_ib_insync()
+        return True
+    except ImportError:
+        return False
+
+
+class IBKRProvider:
+    """
+    Historical bars from TWS/IB Gateway
+
+    Args:
+        host (str): TWS/Gateway host
+        port (int): TWS (7496) or Gateway (7497) port
+        client_id (int): API client id
+    """
+
+    def __init__(self, host='127.0.0.1', port=7496, client_id=1):
+        self.host = host
+        self.port = port
+        self.client_id = client_id
+        self._ib = None
+
+    @property
+    def ib(self):
+        """ib_insync.IB instance, created on first access"""
+        if self._ib is None:
+            self._ib = load_ib_insync().IB()
+        return self._ib
+
+    @property
+    def connected(self):
+        return self._ib is not None and self._ib.isConnected()
+
+    def connect(self):
+        """Connect if not already connected (exceptions propagate to the caller)"""
+        if not self.connected:
+            with span('connect'):
+                self.ib.connect(self.host, self.port, clientId=self.client_id)
+            logger.info("Connected to IBKR at %s:%s", self.host, self.port)
+        return self.ib
+
+    def disconnect(self):
+        if self.connected:
+            self._ib.disconnect()
+            logger.info("Disconnected from IBKR")
+
+    def contract(self, symbol, expiry=None):
+        """
+        Contract for a stock, index or futures symbol
+
+        Indices (INDEX_EXCHANGES) resolve to Index contracts and everything else
+        that is not a futures root to a SMART-routed Stock. A futures root
+        (FUTURE_EXCHANGES) resolves to the contract expiring in `expiry`
+        (YYYYMM or YYYYMMDD, expired contracts included) or, without an expiry,
+        to IBKR's continuous contract, which only serves recent unadjusted
+        history - continuous_futures builds long back-adjusted series.
+        """
+        ib_insync = load_ib_insync()
+        if symbol in INDEX_EXCHANGES:
+            return ib_insync.Index(symbol, INDEX_EXCHANGES[symbol], 'USD')
+        if symbol in FUTURE_EXCHANGES:
+            if expiry is None:
+                return ib_insync.ContFuture(symbol, FUTURE_EXCHANGES[symbol], currency='USD')
+            return ib_insync.Future(symbol, str(expiry), FUTURE_EXCHANGES[symbol], currency='USD',
+                                    includeExpired=True)
+        return ib_insync.Stock(symbol, 'SMART', 'USD')
+
+    def contract_chain(self, symbol):
+        """
+        Every contract of a futures root IBKR still lists, expired ones included,
+        in one contract-details request
+
+        Returns:
+            list: Dicts (local_symbol, expiry YYYYMMDD, con_id, multiplier) sorted by expiry
+        """
+        if symbol not in FUTURE_EXCHANGES:
+            raise ValueError(f"{symbol} is not a futures root ({', '.join(FUTURE_EXCHANGES)})")
+        self.connect()
+        template = load_ib_insync().Future(symbol, exchange=FUTURE_EXCHANGES[symbol], currency='USD',
+                                           includeExpired=True)
+        with span('contract_chain', symbol=symbol):
+            details = self.ib.reqContractDetails(template)
+        chain = [{
+            'local_symbol': detail.contract.localSymbol,
+            'expiry': detail.contract.lastTradeDateOrContractMonth[:8],
+            'con_id': detail.contract.conId,
+            'multiplier': detail.contract.multiplier
+        } for detail in details]
+        return sorted(chain, key=lambda contract: contract['expiry'])
+
+    def qualify(self, contract):
+        """Qualified contract, or None if IBKR cannot resolve it"""
+        self.connect()
+        with span('qualify', symbol=contract.symbol):
+            qualified = self.ib.qualifyContracts(contract)
+        return qualified[0] if qualified else None
+
+    def historical_bars(self, contract, duration, bar_size, end_date='', use_rth=True):
+        """
+        Request historical TRADES bars
+
+        Returns:
+            pd.DataFrame: Raw IBKR bars (date, open, high, low, close, volume,
+                          average, barCount), or None if nothing was returned
+        """
+        self.connect()
+        with span('fetch', symbol=contract.symbol):
+            bars = self.ib.reqHistoricalData(
+                contract,
+                endDateTime=end_date,
+                durationStr=duration,
+                barSizeSetting=bar_size,
+                whatToShow='TRADES',
+                useRTH=use_rth,
+                formatDate=1
+            )
+        if not bars:
+            return None
+        return load_ib_insync().util.df(bars)
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Run Instrumentation - Stage Spans, Counters and Histograms
+Lightweight timing for the data pipelines and analysis scripts:
+
+- span(stage): context manager timing one stage (fetch, qualify, process,
+  save, load, atr, analyze, export) into the stage_seconds histogram
+- increment(name, value): monotonically increasing counters (rows, bars, errors)
+- observe(name, value): histograms of arbitrary values
+
+Instrumentation is disabled by default: span() then returns a shared no-op
+context and increment()/observe() return after one flag check. Enable it with
+enable() or by pointing GOLDEN_GATE_METRICS at an output file; the snapshot is
+then written there at interpreter exit as JSON (.json) or Prometheus text
+(.prom / .txt), so nightly runs can be compared stage by stage.
+
+    GOLDEN_GATE_METRICS=data/benchmarks/nightly_metrics.json python enhanced_golden_gate_analysis.py
+"""
+
+import os
+import re
+import json
+import time
+import atexit
+import threading
+import functools
+from datetime import datetime
+
+METRICS_ENV_VAR = 'GOLDEN_GATE_METRICS'
+METRIC_PREFIX = 'golden_gate'
+
+# Seconds; covers sub-millisecond array kernels up to multi-minute IBKR fetches
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+
+
+class _Histogram:
+    """Fixed-bucket histogram with count, sum, min and max"""
+    __slots__ = ('buckets', 'counts', 'count', 'sum', 'min', 'max')
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.min = float('inf')
+        self.max = float('-inf')
+
+    def add(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def cumulative(self):
+        total = 0
+        cumulative = []
+        for count in self.counts:
+            total += count
+            cumulative.append(total)
+        return cumulative
+
+
+class _Span:
+    """Times one stage; failures are also counted in stage_errors"""
+    __slots__ = ('metrics', 'labels', 'start')
+
+    def __init__(self, metrics, labels):
+        self.metrics = metrics
+        self.labels = labels
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        self.metrics._observe('stage_seconds', elapsed, DEFAULT_BUCKETS, self.labels)
+        if exc_type is not None:
+            self.metrics._increment('stage_errors', 1, self.labels)
+        return False
+
+
+class _NullSpan:
+    """Shared no-op span returned while instrumentation is disabled"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def _label_key(labels):
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+class Metrics:
+    """
+    Thread-safe registry of counters and histograms
+
+    The module-level functions operate on a shared default instance; separate
+    instances are only needed to keep measurements apart (e.g. in benchmarks).
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.started_at = datetime.now()
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+
+    def span(self, stage, **labels):
+        """Context manager timing one stage (no-op while disabled)"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, _label_key({'stage': stage, **labels}))
+
+    def increment(self, name, value=1, **labels):
+        """Add value to a counter"""
+        if self.enabled:
+            self._increment(name, value, _label_key(labels))
+
+    def observe(self, name, value, buckets=DEFAULT_BUCKETS, **labels):
+        """Record one value in a histogram (buckets are fixed on first use)"""
+        if self.enabled:
+            self._observe(name, value, buckets, _label_key(labels))
+
+    def _increment(self, name, value, label_key):
+        with self._lock:
+            key = (name, label_key)
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def _observe(self, name, value, buckets, label_key):
+        with self._lock:
+            key = (name, label_key)
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram(buckets)
+            histogram.add(value)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+        self.started_at = datetime.now()
+
+    def snapshot(self):
+        """
+        Current metrics as plain data
+
+        Returns:
+            dict: started_at, generated_at, counters and histograms (with
+                  cumulative bucket counts keyed by upper bound)
+        """
+        with self._lock:
+            counters = [{'name': name, 'labels': dict(labels), 'value': value}
+                        for (name, labels), value in sorted(self._counters.items())]
+            histograms = []
+            for (name, labels), histogram in sorted(self._histograms.items()):
+                histograms.append({
+                    'name': name,
+                    'labels': dict(labels),
+                    'count': histogram.count,
+                    'sum': histogram.sum,
+                    'mean': histogram.sum / histogram.count if histogram.count else 0,
+                    'min': histogram.min if histogram.count else None,
+                    'max': histogram.max if histogram.count else None,
+                    'buckets': {str(bound): total for bound, total in zip(histogram.buckets, histogram.cumulative())}
+                })
+        return {
+            'started_at': self.started_at.strftime('%Y-%m-%d %H:%M:%S'),
+            'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'counters': counters,
+            'histograms': histograms
+        }
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self):
+        """Snapshot in the Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines = []
+        typed = set()
+        for counter in snapshot['counters']:
+            name = f"{_metric_name(counter['name'])}_total"
+            if name not in typed:
+                lines.append(f"# TYPE {name} counter")
+                typed.add(name)
+            lines.append(f"{name}{_format_labels(counter['labels'])} {counter['value']}")
+        for histogram in snapshot['histograms']:
+            name = _metric_name(histogram['name'])
+            if name not in typed:
+                lines.append(f"# TYPE {name} histogram")
+                typed.add(name)
+            for bound, total in histogram['buckets'].items():
+                lines.append(f"{name}_bucket{_format_labels({**histogram['labels'], 'le': bound})} {total}")
+            lines.append(f"{name}_bucket{_format_labels({**histogram['labels'], 'le': '+Inf'})} {histogram['count']}")
+            lines.append(f"{name}_sum{_format_labels(histogram['labels'])} {histogram['sum']}")
+            lines.append(f"{name}_count{_format_labels(histogram['labels'])} {histogram['count']}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Write the snapshot to path (Prometheus text for .prom/.txt, JSON otherwise)"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        text = self.to_prometheus() if path.endswith(('.prom', '.txt')) else self.to_json()
+        with open(path, 'w') as f:
+            f.write(text)
+        return path
+
+
+def _metric_name(name):
+    return f"{METRIC_PREFIX}_{re.sub(r'[^a-zA-Z0-9_]', '_', name)}"
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = {key: str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for key, value in labels.items()}
+    return '{' + ','.join(f'{key}="{value}"' for key, value in escaped.items()) + '}'
+
+
+METRICS = Metrics()
+
+
+def enable():
+    METRICS.enabled = True
+
+
+def disable():
+    METRICS.enabled = False
+
+
+def is_enabled():
+    return METRICS.enabled
+
+
+def span(stage, **labels):
+    """Time a stage of the default registry: with span('fetch', symbol='SPY'): ..."""
+    return METRICS.span(stage, **labels)
+
+
+def timed(stage, **labels):
+    """Decorator form of span() for whole functions"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with METRICS.span(stage, **labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def increment(name, value=1, **labels):
+    METRICS.increment(name, value, **labels)
+
+
+def observe(name, value, buckets=DEFAULT_BUCKETS, **labels):
+    METRICS.observe(name, value, buckets, **labels)
+
+
+def snapshot():
+    return METRICS.snapshot()
+
+
+def write_snapshot(path=None):
+    """Write the default registry's snapshot (defaults to $GOLDEN_GATE_METRICS)"""
+    path = path or os.environ.get(METRICS_ENV_VAR)
+    if path:
+        return METRICS.write(path)
+    return None
+
+
+def _configure_from_environment():
+    if os.environ.get(METRICS_ENV_VAR):
+        enable()
+        atexit.register(write_snapshot)
+
+
+_configure_from_environment()
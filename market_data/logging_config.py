@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Logging Configuration - Queue-Based, Configured by Entry Points
+Library modules only create loggers (logging.getLogger(__name__)) and log with
+lazy %-style arguments plus structured fields in `extra`:
+
+    logger.info("Fetched %d records for %s", len(df), symbol, extra={'symbol': symbol, 'rows': len(df)})
+
+Scripts call setup_logging() once in main(). Records are put on an in-memory
+queue by the calling thread and formatted and written (file, console) by a
+background listener thread, so disk I/O never blocks the IBKR fetch loop or an
+analysis loop. Nothing is configured at import time.
+"""
+
+import os
+import json
+import queue
+import atexit
+import logging
+import logging.handlers
+
+DEFAULT_FORMAT = '%(asctime)s - %(levelname)s - %(name)s - %(message)s'
+
+# Attributes every LogRecord has; anything else came from `extra`
+_STANDARD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime', 'taskName'}
+
+_listener = None
+_queue_handler = None
+
+
+def structured_fields(record):
+    """Fields passed through `extra` on one record"""
+    return {key: value for key, value in vars(record).items() if key not in _STANDARD_ATTRIBUTES}
+
+
+class StructuredFormatter(logging.Formatter):
+    """Standard text format with `extra` fields appended as key=value pairs"""
+
+    def format(self, record):
+        text = super().format(record)
+        fields = structured_fields(record)
+        if fields:
+            text += ' | ' + ' '.join(f"{key}={value}" for key, value in fields.items())
+        return text
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with the `extra` fields as top-level keys"""
+
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            **structured_fields(record)
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that leaves formatting to the listener thread
+
+    The stock prepare() renders the message in the caller's thread; here the
+    record is queued as-is, so %-style arguments are only merged when written.
+    Arguments must therefore not be mutated after the logging call.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+def setup_logging(log_file=None, level=logging.INFO, console=True, json_format=False, fmt=DEFAULT_FORMAT):
+    """
+    Route all logging through a queue to a background writer thread
+
+    Calling it again replaces the previous configuration.
+
+    Args:
+        log_file (str): File to append to (its directory is created); None for no file
+        level (int): Root logger level
+        console (bool): Also write to stderr
+        json_format (bool): Write JSON lines instead of text
+        fmt (str): Text format (ignored for JSON)
+
+    Returns:
+        logging.handlers.QueueListener: The running listener
+    """
+    global _listener, _queue_handler
+    stop_logging()
+
+    formatter = JsonFormatter() if json_format else StructuredFormatter(fmt)
+    handlers = []
+    if log_file:
+        log_dir = os.path.dirname(log_file)
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+        handlers.append(logging.FileHandler(log_file))
+    if console:
+        handlers.append(logging.StreamHandler())
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    _queue_handler = _DeferredQueueHandler(log_queue)
+    root = logging.getLogger()
+    root.addHandler(_queue_handler)
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def stop_logging():
+    """Flush queued records, stop the writer thread and detach the queue handler"""
+    global _listener, _queue_handler
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+
+
+atexit.register(stop_logging)
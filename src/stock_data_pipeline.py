@@ -5,27 +5,23 @@ Uses Interactive Brokers API exclusively for institutional-grade data
 """
 
 import pandas as pd
+import sys
 import os
 from datetime import datetime, timedelta
 import logging
 
-# IBKR imports
-try:
-    from ib_insync import IB, Stock, util
-    IBKR_AVAILABLE = True
-except ImportError:
-    IBKR_AVAILABLE = False
-    raise ImportError("ib_insync not installed. Install with: pip install ib_insync")
+# Add the repository root (shared market_data package) to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('data/logs/stock_pipeline.log'),
-        logging.StreamHandler()
-    ]
-)
+# Stage timing, logging setup, IBKR access and bar processing shared with the data science scripts
+from market_data.instrumentation import timed, increment
+from market_data.logging_config import setup_logging
+# ib_insync is only imported by the provider, on the first IBKR request
+from market_data.ibkr_provider import IBKRProvider
+from market_data.bar_processing import process_bars
+
+# Handlers are installed by the entry point (see main()), not at import time
+logger = logging.getLogger(__name__)
 
 class StockDataPipeline:
     # Allowed tickers
@@ -51,7 +47,7 @@ class StockDataPipeline:
         'NVDA': 'NVIDIA Corporation'
     }
     
-    def __init__(self, output_dir="data/ticker_data", ibkr_host='127.0.0.1', ibkr_port=7497):
+    def __init__(self, output_dir="data/ticker_data", ibkr_host='127.0.0.1', ibkr_port=7497, client_id=1):
         """
         Initialize the IBKR stock data pipeline
         
@@ -59,21 +55,29 @@ class StockDataPipeline:
             output_dir (str): Directory to save CSV files
             ibkr_host (str): IBKR Gateway/TWS host (default: localhost)
             ibkr_port (int): IBKR Gateway (7497) or TWS (7496) port
+            client_id (int): API client id (distinct per concurrent connection)
         """
         self.output_dir = output_dir
         self.ibkr_host = ibkr_host
         self.ibkr_port = ibkr_port
-        self.ib = None
-        self.ibkr_connected = False
+        self.provider = IBKRProvider(ibkr_host, ibkr_port, client_id=client_id)
         
         self.ensure_output_directory()
-        logging.info("IBKR Stock Data Pipeline initialized")
+        logger.info("IBKR Stock Data Pipeline initialized")
+    
+    @property
+    def ib(self):
+        return self.provider.ib
+    
+    @property
+    def ibkr_connected(self):
+        return self.provider.connected
         
     def ensure_output_directory(self):
         """Create output directory if it doesn't exist"""
         if not os.path.exists(self.output_dir):
             os.makedirs(self.output_dir)
-            logging.info(f"Created output directory: {self.output_dir}")
+            logger.info("Created output directory: %s", self.output_dir)
         
         # Create logs directory
         logs_dir = "data/logs"
@@ -101,39 +105,32 @@ class StockDataPipeline:
         """
         if symbol.upper() not in self.ALLOWED_TICKERS:
             allowed_list = ', '.join(self.ALLOWED_TICKERS.keys())
-            logging.error(f"Ticker '{symbol}' not allowed. Allowed tickers: {allowed_list}")
+            logger.error("Ticker '%s' not allowed. Allowed tickers: %s", symbol, allowed_list)
             return False
         return True
     
     def connect_ibkr(self):
         """Connect to IBKR Gateway/TWS"""
         try:
-            if self.ib is None:
-                self.ib = IB()
-            
             if not self.ibkr_connected:
-                self.ib.connect(self.ibkr_host, self.ibkr_port, clientId=1)
-                self.ibkr_connected = True
-                logging.info(f"✅ Connected to IBKR at {self.ibkr_host}:{self.ibkr_port}")
+                self.provider.connect()
+                logger.info("✅ Connected to IBKR at %s:%s", self.ibkr_host, self.ibkr_port)
             return True
         except Exception as e:
-            logging.error(f"❌ Failed to connect to IBKR: {e}")
-            logging.error("SETUP REQUIRED:")
-            logging.error("1. Download and install IB Gateway or TWS")
-            logging.error("2. Start IB Gateway (port 7497) or TWS (port 7496)")
-            logging.error("3. Enable API connections in settings")
-            logging.error("4. Make sure your IBKR account has market data permissions")
+            logger.error("❌ Failed to connect to IBKR: %s", e)
+            logger.error("SETUP REQUIRED:")
+            logger.error("1. Download and install IB Gateway or TWS")
+            logger.error("2. Start IB Gateway (port 7497) or TWS (port 7496)")
+            logger.error("3. Enable API connections in settings")
+            logger.error("4. Make sure your IBKR account has market data permissions")
             return False
     
     def disconnect_ibkr(self):
         """Disconnect from IBKR"""
-        if self.ib and self.ibkr_connected:
-            try:
-                self.ib.disconnect()
-                self.ibkr_connected = False
-                logging.info("Disconnected from IBKR")
-            except:
-                pass
+        try:
+            self.provider.disconnect()
+        except:
+            pass
     
     def fetch_historical_data(self, symbol, duration='2 Y', bar_size='1 day'):
         """
@@ -158,47 +155,35 @@ class StockDataPipeline:
         try:
             symbol_upper = symbol.upper()
             ticker_name = self.ALLOWED_TICKERS[symbol_upper]
-            logging.info(f"Fetching {duration} of {symbol_upper} ({ticker_name}) data...")
+            logger.info("Fetching %s of %s (%s) data...", duration, symbol_upper, ticker_name)
             
-            # Create stock contract
-            stock = Stock(symbol_upper, 'SMART', 'USD')
-            
-            # Qualify the contract
-            qualified_contracts = self.ib.qualifyContracts(stock)
-            if not qualified_contracts:
-                logging.error(f"Could not qualify contract for {symbol_upper}")
+            # Create and qualify the contract
+            contract = self.provider.qualify(self.provider.contract(symbol_upper))
+            if contract is None:
+                logger.error("Could not qualify contract for %s", symbol_upper)
                 return None
             
-            contract = qualified_contracts[0]
-            logging.info(f"Qualified contract: {contract}")
+            logger.info("Qualified contract: %s", contract)
             
-            # Request historical data
-            bars = self.ib.reqHistoricalData(
-                contract,
-                endDateTime='',
-                durationStr=duration,
-                barSizeSetting=bar_size,
-                whatToShow='TRADES',
-                useRTH=True,  # Regular trading hours only
-                formatDate=1
-            )
+            # Request historical data (regular trading hours only)
+            df = self.provider.historical_bars(contract, duration, bar_size, use_rth=True)
             
-            if not bars:
-                logging.error(f"No data received for {symbol_upper}")
+            if df is None:
+                logger.error("No data received for %s", symbol_upper)
                 return None
             
-            # Convert to DataFrame
-            df = util.df(bars)
-            
             if df.empty:
-                logging.error(f"Empty dataframe received for {symbol_upper}")
+                logger.error("Empty dataframe received for %s", symbol_upper)
                 return None
             
-            logging.info(f"✅ Successfully fetched {len(df)} records from IBKR for {symbol_upper}")
+            increment('rows_fetched', len(df), symbol=symbol_upper)
+            logger.info("✅ Successfully fetched %d records from IBKR for %s", len(df), symbol_upper,
+                        extra={'symbol': symbol_upper, 'rows': len(df), 'bar_size': bar_size})
             return df
             
         except Exception as e:
-            logging.error(f"Error fetching IBKR data for {symbol}: {e}")
+            increment('errors', stage='fetch', symbol=symbol.upper())
+            logger.error("Error fetching IBKR data for %s: %s", symbol, e)
             return None
     
     def fetch_data_by_date_range(self, symbol, start_date, end_date, bar_size='1 day'):
@@ -225,7 +210,7 @@ class StockDataPipeline:
             duration_years = duration_days / 365.25
             duration = f"{duration_years:.1f} Y"
         
-        logging.info(f"Fetching {symbol} data from {start_date} to {end_date} (duration: {duration})")
+        logger.info("Fetching %s data from %s to %s (duration: %s)", symbol, start_date, end_date, duration)
         return self.fetch_historical_data(symbol, duration, bar_size)
     
     def fetch_data_by_year(self, symbol, year, bar_size='1 day'):
@@ -245,13 +230,14 @@ class StockDataPipeline:
             start_date = f"{year}-01-01"
             end_date = f"{year}-12-31"
             
-            logging.info(f"Fetching {symbol} data for year {year}...")
+            logger.info("Fetching %s data for year %s...", symbol, year)
             return self.fetch_data_by_date_range(symbol, start_date, end_date, bar_size)
             
         except ValueError:
-            logging.error(f"Invalid year format: {year}")
+            logger.error("Invalid year format: %s", year)
             return None
     
+    @timed('process')
     def process_data(self, data, symbol):
         """
         Process and clean the raw stock data from IBKR
@@ -267,55 +253,20 @@ class StockDataPipeline:
             return None
             
         try:
-            # Reset index to make Date a column
-            processed_data = data.reset_index()
-            
-            # Rename columns for consistency
-            column_mapping = {
-                'date': 'date',
-                'open': 'open',
-                'high': 'high',
-                'low': 'low',
-                'close': 'close',
-                'volume': 'volume'
-            }
+            # Compact schema shared with the data_science pipeline, prices rounded to cents
+            processed_data = process_bars(data, symbol.upper(), decimals=2)
             
-            # Only rename columns that exist
-            existing_columns = {k: v for k, v in column_mapping.items() if k in processed_data.columns}
-            processed_data = processed_data.rename(columns=existing_columns)
-            
-            # Add symbol column
-            processed_data['symbol'] = symbol.upper()
-            
-            # Ensure date column is datetime
-            if 'date' in processed_data.columns:
-                processed_data['date'] = pd.to_datetime(processed_data['date'])
-            
-            # Round price columns to 2 decimal places
-            price_columns = ['open', 'high', 'low', 'close']
-            for col in price_columns:
-                if col in processed_data.columns:
-                    processed_data[col] = processed_data[col].round(2)
-            
-            # Add additional calculated fields
-            if all(col in processed_data.columns for col in ['high', 'low', 'close', 'open']):
-                processed_data['daily_range'] = (processed_data['high'] - processed_data['low']).round(2)
-                processed_data['daily_change'] = (processed_data['close'] - processed_data['open']).round(2)
-                processed_data['daily_change_pct'] = ((processed_data['close'] - processed_data['open']) / processed_data['open'] * 100).round(2)
-            
-            # Reorder columns for better readability
-            column_order = ['date', 'symbol', 'open', 'high', 'low', 'close', 'volume', 'daily_range', 'daily_change', 'daily_change_pct']
-            available_columns = [col for col in column_order if col in processed_data.columns]
-            other_columns = [col for col in processed_data.columns if col not in column_order]
-            processed_data = processed_data[available_columns + other_columns]
-            
-            logging.info(f"Data processing completed successfully for {symbol.upper()}")
+            increment('rows_processed', len(processed_data), symbol=symbol.upper())
+            logger.info("Data processing completed successfully for %s", symbol.upper(),
+                        extra={'symbol': symbol.upper(), 'rows': len(processed_data)})
             return processed_data
             
         except Exception as e:
-            logging.error(f"Error processing data for {symbol}: {str(e)}")
+            increment('errors', stage='process', symbol=symbol.upper())
+            logger.error("Error processing data for %s: %s", symbol, e)
             return None
     
+    @timed('save')
     def save_to_csv(self, data, symbol, filename=None, period="historical"):
         """
         Save processed data to CSV file in organized folder structure
@@ -330,7 +281,7 @@ class StockDataPipeline:
             str: Path to saved file
         """
         if data is None or data.empty:
-            logging.error("No data to save")
+            logger.error("No data to save")
             return None
             
         try:
@@ -340,7 +291,7 @@ class StockDataPipeline:
             ticker_dir = os.path.join(self.output_dir, symbol_upper)
             if not os.path.exists(ticker_dir):
                 os.makedirs(ticker_dir)
-                logging.info(f"Created ticker directory: {ticker_dir}")
+                logger.info("Created ticker directory: %s", ticker_dir)
             
             if filename is None:
                 # Generate filename with date range information
@@ -356,14 +307,17 @@ class StockDataPipeline:
             
             filepath = os.path.join(ticker_dir, filename)
             data.to_csv(filepath, index=False)
+            increment('rows_saved', len(data), symbol=symbol_upper)
             
-            logging.info(f"✅ IBKR data saved to: {filepath}")
+            logger.info("✅ IBKR data saved to: %s", filepath, extra={'symbol': symbol_upper, 'rows': len(data)})
             return filepath
             
         except Exception as e:
-            logging.error(f"Error saving data to CSV: {str(e)}")
+            increment('errors', stage='save', symbol=symbol.upper())
+            logger.error("Error saving data to CSV: %s", e)
             return None
     
+    @timed('pipeline')
     def run_pipeline(self, symbol, duration="2 Y", save_filename=None):
         """
         Run the complete IBKR data pipeline for a single ticker
@@ -376,32 +330,32 @@ class StockDataPipeline:
         Returns:
             str: Path to saved CSV file
         """
-        logging.info(f"Starting IBKR data pipeline for {symbol.upper()}...")
+        logger.info("Starting IBKR data pipeline for %s...", symbol.upper())
         
         try:
             # Fetch data from IBKR
             raw_data = self.fetch_historical_data(symbol, duration=duration)
             if raw_data is None:
-                logging.error(f"Pipeline failed for {symbol}: Could not fetch data from IBKR")
+                logger.error("Pipeline failed for %s: Could not fetch data from IBKR", symbol)
                 return None
             
             # Process data
             processed_data = self.process_data(raw_data, symbol)
             if processed_data is None:
-                logging.error(f"Pipeline failed for {symbol}: Could not process data")
+                logger.error("Pipeline failed for %s: Could not process data", symbol)
                 return None
             
             # Save to CSV
             filepath = self.save_to_csv(processed_data, symbol, save_filename, duration)
             if filepath is None:
-                logging.error(f"Pipeline failed for {symbol}: Could not save data")
+                logger.error("Pipeline failed for %s: Could not save data", symbol)
                 return None
             
-            logging.info(f"✅ IBKR data pipeline completed successfully for {symbol.upper()}!")
+            logger.info("✅ IBKR data pipeline completed successfully for %s!", symbol.upper())
             return filepath
             
         except Exception as e:
-            logging.error(f"Pipeline error for {symbol}: {e}")
+            logger.error("Pipeline error for %s: %s", symbol, e)
             return None
         finally:
             # Always disconnect when done
@@ -421,16 +375,16 @@ class StockDataPipeline:
         results = {}
         
         for symbol in symbols:
-            logging.info(f"Processing ticker {symbol.upper()}...")
+            logger.info("Processing ticker %s...", symbol.upper())
             
             result = self.run_pipeline(symbol, duration=duration)
             
             if result:
                 results[symbol.upper()] = result
-                logging.info(f"✅ {symbol.upper()}: Success")
+                logger.info("✅ %s: Success", symbol.upper())
             else:
                 results[symbol.upper()] = None
-                logging.error(f"❌ {symbol.upper()}: Failed")
+                logger.error("❌ %s: Failed", symbol.upper())
         
         return results
     
@@ -452,14 +406,10 @@ class StockDataPipeline:
             
         try:
             symbol_upper = symbol.upper()
-            stock = Stock(symbol_upper, 'SMART', 'USD')
-            
-            qualified_contracts = self.ib.qualifyContracts(stock)
-            if not qualified_contracts:
+            contract = self.provider.qualify(self.provider.contract(symbol_upper))
+            if contract is None:
                 return None
             
-            contract = qualified_contracts[0]
-            
             return {
                 'symbol': symbol_upper,
                 'name': self.ALLOWED_TICKERS[symbol_upper],
@@ -469,11 +419,13 @@ class StockDataPipeline:
             }
             
         except Exception as e:
-            logging.error(f"Error getting ticker info for {symbol}: {str(e)}")
+            logger.error("Error getting ticker info for %s: %s", symbol, e)
             return None
 
 def main():
     """Main function to demonstrate the IBKR pipeline"""
+    setup_logging(log_file='data/logs/stock_pipeline.log')
+    
     # Initialize pipeline
     pipeline = StockDataPipeline()
     